@@ -12,16 +12,61 @@ Criterios de segmentación realistas:
 - Premium: 5,000,000 - 7,999,999 (clase alta)
 - Estándar: 2,500,000 - 4,999,999 (clase media jodida pero con esperanza)
 - Básico: < 2,500,000 (los que apenas la van pasando)
+
+Por defecto la actualización es incremental: unos triggers anotan a los
+clientes nuevos o con ingresos_mensuales modificados y solo esos se
+revisan, por lotes con un commit por lote. Solo se reescriben las filas
+cuyo segmento cambia y cada transición queda en auditoria_segmentos.
+
+Uso:
+    python actualizar_segmentos.py              # incremental
+    python actualizar_segmentos.py --completo   # revisa todos los clientes
 """
 
-import sqlite3
+import argparse
+import time
+from datetime import datetime
+
 import pandas as pd
 
-def conectar_bd():
-    """Conecta a la base de datos bancaria"""
-    conn = sqlite3.connect('data/banking_core.db')
-    print("✅ Conectado a la base de datos bancaria")
-    return conn
+from conexion_bd import conectar_bd
+
+# (ingreso mínimo, segmento) de mayor a menor; por debajo queda SEGMENTO_BASE
+UMBRALES_SEGMENTO = [
+    (8_000_000, "VIP"),
+    (5_000_000, "Premium"),
+    (2_500_000, "Estándar"),
+]
+SEGMENTO_BASE = "Básico"
+
+SQL_SEGUIMIENTO = """
+CREATE TABLE IF NOT EXISTS auditoria_segmentos (
+    auditoria_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ejecucion TIMESTAMP NOT NULL,
+    cliente_id INTEGER NOT NULL,
+    segmento_anterior VARCHAR(50),
+    segmento_nuevo VARCHAR(50) NOT NULL,
+    ingresos_mensuales DECIMAL(15,2),
+    fecha_cambio TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_auditoria_segmentos_cliente ON auditoria_segmentos(cliente_id);
+
+-- Cola de clientes por revisar en la próxima corrida incremental
+CREATE TABLE IF NOT EXISTS clientes_cambios_ingresos (
+    cliente_id INTEGER PRIMARY KEY
+);
+CREATE TRIGGER IF NOT EXISTS trg_clientes_ingresos_insert
+AFTER INSERT ON clientes
+BEGIN
+    INSERT OR IGNORE INTO clientes_cambios_ingresos (cliente_id) VALUES (new.cliente_id);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_clientes_ingresos_update
+AFTER UPDATE OF ingresos_mensuales ON clientes
+WHEN old.ingresos_mensuales IS NOT new.ingresos_mensuales
+BEGIN
+    INSERT OR IGNORE INTO clientes_cambios_ingresos (cliente_id) VALUES (new.cliente_id);
+END;
+"""
 
 def mostrar_estado_actual(conn):
     """Muestra el estado actual de los segmentos"""
@@ -44,28 +89,113 @@ def mostrar_estado_actual(conn):
     print(resultado)
     print()
 
-def actualizar_segmentos(conn):
-    """Actualiza los segmentos basándose en ingresos reales"""
+def sql_segmento(columna="ingresos_mensuales"):
+    """Expresión CASE que asigna el segmento según UMBRALES_SEGMENTO"""
+    ramas = "\n".join(f"        WHEN {columna} >= {minimo} THEN '{segmento}'"
+                      for minimo, segmento in UMBRALES_SEGMENTO)
+    return f"CASE\n{ramas}\n        ELSE '{SEGMENTO_BASE}'\n    END"
+
+def instalar_seguimiento(conn):
+    """Crea la auditoría, la cola de cambios y los triggers que la alimentan.
+
+    Los triggers anotan en clientes_cambios_ingresos a cada cliente nuevo o
+    cuyo ingresos_mensuales cambió; la próxima corrida incremental solo
+    revisa esos clientes. Devuelve True si el seguimiento ya existía.
+    """
+    existia = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clientes_cambios_ingresos'"
+    ).fetchone() is not None
+    conn.executescript(SQL_SEGUIMIENTO)
+    return existia
+
+def _aplicar_lote(conn, filtro, params, ejecucion):
+    """Audita y actualiza los clientes del filtro cuyo segmento cambia"""
+    segmento_nuevo = sql_segmento()
+    condicion = f"{filtro} AND segmento_cliente IS NOT ({segmento_nuevo})"
+    conn.execute(f"""
+        INSERT INTO auditoria_segmentos (ejecucion, cliente_id, segmento_anterior, segmento_nuevo, ingresos_mensuales)
+        SELECT ?, cliente_id, segmento_cliente, {segmento_nuevo}, ingresos_mensuales
+        FROM clientes
+        WHERE {condicion}
+    """, (ejecucion, *params))
+    return conn.execute(f"""
+        UPDATE clientes
+        SET segmento_cliente = {segmento_nuevo}, updated_at = CURRENT_TIMESTAMP
+        WHERE {condicion}
+    """, params).rowcount
+
+def actualizar_segmentos(conn, completo=False, tamano_lote=10_000):
+    """Re-segmenta por lotes (un commit por lote); devuelve los clientes cambiados.
+
+    Incremental (por defecto): solo los clientes anotados en la cola de
+    cambios. La primera vez, o con completo=True, revisa todos los clientes
+    recorriéndolos por rangos de cliente_id. En ambos casos solo se
+    escriben las filas cuyo segmento cambia, y cada cambio queda en
+    auditoria_segmentos.
+    """
     print("🔧 ACTUALIZANDO SEGMENTOS PARA SALVAR EL TRABAJO...")
     print("-" * 50)
-    
-    # Script de actualización basado en ingresos
-    script_actualizacion = """
-    UPDATE clientes 
-    SET segmento_cliente = CASE 
-        WHEN ingresos_mensuales >= 8000000 THEN 'VIP'
-        WHEN ingresos_mensuales >= 5000000 THEN 'Premium'
-        WHEN ingresos_mensuales >= 2500000 THEN 'Estándar'
-        ELSE 'Básico'
-    END;
-    """
-    
-    cursor = conn.cursor()
-    cursor.execute(script_actualizacion)
-    conn.commit()
-    
-    print(f"✅ Se actualizaron {cursor.rowcount} registros de clientes")
+
+    completo = not instalar_seguimiento(conn) or completo
+    ejecucion = datetime.now().isoformat(timespec="milliseconds")
+    inicio = time.perf_counter()
+    revisados = cambiados = lotes = 0
+
+    if completo:
+        # La cola se descarta: la pasada completa cubre a todos los clientes
+        conn.execute("DELETE FROM clientes_cambios_ingresos")
+        conn.commit()
+        ultimo_id = 0
+        while True:
+            ids = [cliente_id for (cliente_id,) in conn.execute(
+                "SELECT cliente_id FROM clientes WHERE cliente_id > ? ORDER BY cliente_id LIMIT ?",
+                (ultimo_id, tamano_lote))]
+            if not ids:
+                break
+            with conn:
+                cambiados += _aplicar_lote(conn, "cliente_id BETWEEN ? AND ?", (ids[0], ids[-1]), ejecucion)
+            ultimo_id = ids[-1]
+            revisados += len(ids)
+            lotes += 1
+    else:
+        while True:
+            ids = [cliente_id for (cliente_id,) in conn.execute(
+                "SELECT cliente_id FROM clientes_cambios_ingresos ORDER BY cliente_id LIMIT ?", (tamano_lote,))]
+            if not ids:
+                break
+            marcadores = ", ".join("?" * len(ids))
+            with conn:
+                cambiados += _aplicar_lote(conn, f"cliente_id IN ({marcadores})", ids, ejecucion)
+                conn.execute(f"DELETE FROM clientes_cambios_ingresos WHERE cliente_id IN ({marcadores})", ids)
+            revisados += len(ids)
+            lotes += 1
+
+    segundos = time.perf_counter() - inicio
+    modo = "completa" if completo else "incremental"
+    print(f"✅ Pasada {modo}: {revisados:,} clientes revisados en {lotes} lotes, "
+          f"{cambiados:,} cambiaron de segmento ({segundos:.2f} s)")
+    if cambiados:
+        print(f"📝 Transiciones registradas en auditoria_segmentos (ejecución {ejecucion})")
     print()
+    return cambiados
+
+def mostrar_transiciones(conn, ejecucion=None):
+    """Resumen de transiciones de segmento de una ejecución (la última por defecto)"""
+    ejecucion = ejecucion or conn.execute("SELECT MAX(ejecucion) FROM auditoria_segmentos").fetchone()[0]
+    if ejecucion is None:
+        return
+    transiciones = pd.read_sql_query("""
+        SELECT segmento_anterior, segmento_nuevo, COUNT(*) AS clientes
+        FROM auditoria_segmentos
+        WHERE ejecucion = ?
+        GROUP BY segmento_anterior, segmento_nuevo
+        ORDER BY clientes DESC
+    """, conn, params=(ejecucion,))
+    if len(transiciones):
+        print("🔀 TRANSICIONES DE SEGMENTO:")
+        print("-" * 50)
+        print(transiciones)
+        print()
 
 def mostrar_estado_nuevo(conn):
     """Muestra el nuevo estado después de la actualización"""
@@ -117,8 +247,13 @@ def analisis_vip_por_ciudad(conn):
     print(resultado)
     print()
 
-def main():
+def main(argv=None):
     """Función principal - salvemos el trabajo!"""
+    parser = argparse.ArgumentParser(description="Re-segmenta clientes según sus ingresos")
+    parser.add_argument("--completo", action="store_true", help="Revisa todos los clientes, no solo los cambiados")
+    parser.add_argument("--lote", type=int, default=10_000, help="Clientes por lote (un commit por lote)")
+    args = parser.parse_args(argv)
+
     print("🚨 OPERACIÓN: SALVAR EL TRABAJO")
     print("=" * 50)
     print("💼 Situación: Los datos actuales muestran 0% VIPs")
@@ -127,13 +262,15 @@ def main():
     print()
     
     # Conectar a la base de datos
-    conn = conectar_bd()
+    conn = conectar_bd(perfil="escritura")
+    print("✅ Conectado a la base de datos bancaria")
     
     # Mostrar estado actual (problemático)
     mostrar_estado_actual(conn)
     
     # Actualizar segmentos
-    actualizar_segmentos(conn)
+    actualizar_segmentos(conn, completo=args.completo, tamano_lote=args.lote)
+    mostrar_transiciones(conn)
     
     # Mostrar nuevo estado (presentable)
     mostrar_estado_nuevo(conn)
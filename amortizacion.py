@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧮 TABLAS DE AMORTIZACIÓN (SISTEMA FRANCÉS)
+===========================================
+
+Genera el plan de cuotas completo de cada préstamo en la tabla
+`cuotas_prestamo`: fecha de vencimiento, cuota, interés, abono a capital
+y saldo después de cada pago. Todos los préstamos de un lote se calculan
+a la vez con arrays de NumPy (una fila por cuota, sin bucles por
+préstamo), usando la forma cerrada del saldo:
+
+    saldo_k = P·(1+r)^k − C·((1+r)^k − 1) / r,   C = P·r / (1 − (1+r)^−n)
+
+con P = monto_desembolsado, r = tasa_interes / 12 y n = plazo_meses. La
+última cuota absorbe el redondeo: la suma del capital es exactamente el
+monto y el saldo termina en cero.
+
+Solo se regeneran los préstamos nuevos o cuyo monto, tasa, plazo o fecha
+de desembolso cambió (se guarda una firma por préstamo en
+amortizacion_control); los préstamos borrados pierden su plan.
+
+Uso:
+    python amortizacion.py                  # incremental
+    python amortizacion.py --reconstruir
+    python amortizacion.py --flujo 2025-01 2025-12
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from conexion_bd import DB_PATH, conectar_bd
+
+SQL_TABLAS = """
+CREATE TABLE IF NOT EXISTS cuotas_prestamo (
+    prestamo_id INTEGER NOT NULL,
+    numero_cuota INTEGER NOT NULL,
+    fecha_vencimiento DATE NOT NULL,
+    cuota DECIMAL(15,2) NOT NULL,
+    interes DECIMAL(15,2) NOT NULL,
+    capital DECIMAL(15,2) NOT NULL,
+    saldo_final DECIMAL(15,2) NOT NULL,
+    PRIMARY KEY (prestamo_id, numero_cuota)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cuotas_prestamo_fecha ON cuotas_prestamo(fecha_vencimiento);
+
+CREATE TABLE IF NOT EXISTS amortizacion_control (
+    prestamo_id INTEGER PRIMARY KEY,
+    firma TEXT NOT NULL
+);
+"""
+
+FIRMA_PRESTAMO = "printf('%s|%s|%s|%s', monto_desembolsado, tasa_interes, plazo_meses, fecha_desembolso)"
+
+SQL_PENDIENTES = f"""
+SELECT p.prestamo_id, p.monto_desembolsado, p.tasa_interes, p.plazo_meses, p.fecha_desembolso,
+       {FIRMA_PRESTAMO} AS firma
+FROM prestamos p
+LEFT JOIN amortizacion_control a ON a.prestamo_id = p.prestamo_id
+WHERE a.firma IS NOT {FIRMA_PRESTAMO}
+ORDER BY p.prestamo_id
+"""
+
+SQL_INSERTAR = """
+INSERT INTO cuotas_prestamo
+    (prestamo_id, numero_cuota, fecha_vencimiento, cuota, interes, capital, saldo_final)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_FLUJO = """
+SELECT
+    strftime('%Y-%m', fecha_vencimiento) AS mes,
+    COUNT(*) AS cuotas,
+    ROUND(SUM(cuota), 2) AS cuota_total,
+    ROUND(SUM(interes), 2) AS interes_total,
+    ROUND(SUM(capital), 2) AS capital_total
+FROM cuotas_prestamo
+WHERE fecha_vencimiento >= :desde AND fecha_vencimiento < date(:hasta, '+1 month')
+GROUP BY mes
+ORDER BY mes
+"""
+
+
+def crear_tablas(conn):
+    """Crea cuotas_prestamo y amortizacion_control si no existen"""
+    conn.executescript(SQL_TABLAS)
+
+
+def sumar_meses(fechas, meses):
+    """fecha + meses, con el día recortado al fin de mes (31-ene + 1 → 28/29-feb)"""
+    mes = fechas.astype("datetime64[M]") + meses
+    inicio_mes = mes.astype("datetime64[D]")
+    dias_mes = ((mes + 1).astype("datetime64[D]") - inicio_mes).astype(int)
+    dia = (fechas - fechas.astype("datetime64[M]").astype("datetime64[D]")).astype(int) + 1
+    return inicio_mes + (np.minimum(dia, dias_mes) - 1).astype("timedelta64[D]")
+
+
+def calcular_cuotas(prestamo_id, monto, tasa_anual, plazo, fecha_desembolso):
+    """Plan francés de varios préstamos a la vez; devuelve un dict de arrays (una fila por cuota)"""
+    monto = np.asarray(monto, dtype=float)
+    tasa = np.asarray(tasa_anual, dtype=float) / 12
+    plazo = np.asarray(plazo, dtype=int)
+    con_tasa = tasa > 0
+    tasa_segura = np.where(con_tasa, tasa, 1.0)
+    cuota = np.where(con_tasa, monto * tasa_segura / (1 - (1 + tasa_segura) ** -plazo.astype(float)),
+                     monto / np.maximum(plazo, 1))
+
+    # Una fila por cuota: índice del préstamo y número de cuota (1..n)
+    idx = np.repeat(np.arange(len(monto)), plazo)
+    inicio = np.repeat(np.cumsum(plazo) - plazo, plazo)
+    k = np.arange(len(idx)) - inicio + 1
+
+    r, p, c = tasa[idx], monto[idx], cuota[idx]
+    factor_anterior = (1 + r) ** (k - 1)
+    saldo_anterior = np.where(con_tasa[idx],
+                              p * factor_anterior - c * (factor_anterior - 1) / tasa_segura[idx],
+                              p - c * (k - 1))
+    interes = np.round(saldo_anterior * r, 2)
+    ultima = k == plazo[idx]
+    capital = np.round(np.round(c, 2) - interes, 2)
+    # La última cuota salda exactamente lo que falta, así la suma del capital es el monto
+    pagado_antes = np.bincount(idx, weights=np.where(ultima, 0.0, capital), minlength=len(monto))
+    capital = np.where(ultima, np.round(monto - pagado_antes, 2)[idx], capital)
+    cuota_fila = np.round(np.where(ultima, capital + interes, c), 2)
+    acumulado = np.r_[0.0, np.cumsum(capital)]
+    pagado = acumulado[1:] - acumulado[inicio]  # capital pagado del préstamo hasta la cuota k
+    saldo_final = np.round(p - pagado, 2)
+
+    fechas = sumar_meses(np.asarray(fecha_desembolso, dtype="datetime64[D]")[idx], k)
+    return {
+        "prestamo_id": np.asarray(prestamo_id)[idx],
+        "numero_cuota": k,
+        "fecha_vencimiento": np.datetime_as_string(fechas, unit="D"),
+        "cuota": cuota_fila,
+        "interes": interes,
+        "capital": capital,
+        "saldo_final": saldo_final,
+    }
+
+
+def regenerar_cuotas(conn, reconstruir=False, tamano_lote=20_000):
+    """Regenera el plan de los préstamos nuevos o modificados; devuelve (préstamos, cuotas)"""
+    crear_tablas(conn)
+    inicio = time.perf_counter()
+    if reconstruir:
+        with conn:
+            conn.execute("DELETE FROM cuotas_prestamo")
+            conn.execute("DELETE FROM amortizacion_control")
+
+    with conn:
+        borrados = [(i,) for (i,) in conn.execute(
+            "SELECT prestamo_id FROM amortizacion_control WHERE prestamo_id NOT IN (SELECT prestamo_id FROM prestamos)")]
+        conn.executemany("DELETE FROM cuotas_prestamo WHERE prestamo_id = ?", borrados)
+        conn.executemany("DELETE FROM amortizacion_control WHERE prestamo_id = ?", borrados)
+
+    pendientes = pd.read_sql_query(SQL_PENDIENTES, conn)
+    total_cuotas = 0
+    for desde in range(0, len(pendientes), tamano_lote):
+        lote = pendientes.iloc[desde:desde + tamano_lote]
+        cuotas = calcular_cuotas(lote["prestamo_id"], lote["monto_desembolsado"], lote["tasa_interes"],
+                                 lote["plazo_meses"], pd.to_datetime(lote["fecha_desembolso"]).to_numpy())
+        ids = [(int(i),) for i in lote["prestamo_id"]]
+        filas = zip(cuotas["prestamo_id"].tolist(), cuotas["numero_cuota"].tolist(),
+                    cuotas["fecha_vencimiento"].tolist(), cuotas["cuota"].tolist(), cuotas["interes"].tolist(),
+                    cuotas["capital"].tolist(), cuotas["saldo_final"].tolist())
+        with conn:
+            conn.executemany("DELETE FROM cuotas_prestamo WHERE prestamo_id = ?", ids)
+            conn.executemany(SQL_INSERTAR, filas)
+            conn.executemany("INSERT OR REPLACE INTO amortizacion_control (prestamo_id, firma) VALUES (?, ?)",
+                             zip(lote["prestamo_id"].astype(int).tolist(), lote["firma"].tolist()))
+        total_cuotas += len(cuotas["prestamo_id"])
+
+    segundos = time.perf_counter() - inicio
+    print(f"🧮 Planes regenerados: {len(pendientes):,} préstamos, {total_cuotas:,} cuotas "
+          f"({len(borrados):,} planes eliminados) en {segundos:.2f} s")
+    return len(pendientes), total_cuotas
+
+
+def flujo_proyectado(conn, desde, hasta):
+    """Cuotas, intereses y capital esperados por mes entre dos meses (YYYY-MM)"""
+    return pd.read_sql_query(SQL_FLUJO, conn, params={"desde": f"{desde}-01", "hasta": f"{hasta}-01"})
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Genera las tablas de amortización de los préstamos")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--reconstruir", action="store_true", help="Regenera el plan de todos los préstamos")
+    parser.add_argument("--lote", type=int, default=20_000, help="Préstamos por lote (un commit por lote)")
+    parser.add_argument("--flujo", nargs=2, metavar=("DESDE", "HASTA"), help="Muestra el flujo esperado por mes")
+    args = parser.parse_args(argv)
+
+    if args.flujo:
+        conn = conectar_bd(args.db, solo_lectura=True)
+        print(f"💵 Flujo esperado de cartera {args.flujo[0]} … {args.flujo[1]}:")
+        print(flujo_proyectado(conn, *args.flujo))
+    else:
+        conn = conectar_bd(args.db, perfil="escritura")
+        regenerar_cuotas(conn, reconstruir=args.reconstruir, tamano_lote=args.lote)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧠 ASESOR DE ÍNDICES POR CARGA DE TRABAJO
+=========================================
+
+Propone índices compuestos y de cobertura para una carga de consultas y
+los mide antes de recomendarlos. La carga sale de los scripts de práctica
+(EJERCICIO 7-20 y ejemplos) o de un registro capturado con
+REGISTRO_CONSULTAS=registro.json (ver ejecutor_consultas.py), que trae
+los parámetros reales de cada consulta.
+
+Candidatos:
+- los de `.expert` del shell sqlite3, si el ejecutable está instalado;
+- los deducidos de cada consulta: columnas comparadas por igualdad (WHERE
+  y JOIN ... ON) seguidas de la primera columna de rango u ORDER BY, y la
+  variante de cobertura con el resto de columnas que la consulta lee.
+
+Cada candidato se crea en una copia temporal de la base (con ANALYZE), se
+vuelven a medir las consultas cuyo plan lo usa y se borra. Se recomiendan
+los que aceleran al menos MEJORA_MINIMA veces esas consultas y ahorran
+AHORRO_MINIMO_MS o más, con su tamaño en disco (dbstat). Los candidatos
+se evalúan uno a uno; de los que empiezan por la misma columna de una
+tabla solo se recomienda el que más ahorra.
+
+Uso:
+    python asesor_indices.py
+    python asesor_indices.py --registro registro.json
+    python asesor_indices.py --aplicar          # crea los recomendados en la base
+"""
+
+import argparse
+import json
+import re
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmark_consultas import catalogo_consultas
+from conexion_bd import DB_PATH, conectar_bd
+from verificar_planes import alias_tablas
+
+MEJORA_MINIMA = 1.2
+AHORRO_MINIMO_MS = 1.0
+MAX_COLUMNAS_COBERTURA = 6
+
+
+def carga_practica():
+    """[(clave, sql, params)] de las consultas de práctica"""
+    return [(clave, sql, None) for clave, _, sql in catalogo_consultas()]
+
+
+def carga_registro(ruta):
+    """[(clave, sql, params)] de un registro de ejecutor_consultas, sin repetidos ni errores"""
+    entradas = json.loads(Path(ruta).read_text(encoding="utf-8"))
+    carga, vistas = [], set()
+    for entrada in entradas:
+        llave = (entrada["sql"], json.dumps(entrada.get("params"), sort_keys=True, default=str))
+        if "error" in entrada or entrada.get("cache") == "acierto" or llave in vistas:
+            continue
+        vistas.add(llave)
+        carga.append((entrada.get("titulo", f"consulta_{len(carga) + 1}"), entrada["sql"], entrada.get("params")))
+    return carga
+
+
+def _indices_existentes(conn):
+    """{tabla: [tuplas de columnas]} de los índices actuales (incluidos UNIQUE)"""
+    existentes = defaultdict(list)
+    for tabla, indice in conn.execute("""
+        SELECT m.name, il.name FROM sqlite_master m, pragma_index_list(m.name) il
+        WHERE m.type = 'table'
+    """):
+        columnas = tuple(nombre for (nombre,) in conn.execute(
+            "SELECT name FROM pragma_index_info(?) ORDER BY seqno", (indice,)))
+        existentes[tabla].append(columnas)
+    return existentes
+
+
+def _rowid(conn, tabla):
+    """Columna INTEGER PRIMARY KEY de una tabla (alias del rowid), si la tiene"""
+    llave = [(nombre, tipo) for _, nombre, tipo, _, _, pk in conn.execute(f"PRAGMA table_info({tabla})") if pk]
+    return llave[0][0] if len(llave) == 1 and llave[0][1].upper() == "INTEGER" else None
+
+
+def candidatos_heuristicos(conn, consulta):
+    """Candidatos (tabla, columnas) deducidos de los predicados y el ORDER BY de una consulta"""
+    texto = re.sub(r"--[^\n]*", "", consulta)
+    alias = {nombre: tabla for nombre, tabla in alias_tablas(texto).items()
+             if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,)).fetchone()}
+    columnas_tabla = {tabla: {fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")}
+                      for tabla in set(alias.values())}
+    # La llave INTEGER PRIMARY KEY es el rowid: ya está en todo índice
+    llaves = {tabla: _rowid(conn, tabla) for tabla in columnas_tabla}
+    una_tabla = next(iter(columnas_tabla)) if len(columnas_tabla) == 1 else None
+
+    def referencias(fragmento):
+        """[(tabla, columna, lo que sigue)] de las columnas mencionadas en un fragmento"""
+        encontradas = []
+        for prefijo, columna, resto in re.findall(r"\b(?:(\w+)\.)?(\w+)\b(\s*(?:=|<|>|IN\b|BETWEEN\b|LIKE\b)?)",
+                                                  fragmento, flags=re.IGNORECASE):
+            tabla = alias.get(prefijo) if prefijo else una_tabla
+            if tabla and columna in columnas_tabla[tabla] and columna != llaves[tabla]:
+                encontradas.append((tabla, columna, resto.strip().upper()))
+        return encontradas
+
+    igualdad, rango, orden, leidas = (defaultdict(list) for _ in range(4))
+    for tabla, columna, _ in referencias(texto):
+        leidas[tabla].append(columna)
+    for predicado in re.findall(r"\b(?:ON|WHERE|AND|OR)\b(.*?)(?=\b(?:AND|OR|JOIN|LEFT|INNER|WHERE|GROUP|ORDER"
+                                r"|LIMIT|HAVING)\b|$)", texto, flags=re.IGNORECASE | re.DOTALL):
+        # En "a.x = b.y" la columna de la derecha no lleva operador pero también es igualdad
+        es_igualdad = re.search(r"(?<![<>!])=|\bIN\b", predicado, flags=re.IGNORECASE) is not None
+        for tabla, columna, operador in referencias(predicado):
+            if operador in ("=", "IN") or (not operador and es_igualdad):
+                igualdad[tabla].append(columna)
+            elif operador:
+                rango[tabla].append(columna)
+    for clausula in re.findall(r"\b(?:ORDER|GROUP)\s+BY\b(.*?)(?=\bLIMIT\b|\bHAVING\b|\bORDER\b|;|$)",
+                               texto, flags=re.IGNORECASE | re.DOTALL):
+        for tabla, columna, _ in referencias(clausula):
+            orden[tabla].append(columna)
+
+    candidatos = set()
+    for tabla in columnas_tabla:
+        iguales = list(dict.fromkeys(igualdad[tabla]))
+        siguiente = [c for c in dict.fromkeys(rango[tabla] + orden[tabla]) if c not in iguales][:1]
+        base = tuple(iguales + siguiente)
+        if base:
+            candidatos.add((tabla, base))
+            resto = [c for c in dict.fromkeys(leidas[tabla]) if c not in base]
+            if resto and len(base) + len(resto) <= MAX_COLUMNAS_COBERTURA:
+                candidatos.add((tabla, base + tuple(resto)))
+        if orden[tabla]:
+            candidatos.add((tabla, tuple(dict.fromkeys(orden[tabla]))))
+    return candidatos
+
+
+def candidatos_expert(db_path, consulta):
+    """Candidatos de `.expert` del shell sqlite3 (vacío si el shell no está instalado)"""
+    if shutil.which("sqlite3") is None:
+        return set()
+    salida = subprocess.run(["sqlite3", str(db_path)], input=f".expert\n{consulta.strip().rstrip(';')};\n",
+                            capture_output=True, text=True, timeout=120).stdout
+    candidatos = set()
+    for tabla, columnas in re.findall(r"CREATE INDEX \w+ ON (\w+)\((.*?)\);", salida):
+        candidatos.add((tabla, tuple(c.strip() for c in columnas.split(","))))
+    return candidatos
+
+
+def nombre_indice(tabla, columnas):
+    return "idx_" + "_".join([tabla] + [re.sub(r"\W+", "_", c).lower() for c in columnas])
+
+
+def ddl_indice(tabla, columnas):
+    return f"CREATE INDEX IF NOT EXISTS {nombre_indice(tabla, columnas)} ON {tabla}({', '.join(columnas)})"
+
+
+def _medir(conn, consulta, params, repeticiones):
+    """Mediana en ms de varias ejecuciones (con una de calentamiento)"""
+    conn.execute(consulta, params or ()).fetchall()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conn.execute(consulta, params or ()).fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.median(tiempos))
+
+
+def _usa_indice(conn, consulta, params, nombre):
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {consulta}", params or ()).fetchall()
+    return any(re.search(rf"\b{nombre}\b", detalle) for *_, detalle in plan)
+
+
+def evaluar(db_path, carga, repeticiones=5, mejora_minima=MEJORA_MINIMA, ahorro_minimo=AHORRO_MINIMO_MS):
+    """Mide cada candidato en una copia temporal; devuelve un DataFrame ordenado por aceleración"""
+    with tempfile.TemporaryDirectory() as directorio:
+        copia = Path(directorio) / "asesor.db"
+        origen = sqlite3.connect(db_path)
+        destino = sqlite3.connect(copia)
+        origen.backup(destino)
+        origen.close()
+        destino.execute("ANALYZE")
+        destino.commit()
+
+        existentes = _indices_existentes(destino)
+        candidatos = defaultdict(set)
+        for clave, consulta, _ in carga:
+            for candidato in candidatos_heuristicos(destino, consulta) | candidatos_expert(copia, consulta):
+                candidatos[candidato].add(clave)
+        # Fuera los que ya cubre un índice existente (mismas columnas iniciales)
+        candidatos = {(tabla, columnas): claves for (tabla, columnas), claves in candidatos.items()
+                      if not any(actual[:len(columnas)] == columnas for actual in existentes[tabla])}
+        print(f"🔎 {len(carga)} consultas, {len(candidatos)} índices candidatos")
+
+        base = {clave: _medir(destino, consulta, params, repeticiones) for clave, consulta, params in carga}
+        filas = []
+        for (tabla, columnas), origenes in sorted(candidatos.items()):
+            nombre = nombre_indice(tabla, columnas)
+            destino.execute(ddl_indice(tabla, columnas))
+            destino.execute(f"ANALYZE {nombre}")
+            destino.commit()
+            usan = [(clave, consulta, params) for clave, consulta, params in carga
+                    if _usa_indice(destino, consulta, params, nombre)]
+            antes = sum(base[clave] for clave, _, _ in usan)
+            despues = sum(_medir(destino, consulta, params, repeticiones) for _, consulta, params in usan)
+            tamano = destino.execute("SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = ?",
+                                     (nombre,)).fetchone()[0]
+            destino.execute(f"DROP INDEX {nombre}")
+            destino.commit()
+            aceleracion = antes / despues if despues else None
+            filas.append({
+                "tabla": tabla,
+                "columnas": ", ".join(columnas),
+                "consultas": ", ".join(clave for clave, _, _ in usan),
+                "ms_antes": round(antes, 2),
+                "ms_despues": round(despues, 2),
+                "ahorro_ms": round(antes - despues, 2),
+                "aceleracion": round(aceleracion, 2) if aceleracion else None,
+                "tamano_kb": round(tamano / 1024, 1),
+                "recomendado": False,
+                "ddl": ddl_indice(tabla, columnas),
+            })
+        destino.close()
+    resultado = pd.DataFrame(filas)
+    if resultado.empty:
+        return resultado
+    resultado = resultado.sort_values("ahorro_ms", ascending=False, ignore_index=True)
+    # Uno por (tabla, primera columna): el de mayor ahorro que pase los umbrales
+    elegidos = set()
+    for i, fila in resultado.iterrows():
+        grupo = (fila["tabla"], fila["columnas"].split(",")[0].split()[0])
+        if (fila["consultas"] and grupo not in elegidos and fila["aceleracion"] >= mejora_minima
+                and fila["ahorro_ms"] >= ahorro_minimo):
+            resultado.loc[i, "recomendado"] = True
+            elegidos.add(grupo)
+    return resultado.sort_values(["recomendado", "ahorro_ms"], ascending=False, ignore_index=True)
+
+
+def aplicar(conn, recomendaciones):
+    """Crea en la base los índices recomendados y actualiza las estadísticas"""
+    inicio = time.perf_counter()
+    with conn:
+        for ddl in recomendaciones["ddl"]:
+            conn.execute(ddl)
+    conn.execute("ANALYZE")
+    conn.commit()
+    print(f"🏗️ {len(recomendaciones)} índices creados en {time.perf_counter() - inicio:.2f} s")
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Recomienda índices medidos sobre una carga de consultas")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--registro", help="JSON de REGISTRO_CONSULTAS como carga (por omisión, la práctica)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Ejecuciones medidas por consulta")
+    parser.add_argument("--mejora-minima", type=float, default=MEJORA_MINIMA,
+                        help="Aceleración mínima para recomendar un índice")
+    parser.add_argument("--ahorro-minimo", type=float, default=AHORRO_MINIMO_MS,
+                        help="Milisegundos mínimos ahorrados en la carga para recomendar un índice")
+    parser.add_argument("--aplicar", action="store_true", help="Crea los índices recomendados en la base")
+    args = parser.parse_args(argv)
+
+    carga = carga_registro(args.registro) if args.registro else carga_practica()
+    resultado = evaluar(args.db, carga, args.repeticiones, args.mejora_minima, args.ahorro_minimo)
+    if resultado.empty:
+        print("✅ No hay índices candidatos para esta carga")
+        return
+
+    pd.set_option("display.width", 200)
+    pd.set_option("display.max_colwidth", 60)
+    print()
+    print("🧠 ÍNDICES EVALUADOS:")
+    print("-" * 60)
+    vista = resultado.assign(consultas=resultado["consultas"].str.count(",") + resultado["consultas"].ne("").astype(int))
+    print(vista.drop(columns="ddl").to_string(index=False))
+
+    recomendados = resultado[resultado["recomendado"]]
+    print()
+    if recomendados.empty:
+        print(f"✅ Ningún candidato acelera sus consultas {args.mejora_minima:.1f}x y ahorra "
+              f"{args.ahorro_minimo} ms o más")
+        return
+    print(f"💡 {len(recomendados)} índices recomendados ({recomendados['tamano_kb'].sum():,.1f} KB en total):")
+    for _, fila in recomendados.iterrows():
+        print(f"   {fila['ddl']};  -- {fila['aceleracion']}x, {fila['tamano_kb']:,.1f} KB, {fila['consultas']}")
+    if args.aplicar:
+        conn = conectar_bd(args.db, perfil="escritura")
+        aplicar(conn, recomendados)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ BENCHMARK DE LAS CONSULTAS DE PRÁCTICA
+=========================================
+
+Mide las consultas de los scripts de práctica (EJERCICIO 7-20 y los
+ejemplos de practica_sql_avanzada y practica_joins_completa) sobre bases
+sintéticas a varias escalas, para comparar antes y después de cualquier
+cambio de esquema o de índices.
+
+Escalas (clientes de poblar_datos.py, con sus demás valores por omisión):
+1x = 1.000, 10x = 10.000, 100x = 100.000, 1000x = 1.000.000. Cada base
+se genera una vez en data/benchmark/ con sus tablas derivadas
+(saldos_diarios.py y amortizacion.py, que también lee verificar_planes.py)
+y ANALYZE, y se reutiliza (--regenerar la vuelve a crear).
+
+Cada consulta corre en un proceso nuevo con una conexión de solo lectura:
+primero las corridas de calentamiento y luego las repeticiones medidas
+(ejecución + fetchall). Se reportan mediana, p95 y el pico de memoria
+(RSS máximo del proceso durante la consulta menos el RSS al empezar).
+
+Uso:
+    python benchmark_consultas.py                                   # 1x y 10x
+    python benchmark_consultas.py --escalas 1x 10x 100x 1000x --procesos 8
+    python benchmark_consultas.py --salida data/benchmark/baseline.json
+    python benchmark_consultas.py --comparar data/benchmark/baseline.json
+    python benchmark_consultas.py --escalas 10x --solo-preparar      # base para verificar_planes.py
+"""
+
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import platform
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import amortizacion
+import poblar_datos
+import saldos_diarios
+from conexion_bd import RAIZ_PROYECTO, conectar_bd
+
+DIR_BENCHMARK = RAIZ_PROYECTO / "data" / "benchmark"
+ESCALAS = {
+    "1x": 1_000,
+    "10x": 10_000,
+    "100x": 100_000,
+    "1000x": 1_000_000,
+}
+# Scripts de práctica cuyas constantes EJERCICIO_n / EJEMPLO_n se miden
+SCRIPTS_PRACTICA = {
+    "avanzada": RAIZ_PROYECTO / "notebooks" / "02_agregaciones_groupby" / "practica_sql_avanzada.py",
+    "joins": RAIZ_PROYECTO / "notebooks" / "03_joins_relaciones" / "practica_joins_completa.py",
+}
+UMBRAL_REGRESION = 1.20
+# Tablas derivadas que leen las consultas de verificar_planes.py (su foto se toma sobre estas bases)
+TABLAS_DERIVADAS = ("saldos_diarios", "cuotas_prestamo")
+
+
+def catalogo_consultas():
+    """[(clave, título, sql)] de todas las consultas de práctica, en orden estable"""
+    catalogo = []
+    for prefijo, ruta in SCRIPTS_PRACTICA.items():
+        spec = importlib.util.spec_from_file_location(f"practica_{prefijo}", ruta)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        titulos = {id(sql): titulo for titulo, sql in
+                   getattr(modulo, "CONSULTAS_EJEMPLO", []) + getattr(modulo, "CONSULTAS_EJERCICIOS", [])}
+        nombres = [nombre for nombre in vars(modulo) if re.fullmatch(r"(EJEMPLO|EJERCICIO)_\d+", nombre)]
+        for nombre in sorted(nombres, key=lambda n: (n.startswith("EJERCICIO"), int(n.rsplit("_", 1)[1]))):
+            sql = getattr(modulo, nombre)
+            catalogo.append((f"{prefijo}.{nombre}", titulos.get(id(sql), nombre), sql))
+    return catalogo
+
+
+def ruta_escala(escala, directorio=DIR_BENCHMARK):
+    """Ruta de la base de benchmark de una escala"""
+    return Path(directorio) / f"banking_{escala}.db"
+
+
+def _faltan_derivadas(ruta):
+    with sqlite3.connect(ruta) as conn:
+        existentes = {nombre for (nombre,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return not existentes.issuperset(TABLAS_DERIVADAS)
+
+
+def preparar_escala(escala, directorio=DIR_BENCHMARK, regenerar=False, procesos=1):
+    """Genera (si hace falta) la base de una escala y sus tablas derivadas; devuelve su ruta"""
+    ruta = ruta_escala(escala, directorio)
+    if ruta.exists() and not regenerar and not _faltan_derivadas(ruta):
+        return ruta
+    if regenerar or not ruta.exists():
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        print(f"🏗️ Generando base {escala} ({ESCALAS[escala]:,} clientes) en {ruta}")
+        poblar_datos.main(["--db", str(ruta), "--clientes", str(ESCALAS[escala]), "--reiniciar",
+                           "--procesos", str(procesos), "--diferir-indices"])
+    print(f"🧮 Saldos diarios y cuotas de préstamos de la base {escala}")
+    saldos_diarios.main(["--db", str(ruta)])
+    amortizacion.main(["--db", str(ruta)])
+    with sqlite3.connect(ruta) as conn:
+        conn.execute("ANALYZE")
+    return ruta
+
+
+def _memoria_kb(campo):
+    """VmRSS / VmHWM del proceso en KB (Linux); None si no está disponible"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as estado:
+            for linea in estado:
+                if linea.startswith(campo + ":"):
+                    return int(linea.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _reiniciar_pico():
+    """Reinicia el RSS máximo del proceso (VmHWM); True si el sistema lo permite"""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as archivo:
+            archivo.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _ru_maxrss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+
+def _medir_en_proceso(db_path, consulta, calentamiento, repeticiones):
+    """Corre una consulta en un proceso limpio; devuelve (tiempos_ms, filas, memoria_mb)"""
+    conn = conectar_bd(db_path, solo_lectura=True)
+    # Pico de memoria = RSS máximo durante la consulta menos el RSS al empezar.
+    # En Linux se reinicia VmHWM; en otros sistemas se usa el aumento de ru_maxrss.
+    linux = _reiniciar_pico()
+    inicial = _memoria_kb("VmRSS") if linux else _ru_maxrss()
+    for _ in range(calentamiento):
+        conn.execute(consulta).fetchall()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = conn.execute(consulta).fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    pico = _memoria_kb("VmHWM") if linux else _ru_maxrss()
+    # ru_maxrss está en bytes en macOS y en KB en el resto
+    divisor = 1024 * 1024 if not linux and platform.system() == "Darwin" else 1024
+    memoria = round(max(pico - inicial, 0) / divisor, 2) if inicial is not None else None
+    conn.close()
+    return tiempos, len(filas), memoria
+
+
+def medir_escala(db_path, catalogo, calentamiento=1, repeticiones=5):
+    """{clave: métricas} de cada consulta del catálogo sobre una base"""
+    resultados = {}
+    contexto = multiprocessing.get_context("spawn")
+    for clave, titulo, consulta in catalogo:
+        # Un proceso nuevo (spawn, sin heredar memoria) por consulta, así el pico de memoria es solo suyo
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+            tiempos, filas, memoria = pool.submit(_medir_en_proceso, str(db_path), consulta,
+                                                  calentamiento, repeticiones).result()
+        resultados[clave] = {
+            "titulo": titulo,
+            "filas": filas,
+            "mediana_ms": round(float(np.median(tiempos)), 3),
+            "p95_ms": round(float(np.percentile(tiempos, 95)), 3),
+            "min_ms": round(min(tiempos), 3),
+            "memoria_pico_mb": memoria,
+        }
+        texto_memoria = f" · pico {memoria:,.1f} MB" if memoria is not None else ""
+        print(f"   ⏱️ {clave:<22} mediana {resultados[clave]['mediana_ms']:>10.2f} ms · "
+              f"p95 {resultados[clave]['p95_ms']:>10.2f} ms · {filas:,} filas{texto_memoria}")
+    return resultados
+
+
+def ejecutar_benchmark(escalas=("1x", "10x"), calentamiento=1, repeticiones=5, filtro=None,
+                       directorio=DIR_BENCHMARK, regenerar=False, procesos=1):
+    """Prepara las bases y mide el catálogo en cada escala; devuelve el dict de resultados"""
+    catalogo = [c for c in catalogo_consultas() if not filtro or filtro in c[0]]
+    resultados = {
+        "generado_en": datetime.now().isoformat(timespec="seconds"),
+        "sqlite_version": sqlite3.sqlite_version,
+        "python": platform.python_version(),
+        "calentamiento": calentamiento,
+        "repeticiones": repeticiones,
+        "escalas": {},
+    }
+    for escala in escalas:
+        ruta = preparar_escala(escala, directorio, regenerar, procesos)
+        with sqlite3.connect(ruta) as conn:
+            tamanos = {tabla: conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+                       for tabla in ("clientes", "cuentas", "transacciones", "prestamos")}
+        print(f"\n📏 Escala {escala}: " + ", ".join(f"{n:,} {t}" for t, n in tamanos.items()))
+        resultados["escalas"][escala] = {
+            "db": str(ruta),
+            "filas": tamanos,
+            "consultas": medir_escala(ruta, catalogo, calentamiento, repeticiones),
+        }
+    return resultados
+
+
+def comparar(actual, base, umbral=UMBRAL_REGRESION):
+    """Tabla de medianas actual vs base por escala y consulta, marcando regresiones"""
+    filas = []
+    for escala, datos in actual["escalas"].items():
+        anteriores = base.get("escalas", {}).get(escala, {}).get("consultas", {})
+        for clave, metricas in datos["consultas"].items():
+            if clave not in anteriores:
+                continue
+            ratio = metricas["mediana_ms"] / max(anteriores[clave]["mediana_ms"], 1e-6)
+            estado = "⚠️ más lenta" if ratio > umbral else "🚀 más rápida" if ratio < 1 / umbral else "="
+            filas.append((escala, clave, anteriores[clave]["mediana_ms"], metricas["mediana_ms"],
+                          round(ratio, 2), estado))
+    return pd.DataFrame(filas, columns=["escala", "consulta", "base_ms", "actual_ms", "ratio", "estado"])
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark de las consultas de práctica a varias escalas")
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["1x", "10x"])
+    parser.add_argument("--repeticiones", type=int, default=5, help="Corridas medidas por consulta")
+    parser.add_argument("--calentamiento", type=int, default=1, help="Corridas previas sin medir")
+    parser.add_argument("--filtro", help="Solo consultas cuya clave contenga este texto (ej. joins.)")
+    parser.add_argument("--dir", default=str(DIR_BENCHMARK), help="Directorio de las bases de benchmark")
+    parser.add_argument("--regenerar", action="store_true", help="Vuelve a generar las bases")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos para generar las bases")
+    parser.add_argument("--solo-preparar", action="store_true",
+                        help="Solo genera las bases (por ejemplo para verificar_planes.py), sin medir")
+    parser.add_argument("--salida", default=str(DIR_BENCHMARK / "ultimo.json"), help="JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior (baseline) para comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                        help="Ratio de medianas a partir del cual se marca una regresión")
+    args = parser.parse_args(argv)
+
+    if args.solo_preparar:
+        for escala in args.escalas:
+            print(f"✅ {preparar_escala(escala, args.dir, args.regenerar, args.procesos)}")
+        return
+
+    resultados = ejecutar_benchmark(args.escalas, args.calentamiento, args.repeticiones, args.filtro,
+                                    args.dir, args.regenerar, args.procesos)
+    salida = Path(args.salida)
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n💾 Resultados guardados en {salida}")
+
+    if args.comparar:
+        base = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+        tabla = comparar(resultados, base, args.umbral)
+        pd.set_option("display.width", 200)
+        print(f"\n📊 Comparación contra {args.comparar} (generado {base.get('generado_en')}):")
+        print(tabla.to_string(index=False))
+        regresiones = (tabla["ratio"] > args.umbral).sum()
+        print(f"\n{'⚠️' if regresiones else '✅'} {regresiones} consultas más lentas que el umbral "
+              f"({args.umbral:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
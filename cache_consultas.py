@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧠 CACHÉ DE RESULTADOS PARA CONSULTAS ANALÍTICAS
+================================================
+
+Guarda el DataFrame de cada consulta de lectura bajo la clave
+(archivo de la base, SQL normalizado, parámetros). Se usa desde
+ejecutor_consultas.ejecutar_consulta al activarla:
+
+    from ejecutor_consultas import activar_cache
+    activar_cache(max_mb=256)
+
+Invalidación:
+1. Por cada archivo se mantiene una conexión "observadora". Su
+   PRAGMA data_version cambia cuando cualquier otra conexión confirma
+   cambios, así que si no cambió el resultado sigue siendo válido.
+2. Si cambió y la base tiene contadores por tabla (instalar_contadores),
+   solo se invalida la entrada si cambiaron las tablas que la consulta lee.
+
+Las entradas se expulsan por LRU cuando se supera el límite de memoria.
+Opcionalmente se persisten a disco (solo las que tienen contadores por
+tabla, las únicas que se pueden validar en otro proceso).
+"""
+
+import pickle
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+_TOKENS_SQL = re.compile(
+    r"('(?:[^']|'')*')"           # literal de texto
+    r"|(\"(?:[^\"]|\"\")*\")"      # identificador entre comillas
+    r"|(--[^\n]*|/\*.*?\*/)"       # comentario
+    r"|(\s+)",                     # espacios
+    re.DOTALL,
+)
+
+
+def normalizar_sql(consulta):
+    """Quita comentarios y espacios sobrantes sin tocar los literales"""
+    def reemplazar(m):
+        if m.group(1) or m.group(2):
+            return m.group(0)
+        return " "
+    return _TOKENS_SQL.sub(reemplazar, consulta).strip().rstrip(";").strip()
+
+
+def es_cacheable(consulta_normalizada):
+    """Solo se cachean consultas de lectura"""
+    palabras = consulta_normalizada.split(None, 1)
+    return bool(palabras) and palabras[0].upper() in ("SELECT", "WITH")
+
+
+def archivo_bd(conn):
+    """Ruta del archivo principal de la conexión ('' si es :memory:)"""
+    for _, nombre, archivo in conn.execute("PRAGMA database_list").fetchall():
+        if nombre == "main":
+            return archivo
+    return ""
+
+
+@contextmanager
+def tablas_leidas(conn):
+    """Registra (con el authorizer de SQLite) las tablas que lee una sentencia.
+
+    Cambiar el authorizer expira las sentencias preparadas, así que la
+    sentencia se vuelve a preparar y el callback ve todas sus lecturas
+    (incluidas las tablas que hay detrás de una vista).
+    """
+    tablas = set()
+
+    def autorizar(accion, arg1, arg2, db, origen):
+        if accion == sqlite3.SQLITE_READ and arg1 and not arg1.startswith("sqlite_"):
+            tablas.add(arg1)
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(autorizar)
+    try:
+        yield tablas
+    finally:
+        conn.set_authorizer(None)
+
+
+def instalar_contadores(conn, tablas=None):
+    """Crea contadores_cambios y los triggers que lo mantienen por tabla.
+
+    Cada INSERT/UPDATE/DELETE incrementa el contador de su tabla: cuesta un
+    UPDATE extra por fila escrita, por eso es opcional.
+    """
+    if tablas is None:
+        tablas = [nombre for (nombre,) in conn.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name <> 'contadores_cambios'
+        """)]
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS contadores_cambios (
+                tabla TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        for tabla in tablas:
+            conn.execute("INSERT OR IGNORE INTO contadores_cambios (tabla) VALUES (?)", (tabla,))
+            for evento in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_cambios_{tabla}_{evento.lower()}
+                    AFTER {evento} ON {tabla}
+                    BEGIN
+                        UPDATE contadores_cambios SET version = version + 1 WHERE tabla = '{tabla}';
+                    END
+                """)
+    return tablas
+
+
+class CacheResultados:
+    """Caché LRU de DataFrames limitada por memoria"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, ruta_persistencia=None):
+        self.max_bytes = max_bytes
+        self.ruta_persistencia = ruta_persistencia
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._observadores = {}
+        self._lock = threading.RLock()
+        if ruta_persistencia and Path(ruta_persistencia).exists():
+            self.cargar(ruta_persistencia)
+
+    # -- versiones -------------------------------------------------------
+
+    def _observador(self, db):
+        if db not in self._observadores:
+            uri = f"{Path(db).resolve().as_uri()}?mode=ro"
+            self._observadores[db] = sqlite3.connect(uri, uri=True, isolation_level=None,
+                                                     check_same_thread=False)
+        return self._observadores[db]
+
+    def _data_version(self, db):
+        return self._observador(db).execute("PRAGMA data_version").fetchone()[0]
+
+    def _firma(self, db, tablas):
+        """(schema_version, contador de cada tabla) o None si no hay contadores"""
+        if not tablas:
+            return None
+        observador = self._observador(db)
+        orden = sorted(tablas)
+        try:
+            versiones = dict(observador.execute(
+                f"SELECT tabla, version FROM contadores_cambios WHERE tabla IN ({', '.join('?' * len(orden))})",
+                orden,
+            ).fetchall())
+        except sqlite3.OperationalError:
+            return None
+        if len(versiones) < len(orden):
+            return None
+        esquema = observador.execute("PRAGMA schema_version").fetchone()[0]
+        return (esquema,) + tuple(versiones[t] for t in orden)
+
+    # -- API ---------------------------------------------------------------
+
+    def buscar(self, conn, consulta, params=None):
+        """Devuelve (resultado o None, ticket); el ticket se pasa a guardar().
+
+        Devuelve (None, None) si la consulta no se puede cachear.
+        """
+        normalizada = normalizar_sql(consulta)
+        if not es_cacheable(normalizada) or conn.in_transaction:
+            return None, None  # una transacción propia abierta no es visible para el observador
+        db = archivo_bd(conn)
+        if not db:
+            return None, None
+        clave = (db, normalizada, repr(params))
+
+        with self._lock:
+            version = self._data_version(db)
+            ticket = (clave, db, version)
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None, ticket
+            if entrada["data_version"] != version:
+                firma = entrada["firma"] and self._firma(db, entrada["tablas"])
+                if firma is None or firma != entrada["firma"]:
+                    self._eliminar(clave)
+                    self.fallos += 1
+                    return None, ticket
+                entrada["data_version"] = version
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada["resultado"].copy(), ticket
+
+    def guardar(self, ticket, resultado, tablas):
+        """Guarda un resultado si la base no cambió mientras se ejecutaba"""
+        clave, db, version = ticket
+        tamano = int(resultado.memory_usage(index=True, deep=True).sum())
+        if tamano > self.max_bytes:
+            return
+        with self._lock:
+            if self._data_version(db) != version:
+                return
+            self._eliminar(clave)
+            self._entradas[clave] = {
+                "resultado": resultado.copy(),
+                "bytes": tamano,
+                "tablas": sorted(tablas),
+                "data_version": version,
+                "firma": self._firma(db, tablas),
+            }
+            self._bytes += tamano
+            while self._bytes > self.max_bytes:
+                self._eliminar(next(iter(self._entradas)))
+
+    def _eliminar(self, clave):
+        entrada = self._entradas.pop(clave, None)
+        if entrada is not None:
+            self._bytes -= entrada["bytes"]
+
+    def limpiar(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        """Resumen de uso de la caché"""
+        total = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "mb": round(self._bytes / 1024 / 1024, 3),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / total, 3) if total else 0.0,
+        }
+
+    # -- persistencia --------------------------------------------------------
+
+    def persistir(self, ruta=None):
+        """Guarda a disco las entradas validables por contadores de tabla"""
+        ruta = ruta or self.ruta_persistencia
+        with self._lock:
+            validables = {clave: {**entrada, "data_version": None}
+                          for clave, entrada in self._entradas.items() if entrada["firma"] is not None}
+        with open(ruta, "wb") as f:
+            pickle.dump(validables, f)
+        return len(validables)
+
+    def cargar(self, ruta=None):
+        """Carga entradas persistidas; se revalidan por firma en el primer uso"""
+        with open(ruta or self.ruta_persistencia, "rb") as f:
+            entradas = pickle.load(f)
+        with self._lock:
+            for clave, entrada in entradas.items():
+                self._eliminar(clave)
+                self._entradas[clave] = entrada
+                self._bytes += entrada["bytes"]
+            while self._bytes > self.max_bytes:
+                self._eliminar(next(iter(self._entradas)))
+        return len(entradas)
+
+    def cerrar(self):
+        """Cierra las conexiones observadoras (y persiste si hay ruta)"""
+        if self.ruta_persistencia:
+            self.persistir()
+        for observador in self._observadores.values():
+            observador.close()
+        self._observadores.clear()
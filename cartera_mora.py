@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏰ MORA Y PROVISIONES DE LA CARTERA (CIERRE DIARIO)
+==================================================
+
+Calcula a una fecha de corte los días de mora de cada préstamo, su tramo
+de vencimiento y la provisión requerida, y los escribe en `prestamos`
+con actualizaciones masivas (set-based), sin recorrer préstamos en Python.
+
+Días de mora: el plan de cuotas (`cuotas_prestamo`, ver amortizacion.py)
+dice cuánto capital debería quedar tras cada cuota. La primera cuota
+impaga es la primera cuyo saldo_final está por debajo del saldo_capital
+actual del préstamo; si venció antes del corte, los días de mora son los
+transcurridos desde su vencimiento.
+
+Provisión = saldo_capital × tasa del tramo (TASAS_PROVISION, configurable).
+Solo se reescriben los préstamos cuyo valor cambia (y se marca
+updated_at); los triggers de kpis_bancarios anotan esos cambios para
+recalcular la morosidad del último periodo.
+
+Cada corrida queda en cartera_mora_ejecuciones con sus tiempos por fase
+y en cartera_mora_resumen con el resumen por tramo.
+
+Uso:
+    python cartera_mora.py                          # corte = hoy
+    python cartera_mora.py --fecha-corte 2024-12-31
+    python cartera_mora.py --tasas 0.01 0.04 0.15 0.35 1.0
+"""
+
+import argparse
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+from amortizacion import regenerar_cuotas
+from conexion_bd import DB_PATH, conectar_bd
+
+# (días mínimos de mora, tramo) en orden ascendente
+TRAMOS_MORA = [
+    (0, "0"),
+    (1, "1-30"),
+    (31, "31-60"),
+    (61, "61-90"),
+    (91, ">90"),
+]
+TASAS_PROVISION = {
+    "0": 0.01,
+    "1-30": 0.032,
+    "31-60": 0.10,
+    "61-90": 0.20,
+    ">90": 1.00,
+}
+
+SQL_TABLAS = """
+CREATE TABLE IF NOT EXISTS cartera_mora_ejecuciones (
+    ejecucion_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha_corte DATE NOT NULL,
+    inicio TIMESTAMP NOT NULL,
+    prestamos INTEGER,
+    prestamos_actualizados INTEGER,
+    provision_total DECIMAL(18,2),
+    ms_cuotas REAL,
+    ms_calculo REAL,
+    ms_actualizacion REAL,
+    ms_total REAL,
+    tasas TEXT
+);
+CREATE TABLE IF NOT EXISTS cartera_mora_resumen (
+    ejecucion_id INTEGER NOT NULL,
+    tramo VARCHAR(10) NOT NULL,
+    prestamos INTEGER,
+    saldo_capital DECIMAL(18,2),
+    provision DECIMAL(18,2),
+    PRIMARY KEY (ejecucion_id, tramo)
+);
+"""
+
+SQL_DIAS_MORA = """
+CREATE TEMP TABLE mora_calculada AS
+SELECT
+    p.prestamo_id,
+    p.saldo_capital,
+    COALESCE(CAST(julianday(:corte) - julianday(MIN(q.fecha_vencimiento)) AS INTEGER), 0) AS dias_mora
+FROM prestamos p
+LEFT JOIN cuotas_prestamo q
+    ON q.prestamo_id = p.prestamo_id
+    AND q.fecha_vencimiento < :corte
+    AND q.saldo_final < p.saldo_capital - 0.005
+WHERE COALESCE(p.estado, '') <> 'CANCELADO'
+GROUP BY p.prestamo_id
+"""
+
+
+def sql_tramo(columna="dias_mora"):
+    """CASE que asigna el tramo de TRAMOS_MORA a unos días de mora"""
+    ramas = "\n".join(f"        WHEN {columna} >= {minimo} THEN '{tramo}'"
+                      for minimo, tramo in reversed(TRAMOS_MORA[1:]))
+    return f"CASE\n{ramas}\n        ELSE '{TRAMOS_MORA[0][1]}'\n    END"
+
+
+def sql_tasa(tasas, columna="dias_mora"):
+    """CASE con la tasa de provisión del tramo"""
+    ramas = "\n".join(f"        WHEN {columna} >= {minimo} THEN {float(tasas[tramo])}"
+                      for minimo, tramo in reversed(TRAMOS_MORA[1:]))
+    return f"CASE\n{ramas}\n        ELSE {float(tasas[TRAMOS_MORA[0][1]])}\n    END"
+
+
+def procesar_mora(conn, fecha_corte=None, tasas=None):
+    """Calcula mora y provisiones al corte y las escribe; devuelve el resumen por tramo"""
+    fecha_corte = fecha_corte or date.today().isoformat()
+    tasas = {**TASAS_PROVISION, **(tasas or {})}
+    conn.executescript(SQL_TABLAS)
+    inicio_ejecucion = datetime.now().isoformat(timespec="seconds")
+    t0 = time.perf_counter()
+
+    # El plan de cuotas es la fuente de los vencimientos: se pone al día primero
+    regenerar_cuotas(conn)
+    t1 = time.perf_counter()
+
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS temp.mora_calculada")
+        conn.execute(SQL_DIAS_MORA, {"corte": fecha_corte})
+        conn.execute("CREATE UNIQUE INDEX temp.idx_mora_calculada ON mora_calculada(prestamo_id)")
+        t2 = time.perf_counter()
+
+        provision = f"ROUND(m.saldo_capital * {sql_tasa(tasas, 'm.dias_mora')}, 2)"
+        actualizados = conn.execute(f"""
+            UPDATE prestamos
+            SET dias_mora = m.dias_mora,
+                provision_requerida = {provision},
+                updated_at = CURRENT_TIMESTAMP
+            FROM temp.mora_calculada AS m
+            WHERE m.prestamo_id = prestamos.prestamo_id
+              AND (prestamos.dias_mora IS NOT m.dias_mora
+                   OR prestamos.provision_requerida IS NOT {provision})
+        """).rowcount
+        t3 = time.perf_counter()
+
+        cursor = conn.execute("""
+            INSERT INTO cartera_mora_ejecuciones
+                (fecha_corte, inicio, prestamos, prestamos_actualizados, provision_total,
+                 ms_cuotas, ms_calculo, ms_actualizacion, ms_total, tasas)
+            SELECT ?, ?, COUNT(*), ?, ROUND(SUM(p.provision_requerida), 2), ?, ?, ?, ?, ?
+            FROM temp.mora_calculada m JOIN prestamos p ON p.prestamo_id = m.prestamo_id
+        """, (fecha_corte, inicio_ejecucion, actualizados, round((t1 - t0) * 1000, 1),
+              round((t2 - t1) * 1000, 1), round((t3 - t2) * 1000, 1), round((t3 - t0) * 1000, 1), repr(tasas)))
+        ejecucion_id = cursor.lastrowid
+        conn.execute(f"""
+            INSERT INTO cartera_mora_resumen (ejecucion_id, tramo, prestamos, saldo_capital, provision)
+            SELECT ?, {sql_tramo('m.dias_mora')}, COUNT(*), ROUND(SUM(p.saldo_capital), 2),
+                   ROUND(SUM(p.provision_requerida), 2)
+            FROM temp.mora_calculada m JOIN prestamos p ON p.prestamo_id = m.prestamo_id
+            GROUP BY 2
+        """, (ejecucion_id,))
+        conn.execute("DROP TABLE temp.mora_calculada")
+
+    print(f"⏰ Corte {fecha_corte}: {actualizados:,} préstamos actualizados en {(t3 - t0):.2f} s "
+          f"(cuotas {t1 - t0:.2f} · cálculo {t2 - t1:.2f} · actualización {t3 - t2:.2f})")
+    return resumen_ejecucion(conn, ejecucion_id)
+
+
+def resumen_ejecucion(conn, ejecucion_id=None):
+    """Resumen por tramo de una corrida (la última por defecto)"""
+    if ejecucion_id is None:
+        ejecucion_id = conn.execute("SELECT MAX(ejecucion_id) FROM cartera_mora_ejecuciones").fetchone()[0]
+    orden = {tramo: i for i, (_, tramo) in enumerate(TRAMOS_MORA)}
+    resumen = pd.read_sql_query(
+        "SELECT tramo, prestamos, saldo_capital, provision FROM cartera_mora_resumen WHERE ejecucion_id = ?",
+        conn, params=(ejecucion_id,))
+    return resumen.sort_values("tramo", key=lambda tramos: tramos.map(orden)).reset_index(drop=True)
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Calcula mora, tramos y provisiones de la cartera")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--fecha-corte", default=date.today().isoformat(), help="Fecha de corte (YYYY-MM-DD)")
+    parser.add_argument("--tasas", nargs=len(TRAMOS_MORA), type=float, metavar="TASA",
+                        help=f"Tasas de provisión para los tramos {', '.join(t for _, t in TRAMOS_MORA)}")
+    args = parser.parse_args(argv)
+
+    tasas = dict(zip((tramo for _, tramo in TRAMOS_MORA), args.tasas)) if args.tasas else None
+    conn = conectar_bd(args.db, perfil="escritura")
+    resumen = procesar_mora(conn, args.fecha_corte, tasas)
+    conn.close()
+
+    print()
+    print("📊 CARTERA POR TRAMO DE MORA:")
+    print("-" * 50)
+    print(resumen)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📚 CATÁLOGO DEL ESQUEMA
+=======================
+
+Tablas, vistas, columnas, índices y llaves foráneas de la base en una
+sola consulta: sqlite_schema unido con las funciones pragma_table_info,
+pragma_index_list (+ pragma_index_xinfo) y pragma_foreign_key_list, en
+vez de un PRAGMA table_info por tabla.
+
+El resultado se guarda en memoria por archivo y PRAGMA schema_version
+(SQLite lo incrementa con cada CREATE / ALTER / DROP), así que las
+llamadas repetidas solo cuestan ese PRAGMA hasta que cambie el esquema.
+
+    from catalogo_esquema import catalogo, columnas
+    columnas(conn, "clientes")            # ['cliente_id', 'numero_documento', ...]
+    catalogo(conn)["cuentas"]["llaves_foraneas"]
+
+El catálogo devuelto es compartido: no lo modifiques.
+
+Uso:
+    python catalogo_esquema.py                      # todas las tablas y vistas
+    python catalogo_esquema.py --tablas clientes cuentas
+"""
+
+import argparse
+import threading
+
+import pandas as pd
+
+from cache_consultas import archivo_bd
+from conexion_bd import DB_PATH, conectar_bd
+
+# Una fila por columna, índice o llave foránea; "detalle" depende de la clase
+SQL_CATALOGO = """
+SELECT m.name AS tabla, m.type AS tipo_objeto, 'columna' AS clase, c.cid AS orden,
+       c.name AS nombre, c.type AS tipo, c."notnull" AS no_nulo, c.dflt_value AS defecto,
+       c.pk AS pk, NULL AS unico, NULL AS detalle, NULL AS referencia
+FROM sqlite_schema AS m
+JOIN pragma_table_info(m.name) AS c
+WHERE m.type IN ('table', 'view') AND m.name NOT LIKE 'sqlite_%'
+
+UNION ALL
+
+SELECT m.name, m.type, 'indice', i.seq,
+       i.name, NULL, NULL, NULL,
+       NULL, i."unique",
+       (SELECT group_concat(columna, ', ')
+        FROM (SELECT COALESCE(x.name, '<expresión>') || CASE WHEN x."desc" THEN ' DESC' ELSE '' END AS columna
+              FROM pragma_index_xinfo(i.name) AS x
+              WHERE x.key
+              ORDER BY x.seqno)),
+       i.origin || CASE WHEN i.partial THEN ' parcial' ELSE '' END
+FROM sqlite_schema AS m
+JOIN pragma_index_list(m.name) AS i
+WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+
+UNION ALL
+
+SELECT m.name, m.type, 'llave_foranea', f.id * 1000 + f.seq,
+       f."from", NULL, NULL, NULL,
+       NULL, NULL, f."to", f."table"
+FROM sqlite_schema AS m
+JOIN pragma_foreign_key_list(m.name) AS f
+WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+
+ORDER BY tabla, clase, orden
+"""
+
+_CACHE = {}
+_CANDADO = threading.Lock()
+
+
+def cargar_catalogo(conn):
+    """{tabla: {tipo, columnas, indices, llaves_foraneas}} leído con una sola consulta (sin caché)"""
+    esquema = {}
+    for (tabla, tipo_objeto, clase, _, nombre, tipo, no_nulo, defecto,
+         pk, unico, detalle, referencia) in conn.execute(SQL_CATALOGO):
+        entrada = esquema.setdefault(tabla, {"tipo": tipo_objeto, "columnas": [], "indices": [],
+                                             "llaves_foraneas": []})
+        if clase == "columna":
+            entrada["columnas"].append({"nombre": nombre, "tipo": tipo, "no_nulo": bool(no_nulo),
+                                        "defecto": defecto, "pk": pk})
+        elif clase == "indice":
+            entrada["indices"].append({"nombre": nombre, "columnas": detalle, "unico": bool(unico),
+                                       "origen": referencia})
+        else:
+            entrada["llaves_foraneas"].append({"columna": nombre, "tabla_referida": referencia,
+                                               "columna_referida": detalle})
+    return esquema
+
+
+def catalogo(conn):
+    """Catálogo del esquema, cacheado por archivo y PRAGMA schema_version"""
+    version = conn.execute("PRAGMA schema_version").fetchone()[0]
+    archivo = archivo_bd(conn)
+    if not archivo:
+        return cargar_catalogo(conn)  # :memory: no tiene un archivo que sirva de clave
+    with _CANDADO:
+        guardado = _CACHE.get(archivo)
+        if guardado and guardado[0] == version:
+            return guardado[1]
+    esquema = cargar_catalogo(conn)
+    with _CANDADO:
+        _CACHE[archivo] = (version, esquema)
+    return esquema
+
+
+def limpiar_cache():
+    with _CANDADO:
+        _CACHE.clear()
+
+
+def tablas(conn, incluir_vistas=False):
+    """Nombres de las tablas (y vistas) del usuario, en orden alfabético"""
+    return [nombre for nombre, datos in catalogo(conn).items()
+            if incluir_vistas or datos["tipo"] == "table"]
+
+
+def columnas(conn, tabla):
+    """Nombres de las columnas de una tabla o vista, en orden"""
+    esquema = catalogo(conn)
+    if tabla not in esquema:
+        raise ValueError(f"La tabla '{tabla}' no existe en la base de datos")
+    return [columna["nombre"] for columna in esquema[tabla]["columnas"]]
+
+
+def columnas_df(conn, tablas_elegidas=None):
+    """DataFrame tabla / columna / tipo / no_nulo / defecto / pk para mostrar en notebooks"""
+    filas = [{"tabla": tabla, **columna} for tabla, datos in catalogo(conn).items()
+             if not tablas_elegidas or tabla in tablas_elegidas
+             for columna in datos["columnas"]]
+    return pd.DataFrame(filas, columns=["tabla", "nombre", "tipo", "no_nulo", "defecto", "pk"])
+
+
+def mostrar_esquema(conn, tablas_elegidas=None):
+    """Imprime columnas, índices y llaves foráneas de cada tabla"""
+    for tabla, datos in catalogo(conn).items():
+        if tablas_elegidas and tabla not in tablas_elegidas:
+            continue
+        print(f"\n📋 {tabla.upper()}{' (vista)' if datos['tipo'] == 'view' else ''}:")
+        for columna in datos["columnas"]:
+            marcas = " 🔑" if columna["pk"] else ""
+            print(f"   • {columna['nombre']} ({columna['tipo']}){marcas}")
+        for indice in datos["indices"]:
+            print(f"   📇 {indice['nombre']}: {indice['columnas']}{' [único]' if indice['unico'] else ''}")
+        for llave in datos["llaves_foraneas"]:
+            print(f"   🔗 {llave['columna']} → {llave['tabla_referida']}({llave['columna_referida']})")
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Catálogo de tablas, columnas, índices y llaves foráneas")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--tablas", nargs="+", help="Solo estas tablas o vistas")
+    args = parser.parse_args(argv)
+
+    conn = conectar_bd(args.db, solo_lectura=True)
+    print("🏦 TABLAS Y SUS COLUMNAS:")
+    print("=" * 50)
+    mostrar_esquema(conn, args.tablas)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
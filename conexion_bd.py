@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔌 CONEXIÓN CENTRAL A LA BASE DE DATOS BANCARIA
+===============================================
+
+Todos los scripts se conectan a banking_core.db por aquí. La ruta se
+resuelve desde la raíz del proyecto (no depende del directorio actual) y
+cada conexión aplica un perfil de PRAGMAs según el tipo de trabajo:
+
+- analitico: lecturas pesadas (mmap, caché grande, temporales en memoria)
+- escritura: WAL + synchronous=NORMAL para escritores concurrentes
+- estandar:  valores por defecto de SQLite
+
+Para consultas repetidas (notebooks, reportes) usa el pool:
+
+    with conexion() as conn:
+        pd.read_sql_query("SELECT ...", conn)
+
+La conexión vuelve al pool al salir del bloque y conserva su caché de
+páginas caliente para la siguiente consulta.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty, LifoQueue
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent
+DB_PATH = RAIZ_PROYECTO / "data" / "banking_core.db"
+
+PERFILES = {
+    "estandar": {
+        "busy_timeout": 5000,
+    },
+    "analitico": {
+        "busy_timeout": 5000,
+        "mmap_size": 1024 * 1024 * 1024,   # 1 GB mapeado en memoria
+        "cache_size": -256 * 1024,         # 256 MB (negativo = KiB)
+        "temp_store": "MEMORY",
+    },
+    "escritura": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64 * 1024,          # 64 MB
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def aplicar_perfil(conn, perfil, solo_lectura=False):
+    """Aplica los PRAGMAs de un perfil a una conexión abierta"""
+    if perfil not in PERFILES:
+        raise ValueError(f"Perfil desconocido '{perfil}'. Opciones: {', '.join(PERFILES)}")
+    for pragma, valor in PERFILES[perfil].items():
+        if solo_lectura and pragma == "journal_mode":
+            continue  # el modo de journal se guarda en el archivo: no se puede cambiar en solo lectura
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+
+def conectar_bd(db_path=DB_PATH, perfil="analitico", solo_lectura=False, check_same_thread=True):
+    """Abre una conexión nueva con el perfil indicado.
+
+    Con solo_lectura=True se abre con la URI mode=ro: varias de estas
+    conexiones pueden leer en paralelo sin bloquear a nadie.
+    """
+    if solo_lectura:
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+    return aplicar_perfil(conn, perfil, solo_lectura)
+
+
+class PoolConexiones:
+    """Pool de conexiones reutilizables para un archivo y un perfil.
+
+    Se entrega primero la conexión usada más recientemente (LIFO), que es
+    la que tiene la caché de páginas más caliente.
+    """
+
+    def __init__(self, db_path=DB_PATH, perfil="analitico", tamano=4, solo_lectura=False):
+        self.db_path = db_path
+        self.perfil = perfil
+        self.tamano = tamano
+        self.solo_lectura = solo_lectura
+        self._libres = LifoQueue()
+        self._creadas = 0      # conexiones abiertas: libres + prestadas
+        self._cerrado = False
+        self._lock = threading.Lock()
+
+    def _tomar(self):
+        while True:
+            try:
+                return self._libres.get_nowait()
+            except Empty:
+                pass
+            with self._lock:
+                if self._creadas < self.tamano:
+                    self._creadas += 1
+                    return conectar_bd(self.db_path, self.perfil, self.solo_lectura, check_same_thread=False)
+            # Pool lleno: espera a que se libere una. Con el pool cerrado las prestadas
+            # no vuelven a la cola sino que liberan cupo, por eso se reintenta
+            try:
+                return self._libres.get(timeout=0.1)
+            except Empty:
+                pass
+
+    def _devolver(self, conn):
+        with self._lock:
+            if not self._cerrado:
+                self._libres.put(conn)
+                return
+            self._creadas -= 1
+        conn.close()  # prestada cuando se cerró el pool
+
+    @contextmanager
+    def conexion(self):
+        """Presta una conexión del pool durante el bloque with"""
+        conn = self._tomar()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()  # no devolver al pool una transacción a medias
+            self._devolver(conn)
+
+    def cerrar(self):
+        """Cierra las conexiones libres; las prestadas se cierran al devolverse"""
+        with self._lock:
+            self._cerrado = True
+            while True:
+                try:
+                    conn = self._libres.get_nowait()
+                except Empty:
+                    break
+                self._creadas -= 1
+                conn.close()
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def obtener_pool(db_path=DB_PATH, perfil="analitico", solo_lectura=False, tamano=4):
+    """Devuelve el pool compartido para (archivo, perfil, modo), creándolo si hace falta"""
+    clave = (str(Path(db_path).resolve()), perfil, solo_lectura)
+    with _POOLS_LOCK:
+        if clave not in _POOLS:
+            _POOLS[clave] = PoolConexiones(db_path, perfil, tamano, solo_lectura)
+        return _POOLS[clave]
+
+
+@contextmanager
+def conexion(perfil="analitico", db_path=DB_PATH, solo_lectura=False):
+    """Atajo: presta una conexión del pool compartido"""
+    with obtener_pool(db_path, perfil, solo_lectura).conexion() as conn:
+        yield conn
+
+
+def cerrar_pools():
+    """Cierra todas las conexiones de todos los pools compartidos"""
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.cerrar()
+        _POOLS.clear()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧊 CUBO DE TRANSACCIONES (ROLLUP PREAGREGADO)
+=============================================
+
+Tabla `cubo_transacciones` con el grano más fino de los reportes:
+segmento_cliente × ciudad × canal × mes, y por cada celda el número de
+transacciones, la suma, el mínimo y el máximo del monto.
+
+Cualquier agrupación más gruesa se responde desde el cubo (sumas de
+sumas, mínimo de mínimos...) sin tocar `transacciones`:
+
+    from cubo_transacciones import consultar_cubo
+    consultar_cubo(conn, por=["ciudad"])
+    consultar_cubo(conn, por=["segmento_cliente", "mes"], filtros={"canal": "ONLINE"})
+
+El refresco es incremental: solo agrega las transacciones con
+transaccion_id mayor al último procesado y las suma a sus celdas (UPSERT).
+El segmento y la ciudad son los del cliente al momento de agregar; si se
+re-segmenta a los clientes o se corrigen transacciones antiguas, usa
+`reconstruir`.
+
+Uso:
+    python cubo_transacciones.py                 # refresco incremental
+    python cubo_transacciones.py reconstruir
+    python cubo_transacciones.py consultar --por ciudad canal
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from conexion_bd import DB_PATH, conectar_bd
+
+DIMENSIONES = ("segmento_cliente", "ciudad", "canal", "mes")
+SIN_DATO = "Sin dato"
+
+SQL_TABLAS = """
+CREATE TABLE IF NOT EXISTS cubo_transacciones (
+    segmento_cliente VARCHAR(50) NOT NULL,
+    ciudad VARCHAR(50) NOT NULL,
+    canal VARCHAR(20) NOT NULL,
+    mes VARCHAR(7) NOT NULL,              -- YYYY-MM
+    transacciones INTEGER NOT NULL,
+    monto_total DECIMAL(18,2) NOT NULL,
+    monto_min DECIMAL(15,2),
+    monto_max DECIMAL(15,2),
+    PRIMARY KEY (segmento_cliente, ciudad, canal, mes)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cubo_control (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Las celdas que ya existen se combinan con las nuevas (UPSERT)
+SQL_REFRESCAR = f"""
+INSERT INTO cubo_transacciones
+    (segmento_cliente, ciudad, canal, mes, transacciones, monto_total, monto_min, monto_max)
+SELECT
+    COALESCE(c.segmento_cliente, '{SIN_DATO}'),
+    COALESCE(c.ciudad, '{SIN_DATO}'),
+    COALESCE(t.canal, '{SIN_DATO}'),
+    strftime('%Y-%m', t.fecha_transaccion),
+    COUNT(*),
+    SUM(t.monto),
+    MIN(t.monto),
+    MAX(t.monto)
+FROM transacciones t
+LEFT JOIN cuentas cu ON cu.cuenta_id = t.cuenta_id
+LEFT JOIN clientes c ON c.cliente_id = cu.cliente_id
+WHERE t.transaccion_id > :ultimo_id AND t.transaccion_id <= :hasta_id
+GROUP BY 1, 2, 3, 4
+ORDER BY 1, 2, 3, 4
+ON CONFLICT (segmento_cliente, ciudad, canal, mes) DO UPDATE SET
+    transacciones = transacciones + excluded.transacciones,
+    monto_total = monto_total + excluded.monto_total,
+    monto_min = MIN(monto_min, excluded.monto_min),
+    monto_max = MAX(monto_max, excluded.monto_max)
+"""
+
+
+def crear_tablas(conn):
+    """Crea el cubo y su tabla de control si no existen"""
+    conn.executescript(SQL_TABLAS)
+
+
+def ultimo_procesado(conn):
+    """transaccion_id más alto ya agregado en el cubo"""
+    fila = conn.execute("SELECT valor FROM cubo_control WHERE clave = 'ultimo_transaccion_id'").fetchone()
+    return int(fila[0]) if fila else 0
+
+
+def refrescar_cubo(conn, reconstruir=False):
+    """Agrega al cubo las transacciones nuevas; devuelve (transacciones, segundos)"""
+    crear_tablas(conn)
+    inicio = time.perf_counter()
+    with conn:
+        if reconstruir:
+            conn.execute("DELETE FROM cubo_transacciones")
+            conn.execute("DELETE FROM cubo_control")
+        ultimo_id = ultimo_procesado(conn)
+        # Tope fijo: lo que llegue durante el refresco queda para el siguiente
+        hasta_id = conn.execute("SELECT COALESCE(MAX(transaccion_id), 0) FROM transacciones").fetchone()[0]
+        nuevas = conn.execute("SELECT COUNT(*) FROM transacciones WHERE transaccion_id > ? AND transaccion_id <= ?",
+                              (ultimo_id, hasta_id)).fetchone()[0]
+        if nuevas:
+            conn.execute(SQL_REFRESCAR, {"ultimo_id": ultimo_id, "hasta_id": hasta_id})
+            conn.execute("INSERT OR REPLACE INTO cubo_control (clave, valor) VALUES ('ultimo_transaccion_id', ?)",
+                         (str(hasta_id),))
+    segundos = time.perf_counter() - inicio
+    celdas = conn.execute("SELECT COUNT(*) FROM cubo_transacciones").fetchone()[0]
+    print(f"🧊 Cubo: {nuevas:,} transacciones nuevas agregadas en {segundos:.2f} s ({celdas:,} celdas)")
+    return nuevas, segundos
+
+
+def sql_cubo(por, filtros=None):
+    """Arma la consulta sobre el cubo para una agrupación y filtros de igualdad"""
+    por = list(por)
+    filtros = filtros or {}
+    desconocidas = [d for d in [*por, *filtros] if d not in DIMENSIONES]
+    if desconocidas:
+        raise ValueError(f"Dimensiones desconocidas: {desconocidas}. Opciones: {', '.join(DIMENSIONES)}")
+
+    condiciones, params = [], []
+    for dimension, valor in filtros.items():
+        valores = list(valor) if isinstance(valor, (list, tuple, set)) else [valor]
+        condiciones.append(f"{dimension} IN ({', '.join('?' * len(valores))})")
+        params.extend(valores)
+
+    columnas = ", ".join(por)
+    consulta = f"""
+    SELECT
+        {columnas + ',' if por else ''}
+        SUM(transacciones) AS transacciones,
+        ROUND(SUM(monto_total), 2) AS monto_total,
+        ROUND(1.0 * SUM(monto_total) / SUM(transacciones), 2) AS monto_promedio,
+        MIN(monto_min) AS monto_min,
+        MAX(monto_max) AS monto_max
+    FROM cubo_transacciones
+    {'WHERE ' + ' AND '.join(condiciones) if condiciones else ''}
+    {'GROUP BY ' + columnas if por else ''}
+    {'ORDER BY ' + columnas if por else ''}
+    """
+    return consulta, params
+
+
+def consultar_cubo(conn, por=(), filtros=None):
+    """Responde una agrupación por cualquier subconjunto de DIMENSIONES desde el cubo"""
+    consulta, params = sql_cubo(por, filtros)
+    return pd.read_sql_query(consulta, conn, params=params)
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Mantiene y consulta el cubo de transacciones")
+    parser.add_argument("accion", nargs="?", default="refrescar", choices=["refrescar", "reconstruir", "consultar"])
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--por", nargs="*", default=["segmento_cliente"], choices=DIMENSIONES,
+                        help="Dimensiones de la agrupación para 'consultar'")
+    args = parser.parse_args(argv)
+
+    if args.accion == "consultar":
+        conn = conectar_bd(args.db, solo_lectura=True)
+        print(f"🧊 Transacciones por {', '.join(args.por) or 'total'}:")
+        print("-" * 60)
+        print(consultar_cubo(conn, args.por))
+    else:
+        conn = conectar_bd(args.db, perfil="escritura")
+        refrescar_cubo(conn, reconstruir=args.accion == "reconstruir")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
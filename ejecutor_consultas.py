@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ EJECUTOR DE CONSULTAS INSTRUMENTADO
+======================================
+
+Versión compartida de `ejecutar_consulta` para todos los scripts de práctica.
+Cada ejecución queda en REGISTRO con:
+
+- tiempo de ejecución (hasta la primera fila), de fetch y de armado del DataFrame
+- número de filas y columnas
+- plan de ejecución (EXPLAIN QUERY PLAN) si se pide
+- el error de SQLite, si la consulta falló
+
+ejecutar_lote() corre varias consultas independientes en paralelo con
+conexiones de solo lectura.
+
+Para resultados grandes, consulta_por_bloques() y agregar_por_bloques()
+leen el cursor por bloques con memoria acotada.
+
+Con activar_cache() los resultados de lectura se sirven desde una caché
+invalidada por cambios en la base (ver cache_consultas.py).
+
+Variables de entorno útiles sin tocar los scripts:
+    CAPTURAR_PLANES=1                 captura el plan de todas las consultas
+    REGISTRO_CONSULTAS=registro.json  vuelca el registro a JSON al terminar
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+
+import pandas as pd
+
+from cache_consultas import CacheResultados, tablas_leidas
+from conexion_bd import DB_PATH, conectar_bd, obtener_pool
+
+REGISTRO = []
+CAPTURAR_PLANES = os.environ.get("CAPTURAR_PLANES") == "1"
+CACHE = None
+
+
+def activar_cache(max_mb=256, ruta_persistencia=None):
+    """Activa la caché de resultados para todas las llamadas a ejecutar_consulta"""
+    global CACHE
+    CACHE = CacheResultados(int(max_mb * 1024 * 1024), ruta_persistencia)
+    return CACHE
+
+
+def desactivar_cache():
+    """Desactiva la caché (persistiéndola si tenía ruta)"""
+    global CACHE
+    if CACHE is not None:
+        CACHE.cerrar()
+    CACHE = None
+
+
+def plan_consulta(conn, consulta, params=None):
+    """Devuelve las líneas de EXPLAIN QUERY PLAN de una consulta"""
+    filas = conn.execute(f"EXPLAIN QUERY PLAN {consulta}", params or ()).fetchall()
+    return [detalle for *_, detalle in filas]
+
+
+def _medir_consulta(conn, consulta, titulo, params=None, capturar_plan=None, usar_cache=True):
+    """Ejecuta y mide una consulta; devuelve (DataFrame o None, entrada del registro)"""
+    if capturar_plan is None:
+        capturar_plan = CAPTURAR_PLANES
+    entrada = {
+        "titulo": titulo,
+        "sql": consulta.strip(),
+        "params": list(params) if isinstance(params, (list, tuple)) else params,
+        "inicio": datetime.now().isoformat(timespec="milliseconds"),
+    }
+
+    try:
+        t0 = time.perf_counter()
+        cache = CACHE if usar_cache else None
+        resultado, ticket = cache.buscar(conn, consulta, params) if cache else (None, None)
+        if resultado is not None:
+            entrada.update({"cache": "acierto", "ms_total": round((time.perf_counter() - t0) * 1000, 3),
+                            "filas": len(resultado), "columnas": len(resultado.columns)})
+        else:
+            with tablas_leidas(conn) if ticket else nullcontext(set()) as tablas:
+                cursor = conn.execute(consulta, params or ())
+            t1 = time.perf_counter()
+            filas = cursor.fetchall()
+            t2 = time.perf_counter()
+            columnas = [descripcion[0] for descripcion in cursor.description or ()]
+            resultado = pd.DataFrame.from_records(filas, columns=columnas)
+            t3 = time.perf_counter()
+            if ticket and cursor.description is not None:
+                cache.guardar(ticket, resultado, tablas)
+                entrada["cache"] = "fallo"
+            entrada.update({
+                "ms_ejecucion": round((t1 - t0) * 1000, 3),
+                "ms_fetch": round((t2 - t1) * 1000, 3),
+                "ms_dataframe": round((t3 - t2) * 1000, 3),
+                "ms_total": round((t3 - t0) * 1000, 3),
+                "filas": len(resultado),
+                "columnas": len(columnas),
+            })
+        if capturar_plan:
+            entrada["plan"] = plan_consulta(conn, consulta, params)
+    except sqlite3.Error as e:
+        entrada["error"] = f"{type(e).__name__}: {e}"
+        resultado = None
+    REGISTRO.append(entrada)
+    return resultado, entrada
+
+
+def mostrar_resultado(resultado, entrada):
+    """Imprime un resultado con su línea de métricas"""
+    titulo = entrada["titulo"]
+    if "error" in entrada:
+        print(f"❌ Error en la consulta '{titulo}': {entrada['error']}")
+        print()
+        return
+    print(f"✅ {titulo}:")
+    print("-" * 60)
+    print(resultado)
+    if entrada.get("cache") == "acierto":
+        detalle = "desde caché"
+    else:
+        detalle = (f"ejecución {entrada['ms_ejecucion']:.1f} · fetch {entrada['ms_fetch']:.1f} · "
+                   f"DataFrame {entrada['ms_dataframe']:.1f}")
+    print(f"📊 Total de registros: {len(resultado)} · ⏱️ {entrada['ms_total']:.1f} ms ({detalle})")
+    for linea in entrada.get("plan", []):
+        print(f"   🧭 {linea}")
+    print()
+
+
+def ejecutar_consulta(conn, consulta, titulo="Resultado", params=None, capturar_plan=None,
+                      mostrar=True, usar_cache=True):
+    """Ejecuta una consulta SQL, registra sus métricas y muestra el resultado.
+
+    Devuelve el DataFrame, o None si SQLite reporta un error (el error
+    queda en el registro).
+    """
+    resultado, entrada = _medir_consulta(conn, consulta, titulo, params, capturar_plan, usar_cache)
+    if mostrar or "error" in entrada:
+        mostrar_resultado(resultado, entrada)
+    return resultado
+
+
+def _consulta_en_proceso(db_path, titulo, consulta, params):
+    """Trabajo de un proceso del lote: conexión propia de solo lectura"""
+    conn = conectar_bd(db_path, solo_lectura=True)
+    try:
+        return _medir_consulta(conn, consulta, titulo, params, usar_cache=False)
+    finally:
+        conn.close()
+
+
+def ejecutar_lote(consultas, db_path=DB_PATH, max_workers=None, modo="hilos", mostrar=True):
+    """Ejecuta consultas independientes de solo lectura en paralelo.
+
+    consultas: lista de (titulo, sql) o (titulo, sql, params).
+    modo="hilos" usa conexiones mode=ro del pool (SQLite libera el GIL
+    mientras ejecuta); modo="procesos" abre una conexión por proceso.
+    Devuelve [(titulo, DataFrame o None)] en el mismo orden de entrada; el
+    tiempo total queda cerca del de la consulta más lenta.
+    """
+    trabajos = [(c[0], c[1], c[2] if len(c) > 2 else None) for c in consultas]
+    max_workers = max_workers or min(len(trabajos), os.cpu_count() or 1) or 1
+    inicio = time.perf_counter()
+
+    if modo == "procesos":
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futuros = [pool.submit(_consulta_en_proceso, db_path, titulo, sql, params)
+                       for titulo, sql, params in trabajos]
+            salidas = [futuro.result() for futuro in futuros]
+        REGISTRO.extend(entrada for _, entrada in salidas)
+    elif modo == "hilos":
+        pool_bd = obtener_pool(db_path, solo_lectura=True, tamano=max_workers)
+
+        def trabajo(titulo, sql, params):
+            with pool_bd.conexion() as conn:
+                return _medir_consulta(conn, sql, titulo, params)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            salidas = list(pool.map(lambda t: trabajo(*t), trabajos))
+    else:
+        raise ValueError("modo debe ser 'hilos' o 'procesos'")
+
+    total_ms = (time.perf_counter() - inicio) * 1000
+    if mostrar:
+        for resultado, entrada in salidas:
+            mostrar_resultado(resultado, entrada)
+        suma_ms = sum(entrada.get("ms_total", 0) for _, entrada in salidas)
+        lenta = max(salidas, key=lambda s: s[1].get("ms_total", 0))[1]
+        print(f"⚡ Lote de {len(salidas)} consultas ({modo}, {max_workers} workers): {total_ms:.1f} ms "
+              f"(suma secuencial {suma_ms:.1f} ms · más lenta '{lenta['titulo']}' {lenta.get('ms_total', 0):.1f} ms)")
+        print()
+    return [(entrada["titulo"], resultado) for resultado, entrada in salidas]
+
+
+def consulta_por_bloques(conn, consulta, params=None, tamano_bloque=50_000, titulo="Consulta por bloques",
+                         como_dataframe=True):
+    """Genera el resultado en bloques de a lo sumo tamano_bloque filas.
+
+    Lee del cursor con fetchmany, así la memoria depende del tamaño del
+    bloque y no del total de filas (por ejemplo EJERCICIO 16 sin LIMIT
+    sobre todo transacciones). Con como_dataframe=False entrega listas de
+    tuplas. Al agotarse el generador la ejecución queda en REGISTRO.
+    """
+    entrada = {
+        "titulo": titulo,
+        "sql": consulta.strip(),
+        "params": list(params) if isinstance(params, (list, tuple)) else params,
+        "inicio": datetime.now().isoformat(timespec="milliseconds"),
+        "modo": "bloques",
+    }
+    t0 = time.perf_counter()
+    cursor = conn.execute(consulta, params or ())
+    columnas = [descripcion[0] for descripcion in cursor.description or ()]
+    filas_total = bloques = 0
+    try:
+        while True:
+            filas = cursor.fetchmany(tamano_bloque)
+            if not filas:
+                break
+            filas_total += len(filas)
+            bloques += 1
+            yield pd.DataFrame.from_records(filas, columns=columnas) if como_dataframe else filas
+    finally:
+        cursor.close()
+        entrada.update({
+            "ms_total": round((time.perf_counter() - t0) * 1000, 3),
+            "filas": filas_total,
+            "columnas": len(columnas),
+            "bloques": bloques,
+        })
+        REGISTRO.append(entrada)
+
+
+# Estadísticos parciales que necesita cada agregación y cómo se combinan entre bloques
+_PARCIALES = {"sum": ("sum",), "count": ("count",), "min": ("min",), "max": ("max",), "mean": ("sum", "count")}
+_COMBINAR = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def agregar_por_bloques(conn, consulta, por, agregaciones, params=None, tamano_bloque=50_000,
+                        titulo="Agregación por bloques"):
+    """GROUP BY en pandas sobre una consulta leída por bloques, con memoria acotada.
+
+    agregaciones: {"columna_salida": ("columna", "sum" | "count" | "min" | "max" | "mean")}
+
+    Cada bloque se reduce a estadísticos parciales por grupo y se combina
+    con lo acumulado, así solo se guarda una fila por grupo. Ejemplo:
+
+        agregar_por_bloques(conn, "SELECT canal, monto FROM transacciones", ["canal"],
+                            {"total": ("monto", "sum"), "promedio": ("monto", "mean")})
+    """
+    for _, funcion in agregaciones.values():
+        if funcion not in _PARCIALES:
+            raise ValueError(f"Agregación no soportada: {funcion} (usa {', '.join(_PARCIALES)})")
+    por = list(por) or ["_total"]
+    parciales = sorted({(columna, parcial) for columna, funcion in agregaciones.values()
+                        for parcial in _PARCIALES[funcion]})
+    nombres = {par: f"{par[0]}__{par[1]}" for par in parciales}
+
+    acumulado = None
+    for bloque in consulta_por_bloques(conn, consulta, params, tamano_bloque, titulo):
+        if por == ["_total"]:
+            bloque = bloque.assign(_total=0)
+        parcial = bloque.groupby(por, dropna=False).agg(**{nombres[par]: par for par in parciales})
+        if acumulado is not None:
+            parcial = pd.concat([acumulado, parcial]).groupby(level=por, dropna=False).agg(
+                {nombres[par]: _COMBINAR[par[1]] for par in parciales})
+        acumulado = parcial
+
+    if acumulado is None:
+        return pd.DataFrame(columns=[c for c in por if c != "_total"] + list(agregaciones))
+    resultado = pd.DataFrame(index=acumulado.index)
+    for salida, (columna, funcion) in agregaciones.items():
+        if funcion == "mean":
+            resultado[salida] = acumulado[f"{columna}__sum"] / acumulado[f"{columna}__count"]
+        else:
+            resultado[salida] = acumulado[f"{columna}__{funcion}"]
+    resultado = resultado.reset_index()
+    return resultado.drop(columns=["_total"]) if por == ["_total"] else resultado
+
+
+def resumen_registro():
+    """Registro como DataFrame, de la consulta más lenta a la más rápida"""
+    if not REGISTRO:
+        return pd.DataFrame()
+    resumen = pd.DataFrame(REGISTRO)
+    if "ms_total" in resumen:
+        resumen = resumen.sort_values("ms_total", ascending=False, na_position="first")
+    return resumen.reset_index(drop=True)
+
+
+def volcar_registro(ruta):
+    """Guarda el registro completo en un archivo JSON"""
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(REGISTRO, f, ensure_ascii=False, indent=2, default=str)
+    print(f"💾 Registro de {len(REGISTRO)} consultas guardado en {ruta}")
+
+
+def limpiar_registro():
+    """Vacía el registro en memoria"""
+    REGISTRO.clear()
+
+
+if os.environ.get("REGISTRO_CONSULTAS"):
+    atexit.register(lambda: volcar_registro(os.environ["REGISTRO_CONSULTAS"]))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🪞 ESPEJO PARQUET PARA ANALÍTICA
+================================
+
+Exporta `transacciones`, `cuentas` y `prestamos` a archivos Parquet
+particionados por mes (estilo Hive: data/parquet/<tabla>/mes=2024-01/...)
+para que los notebooks lean columnas enteras sin pasar por
+pd.read_sql_query, que arma un objeto Python por valor.
+
+Exportación incremental: cada tabla guarda en _espejo.json la última
+llave exportada y solo se anexan las filas nuevas, en bloques cuyo archivo
+se llama por su primera llave (bloque-<llave>-<i>.parquet, único y
+repetible). El manifiesto se actualiza después de escribir cada bloque;
+los archivos de un bloque que quedó a medias (llave mayor que la del
+manifiesto) se borran al empezar la siguiente exportación.
+
+cuentas y prestamos se modifican en el lugar: el manifiesto guarda una
+firma (hash de las filas ya exportadas) y, si la tabla tiene contador en
+contadores_cambios (cache_consultas.instalar_contadores), su versión. Si
+la versión cambió, o no hay contador, se recalcula la firma; si no
+coincide (alguna fila se modificó o se borró) la tabla se reescribe
+completa. transacciones es de solo anexar: no se detectan borrados ni
+modificaciones de filas ya exportadas (usa --completo).
+
+Lectura con cargar() / cargar_numpy(): los archivos se abren con memory
+map, solo se leen las columnas pedidas (proyección) y los filtros se
+empujan al escaneo: el rango de fechas descarta particiones de mes
+completas y el resto de filtros usa las estadísticas de cada row group.
+
+    df = cargar("transacciones", columnas=["cuenta_id", "monto"],
+                desde="2024-03-01", hasta="2024-05-31",
+                filtros=[("canal", "=", "APP")])
+
+Uso:
+    python espejo_parquet.py                      # exporta lo nuevo
+    python espejo_parquet.py --completo           # reescribe todo
+    python espejo_parquet.py --tablas transacciones --dir /ruta/parquet
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from conexion_bd import DB_PATH, RAIZ_PROYECTO, conectar_bd
+from importar_datos import tipo_destino
+
+DIR_PARQUET = RAIZ_PROYECTO / "data" / "parquet"
+MANIFIESTO = "_espejo.json"
+
+# Tabla → (llave incremental, columna de fecha que define el mes, se modifica en el lugar)
+ESPEJOS = {
+    "transacciones": ("transaccion_id", "fecha_transaccion", False),
+    "cuentas": ("cuenta_id", "fecha_apertura", True),
+    "prestamos": ("prestamo_id", "fecha_desembolso", True),
+}
+
+TIPOS_ARROW = {
+    "entero": pa.int64(),
+    "decimal": pa.float64(),
+    "fecha": pa.date32(),
+    "fecha_hora": pa.timestamp("s"),
+    "texto": pa.string(),
+}
+
+
+def esquema_arrow(conn, tabla):
+    """Esquema Arrow de una tabla a partir de los tipos declarados en su DDL"""
+    info = conn.execute(f"PRAGMA table_info({tabla})").fetchall()
+    if not info:
+        raise ValueError(f"La tabla '{tabla}' no existe en la base de datos")
+    return pa.schema([(nombre, TIPOS_ARROW[tipo_destino(tipo)]) for _, nombre, tipo, _, _, _ in info])
+
+
+def _a_arrow(lote, esquema, columna_fecha):
+    """Convierte un bloque de pandas al esquema y le agrega la columna de partición 'mes'"""
+    for campo in esquema:
+        if pa.types.is_date32(campo.type) or pa.types.is_timestamp(campo.type):
+            lote[campo.name] = pd.to_datetime(lote[campo.name], errors="coerce", format="mixed")
+        elif pa.types.is_floating(campo.type) or pa.types.is_integer(campo.type):
+            lote[campo.name] = pd.to_numeric(lote[campo.name], errors="coerce")
+    lote["mes"] = lote[columna_fecha].dt.strftime("%Y-%m").fillna("sin_fecha")
+    return pa.Table.from_pandas(lote, schema=esquema.append(pa.field("mes", pa.string())), preserve_index=False)
+
+
+def leer_manifiesto(directorio=DIR_PARQUET):
+    """Estado de la exportación por tabla: última llave, filas y fecha"""
+    ruta = Path(directorio) / MANIFIESTO
+    return json.loads(ruta.read_text(encoding="utf-8")) if ruta.exists() else {}
+
+
+def _guardar_manifiesto(manifiesto, directorio):
+    """Escribe el manifiesto de forma atómica (archivo temporal + os.replace)"""
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    temporal = directorio / (MANIFIESTO + ".tmp")
+    temporal.write_text(json.dumps(manifiesto, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporal, directorio / MANIFIESTO)
+
+
+def version_cambios(conn, tabla):
+    """Versión de la tabla en contadores_cambios; None si no tiene contador"""
+    try:
+        fila = conn.execute("SELECT version FROM contadores_cambios WHERE tabla = ?", (tabla,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return fila[0] if fila else None
+
+
+def firma_tabla(conn, tabla, hasta_llave, filas_por_bloque=50_000):
+    """Hash de todas las filas con llave <= hasta_llave, en orden de llave"""
+    llave = ESPEJOS[tabla][0]
+    firma = hashlib.blake2b(digest_size=16)
+    cursor = conn.execute(f"SELECT * FROM {tabla} WHERE {llave} <= ? ORDER BY {llave}", (hasta_llave,))
+    while True:
+        filas = cursor.fetchmany(filas_por_bloque)
+        if not filas:
+            return firma.hexdigest()
+        firma.update(repr(filas).encode("utf-8"))
+
+
+def _llave_archivo(ruta):
+    """Primera llave de un archivo bloque-<llave>-<i>.parquet"""
+    return int(ruta.name.split("-")[1])
+
+
+def _borrar_bloques_incompletos(destino, ultima_llave):
+    """Borra los archivos de bloques posteriores al manifiesto (exportación interrumpida)"""
+    huerfanos = [ruta for ruta in Path(destino).glob("mes=*/bloque-*.parquet") if _llave_archivo(ruta) > ultima_llave]
+    for ruta in huerfanos:
+        ruta.unlink()
+    return len(huerfanos)
+
+
+def exportar_tabla(conn, tabla, directorio=DIR_PARQUET, completo=False, filas_por_bloque=200_000):
+    """Anexa al espejo las filas nuevas de una tabla; devuelve las filas escritas"""
+    llave, columna_fecha, mutable = ESPEJOS[tabla]
+    directorio = Path(directorio)
+    destino = directorio / tabla
+    manifiesto = leer_manifiesto(directorio)
+    estado = manifiesto.get(tabla, {})
+    ultima_llave = estado.get("ultima_llave", 0)
+
+    # Una sola transacción de lectura: la firma, la versión y los bloques ven la misma foto de la base
+    conn.execute("BEGIN")
+    try:
+        version = version_cambios(conn, tabla) if mutable else None
+        if mutable and not completo and estado:
+            if version is None or version != estado.get("version_cambios"):
+                if firma_tabla(conn, tabla, ultima_llave) != estado.get("firma"):
+                    print(f"🔁 {tabla}: cambiaron filas ya exportadas, se reescribe completa")
+                    completo = True
+        if completo:
+            # Primero el manifiesto: si la reescritura se corta, la próxima corrida empieza de cero
+            manifiesto.pop(tabla, None)
+            _guardar_manifiesto(manifiesto, directorio)
+            shutil.rmtree(destino, ignore_errors=True)
+            ultima_llave, estado = 0, {}
+        elif _borrar_bloques_incompletos(destino, ultima_llave):
+            print(f"🧹 {tabla}: se borraron archivos de una exportación interrumpida")
+
+        inicio = time.perf_counter()
+        esquema = esquema_arrow(conn, tabla)
+        escritas = 0
+        bloques = pd.read_sql_query(f"SELECT * FROM {tabla} WHERE {llave} > ? ORDER BY {llave}", conn,
+                                    params=(ultima_llave,), chunksize=filas_por_bloque)
+        for lote in bloques:
+            if lote.empty:
+                continue
+            ds.write_dataset(
+                _a_arrow(lote, esquema, columna_fecha), destino, format="parquet",
+                partitioning=ds.partitioning(pa.schema([("mes", pa.string())]), flavor="hive"),
+                basename_template=f"bloque-{int(lote[llave].iloc[0]):012d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            escritas += len(lote)
+            ultima_llave = int(lote[llave].iloc[-1])
+            # El bloque ya está en disco: recién ahora el manifiesto avanza
+            manifiesto[tabla] = {
+                "llave": llave,
+                "ultima_llave": ultima_llave,
+                "filas": estado.get("filas", 0) + escritas,
+                "exportado_en": datetime.now().isoformat(timespec="seconds"),
+            }
+            _guardar_manifiesto(manifiesto, directorio)
+
+        if tabla not in manifiesto:
+            manifiesto[tabla] = {"llave": llave, "ultima_llave": ultima_llave, "filas": 0,
+                                 "exportado_en": datetime.now().isoformat(timespec="seconds")}
+        if mutable:
+            manifiesto[tabla]["firma"] = firma_tabla(conn, tabla, ultima_llave)
+            manifiesto[tabla]["version_cambios"] = version
+        _guardar_manifiesto(manifiesto, directorio)
+    finally:
+        conn.rollback()
+
+    print(f"🪞 {tabla}: {escritas:,} filas {'exportadas' if completo or not estado else 'anexadas'} "
+          f"en {time.perf_counter() - inicio:.2f} s (total {manifiesto[tabla]['filas']:,})")
+    return escritas
+
+
+def exportar(conn, tablas=tuple(ESPEJOS), directorio=DIR_PARQUET, completo=False):
+    """Exporta varias tablas al espejo; devuelve {tabla: filas escritas}"""
+    return {tabla: exportar_tabla(conn, tabla, directorio, completo) for tabla in tablas}
+
+
+def abrir_dataset(tabla, directorio=DIR_PARQUET):
+    """Dataset de Arrow de una tabla del espejo, leído con memory map"""
+    ruta = Path(directorio) / tabla
+    if not ruta.exists():
+        raise FileNotFoundError(f"No hay espejo de '{tabla}' en {directorio}: ejecuta espejo_parquet.py")
+    return ds.dataset(str(ruta), format="parquet", partitioning="hive",
+                      filesystem=pafs.LocalFileSystem(use_mmap=True))
+
+
+def _filtro(tabla, desde=None, hasta=None, filtros=None):
+    """Expresión de Arrow: rango de fechas (poda por mes) + filtros [(columna, op, valor)]"""
+    _, columna_fecha, _ = ESPEJOS[tabla]
+    condiciones = []
+    if desde:
+        condiciones.append(ds.field("mes") >= desde[:7])
+        condiciones.append(ds.field(columna_fecha) >= pd.Timestamp(desde))
+    if hasta:
+        condiciones.append(ds.field("mes") <= hasta[:7])
+        condiciones.append(ds.field(columna_fecha) < pd.Timestamp(hasta) + pd.Timedelta(days=1))
+    if filtros:
+        condiciones.append(pq.filters_to_expression(filtros))
+    expresion = None
+    for condicion in condiciones:
+        expresion = condicion if expresion is None else expresion & condicion
+    return expresion
+
+
+def cargar_arrow(tabla, columnas=None, desde=None, hasta=None, filtros=None, directorio=DIR_PARQUET):
+    """Tabla de Arrow con las columnas y filas pedidas (hasta inclusivo, YYYY-MM-DD)"""
+    dataset = abrir_dataset(tabla, directorio)
+    return dataset.to_table(columns=list(columnas) if columnas else None,
+                            filter=_filtro(tabla, desde, hasta, filtros))
+
+
+def cargar(tabla, columnas=None, desde=None, hasta=None, filtros=None, directorio=DIR_PARQUET):
+    """DataFrame de pandas leído del espejo con proyección y filtros empujados al escaneo"""
+    return cargar_arrow(tabla, columnas, desde, hasta, filtros, directorio).to_pandas()
+
+
+def cargar_numpy(tabla, columnas, desde=None, hasta=None, filtros=None, directorio=DIR_PARQUET):
+    """{columna: array de NumPy} sin pasar por pandas"""
+    resultado = cargar_arrow(tabla, columnas, desde, hasta, filtros, directorio)
+    return {nombre: resultado.column(nombre).to_numpy() for nombre in resultado.column_names}
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Exporta tablas a un espejo Parquet particionado por mes")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--dir", default=str(DIR_PARQUET), help="Directorio del espejo")
+    parser.add_argument("--tablas", nargs="+", choices=list(ESPEJOS), default=list(ESPEJOS))
+    parser.add_argument("--completo", action="store_true", help="Reescribe las tablas desde cero")
+    args = parser.parse_args(argv)
+
+    conn = conectar_bd(args.db, solo_lectura=True)
+    exportar(conn, args.tablas, args.dir, args.completo)
+    conn.close()
+
+    # Comparación rápida: misma lectura desde SQLite y desde el espejo
+    if "transacciones" in args.tablas:
+        inicio = time.perf_counter()
+        montos = cargar_numpy("transacciones", ["cuenta_id", "monto"], directorio=args.dir)
+        segundos = time.perf_counter() - inicio
+        print(f"⚡ {len(montos['monto']):,} montos leídos del espejo en {segundos * 1000:.1f} ms "
+              f"(total {np.nansum(montos['monto']):,.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📥 IMPORTADOR MASIVO DE EXTRACTOS CSV / PARQUET
+===============================================
+
+Carga archivos externos en cualquier tabla de banking_core.db leyendo por
+bloques de tamaño fijo (memoria constante), validando y convirtiendo tipos
+en cada bloque e insertando con executemany en transacciones de N filas.
+
+Durante la carga se usan PRAGMA synchronous=OFF / journal_mode=OFF y al
+terminar se restauran los valores que tenía la base.
+
+Ejemplos:
+    python importar_datos.py transacciones extracto.csv
+    python importar_datos.py clientes clientes.parquet --filas-por-commit 500000
+    python importar_datos.py --dir data/sample_data      # <tabla>.csv / <tabla>.parquet
+    python importar_datos.py --dir extractos/ --diferir-indices
+"""
+
+import argparse
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from conexion_bd import DB_PATH, conectar_bd
+from reconstruir_indices import indices_diferidos
+
+# Orden de carga que respeta las llaves foráneas de create_database_structure
+ORDEN_TABLAS = [
+    "sucursales",
+    "productos_financieros",
+    "clientes",
+    "cuentas",
+    "prestamos",
+    "transacciones",
+    "balance_general",
+    "estado_resultados",
+]
+EXTENSIONES = (".csv", ".parquet")
+
+
+def tipo_destino(tipo_declarado):
+    """Clasifica el tipo declarado en el DDL en un tipo de conversión"""
+    tipo = tipo_declarado.upper()
+    if tipo.startswith("INT"):
+        return "entero"
+    if tipo.startswith(("DECIMAL", "REAL", "NUMERIC", "FLOAT", "DOUBLE")):
+        return "decimal"
+    if tipo == "DATE":
+        return "fecha"
+    if tipo in ("TIMESTAMP", "DATETIME"):
+        return "fecha_hora"
+    return "texto"
+
+
+def esquema_tabla(conn, tabla):
+    """Devuelve {columna: tipo} y las columnas obligatorias (NOT NULL sin DEFAULT)"""
+    info = conn.execute(f"PRAGMA table_info({tabla})").fetchall()
+    if not info:
+        raise ValueError(f"La tabla '{tabla}' no existe en la base de datos")
+    tipos = {nombre: tipo_destino(tipo) for _, nombre, tipo, _, _, _ in info}
+    obligatorias = [nombre for _, nombre, _, notnull, default, pk in info
+                    if notnull and default is None and not pk]
+    return tipos, obligatorias
+
+
+def castear_lote(lote, tipos, obligatorias):
+    """Valida y convierte un bloque; devuelve (bloque_valido, filas_rechazadas).
+
+    Se rechaza la fila si un valor presente no se puede convertir o si falta
+    un valor obligatorio.
+    """
+    desconocidas = [col for col in lote.columns if col not in tipos]
+    if desconocidas:
+        raise ValueError(f"Columnas que no existen en la tabla: {desconocidas}")
+    faltantes = [col for col in obligatorias if col not in lote.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias: {faltantes}")
+
+    invalido = np.zeros(len(lote), dtype=bool)
+    convertido = {}
+    for col in lote.columns:
+        serie = lote[col]
+        tipo = tipos[col]
+        if tipo == "entero":
+            numero = pd.to_numeric(serie, errors="coerce")
+            invalido |= (numero.notna() & (numero != np.round(numero))).to_numpy()
+            valor = numero.round().astype("Int64")
+        elif tipo == "decimal":
+            valor = pd.to_numeric(serie, errors="coerce")
+        elif tipo in ("fecha", "fecha_hora"):
+            fecha = pd.to_datetime(serie, errors="coerce")
+            valor = fecha.dt.strftime("%Y-%m-%d" if tipo == "fecha" else "%Y-%m-%d %H:%M:%S")
+        else:
+            valor = serie.astype("string")
+        invalido |= (valor.isna() & serie.notna()).to_numpy()
+        convertido[col] = valor
+
+    validos = pd.DataFrame(convertido)
+    for col in obligatorias:
+        invalido |= validos[col].isna().to_numpy()
+    return validos[~invalido], int(invalido.sum())
+
+
+def leer_por_bloques(ruta, tamano_bloque):
+    """Itera el archivo en DataFrames de a lo sumo tamano_bloque filas"""
+    ruta = Path(ruta)
+    if ruta.suffix == ".csv":
+        # Todo como texto: la conversión la hace castear_lote según el esquema
+        yield from pd.read_csv(ruta, dtype=str, chunksize=tamano_bloque)
+    elif ruta.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("❌ Para leer Parquet instala pyarrow: pip install pyarrow")
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque):
+            yield lote.to_pandas()
+    else:
+        raise ValueError(f"Formato no soportado: {ruta.suffix} (usa {', '.join(EXTENSIONES)})")
+
+
+def filas_para_insertar(lote):
+    """Convierte el bloque en tuplas de Python con None en lugar de NA"""
+    return lote.astype(object).where(lote.notna(), None).itertuples(index=False, name=None)
+
+
+@contextmanager
+def pragmas_carga_rapida(conn):
+    """Desactiva journal y fsync durante la carga y restaura los valores previos"""
+    previos = {pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+               for pragma in ("journal_mode", "synchronous")}
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    try:
+        yield
+    finally:
+        conn.commit()
+        conn.execute(f"PRAGMA journal_mode = {previos['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {previos['synchronous']}")
+
+
+def importar_archivo(conn, tabla, ruta, tamano_bloque=100_000, filas_por_commit=1_000_000,
+                     ignorar_duplicados=False):
+    """Importa un archivo en una tabla; devuelve (insertadas, rechazadas, segundos)"""
+    tipos, obligatorias = esquema_tabla(conn, tabla)
+    verbo = "INSERT OR IGNORE" if ignorar_duplicados else "INSERT"
+
+    print(f"📥 {ruta} → {tabla}")
+    inicio = time.perf_counter()
+    insertadas = rechazadas = pendientes = 0
+    for lote in leer_por_bloques(ruta, tamano_bloque):
+        validos, malos = castear_lote(lote, tipos, obligatorias)
+        columnas = list(validos.columns)
+        sql = f"{verbo} INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+        conn.executemany(sql, filas_para_insertar(validos))
+        insertadas += len(validos)
+        rechazadas += malos
+        pendientes += len(validos)
+        if pendientes >= filas_por_commit:
+            conn.commit()
+            pendientes = 0
+            segundos = time.perf_counter() - inicio
+            print(f"   💾 {insertadas:,} filas ({insertadas / segundos:,.0f} filas/s)")
+    conn.commit()
+
+    segundos = time.perf_counter() - inicio
+    print(f"✅ {tabla}: {insertadas:,} filas en {segundos:.1f} s "
+          f"({insertadas / max(segundos, 1e-9):,.0f} filas/s), {rechazadas:,} rechazadas")
+    return insertadas, rechazadas, segundos
+
+
+def archivos_de_directorio(directorio):
+    """Encuentra <tabla>.csv / <tabla>.parquet en el orden de carga de las tablas"""
+    archivos = []
+    for tabla in ORDEN_TABLAS:
+        for extension in EXTENSIONES:
+            ruta = Path(directorio) / f"{tabla}{extension}"
+            if ruta.exists():
+                archivos.append((tabla, ruta))
+    return archivos
+
+
+def parse_args(argv=None):
+    """Lee los parámetros de la importación"""
+    parser = argparse.ArgumentParser(description="Importa extractos CSV/Parquet a banking_core.db")
+    parser.add_argument("tabla", nargs="?", choices=ORDEN_TABLAS, help="Tabla destino")
+    parser.add_argument("archivo", nargs="?", help="Archivo .csv o .parquet")
+    parser.add_argument("--dir", help="Directorio con archivos <tabla>.csv / <tabla>.parquet")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--tamano-bloque", type=int, default=100_000, help="Filas leídas por bloque")
+    parser.add_argument("--filas-por-commit", type=int, default=1_000_000, help="Filas por transacción")
+    parser.add_argument("--diferir-indices", action="store_true",
+                        help="Elimina los índices secundarios y los crea al final de la carga")
+    parser.add_argument("--ignorar-duplicados", action="store_true", help="Usa INSERT OR IGNORE")
+    args = parser.parse_args(argv)
+    if not args.dir and not (args.tabla and args.archivo):
+        parser.error("indica <tabla> <archivo> o --dir")
+    return args
+
+
+def main(argv=None):
+    """Importa uno o varios archivos dentro de una sesión de carga rápida"""
+    args = parse_args(argv)
+    archivos = archivos_de_directorio(args.dir) if args.dir else [(args.tabla, Path(args.archivo))]
+    if not archivos:
+        print(f"⚠️  No se encontraron archivos en {args.dir}")
+        return
+
+    conn = conectar_bd(args.db, perfil="escritura")
+    total = 0
+    inicio = time.perf_counter()
+    with indices_diferidos(conn) if args.diferir_indices else nullcontext(), pragmas_carga_rapida(conn):
+        for tabla, ruta in archivos:
+            insertadas, _, _ = importar_archivo(conn, tabla, ruta, args.tamano_bloque,
+                                                args.filas_por_commit, args.ignorar_duplicados)
+            total += insertadas
+    conn.close()
+
+    segundos = time.perf_counter() - inicio
+    print(f"\n🎉 Importación completa: {total:,} filas en {segundos:.1f} s "
+          f"({total / max(segundos, 1e-9):,.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🏆 MOTOR DE KPIs BANCARIOS
+==========================
+
+Calcula los indicadores del Módulo 4 y los guarda en la tabla `kpis`,
+de donde sale el tablero mensual sin recorrer las tablas de origen:
+
+- ROA       = utilidad_neta / total_activos                 (banco)
+- ROE       = utilidad_neta / total_patrimonio              (banco)
+- NIM       = (ingresos - gastos financieros) / activos     (banco)
+- MOROSIDAD = cartera vencida / cartera total                (banco, segmento y sucursal)
+
+Un periodo es una fecha de corte de balance_general / estado_resultados.
+La cartera de un periodo son los préstamos desembolsados hasta esa fecha
+(no cancelados); vencida es la que tiene más de DIAS_VENCIDA días de mora.
+La sucursal de un préstamo es la de la primera cuenta del cliente.
+
+No hay historia del estado de cada préstamo: la morosidad se calcula con
+los dias_mora / saldo_capital / estado actuales, así que es una foto de la
+cartera al momento del cálculo, no un valor a la fecha del periodo. Por
+eso un periodo ya calculado conserva su morosidad y solo se recalcula la
+del último periodo (--forzar reconstruye todos con el estado actual).
+
+Recálculo incremental:
+- ROA / ROE / NIM de un periodo se recalculan si cambió su fila de balance
+  o de resultados (firma por periodo en kpis_control).
+- La morosidad se calcula para los periodos nuevos y, si hubo cambios en
+  la cartera, para el último periodo. Los cambios los anotan triggers en
+  la cola kpis_cambios_cartera: INSERT / DELETE de préstamos, UPDATE de
+  las columnas que usa la morosidad y UPDATE de segmento_cliente. La cola
+  tiene una fila por fecha_desembolso con un contador de cambios, así que
+  no crece con cada préstamo tocado; una corrida borra las filas cuyo
+  contador no cambió desde que las leyó.
+  Cambiar la sucursal de las cuentas no se detecta: usa --forzar.
+- Los periodos que desaparecen de balance y resultados se borran de kpis.
+
+Uso:
+    python kpis_bancarios.py               # recalcula lo pendiente
+    python kpis_bancarios.py --forzar      # recalcula todos los periodos
+    python kpis_bancarios.py --tablero [2024-12-31]
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from conexion_bd import DB_PATH, conectar_bd
+
+DIAS_VENCIDA = 30
+
+SQL_TABLAS = """
+CREATE TABLE IF NOT EXISTS kpis (
+    periodo DATE NOT NULL,
+    dimension VARCHAR(20) NOT NULL,      -- banco, segmento, sucursal
+    valor_dimension VARCHAR(100) NOT NULL,
+    kpi VARCHAR(20) NOT NULL,
+    valor REAL,
+    numerador REAL,
+    denominador REAL,
+    calculado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (periodo, dimension, valor_dimension, kpi)
+) WITHOUT ROWID;
+
+-- Firma de las fuentes de cada periodo
+CREATE TABLE IF NOT EXISTS kpis_control (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+
+-- Cola de cambios de cartera por aplicar a la morosidad del último periodo
+CREATE TABLE IF NOT EXISTS kpis_cambios_cartera (
+    fecha_desembolso DATE PRIMARY KEY,   -- '': no se sabe, afecta al último periodo
+    cambios INTEGER NOT NULL DEFAULT 1
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS trg_kpis_prestamos_insert
+AFTER INSERT ON prestamos
+BEGIN
+    INSERT INTO kpis_cambios_cartera (fecha_desembolso) VALUES (COALESCE(new.fecha_desembolso, ''))
+    ON CONFLICT (fecha_desembolso) DO UPDATE SET cambios = cambios + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_kpis_prestamos_delete
+AFTER DELETE ON prestamos
+BEGIN
+    INSERT INTO kpis_cambios_cartera (fecha_desembolso) VALUES (COALESCE(old.fecha_desembolso, ''))
+    ON CONFLICT (fecha_desembolso) DO UPDATE SET cambios = cambios + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_kpis_prestamos_update
+AFTER UPDATE OF fecha_desembolso, saldo_capital, dias_mora, estado, cliente_id ON prestamos
+WHEN old.fecha_desembolso IS NOT new.fecha_desembolso OR old.saldo_capital IS NOT new.saldo_capital
+  OR old.dias_mora IS NOT new.dias_mora OR old.estado IS NOT new.estado OR old.cliente_id IS NOT new.cliente_id
+BEGIN
+    INSERT INTO kpis_cambios_cartera (fecha_desembolso)
+    VALUES (COALESCE(min(COALESCE(old.fecha_desembolso, new.fecha_desembolso),
+                         COALESCE(new.fecha_desembolso, old.fecha_desembolso)), ''))
+    ON CONFLICT (fecha_desembolso) DO UPDATE SET cambios = cambios + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_kpis_clientes_segmento
+AFTER UPDATE OF segmento_cliente ON clientes
+WHEN old.segmento_cliente IS NOT new.segmento_cliente
+BEGIN
+    INSERT INTO kpis_cambios_cartera (fecha_desembolso) VALUES ('')
+    ON CONFLICT (fecha_desembolso) DO UPDATE SET cambios = cambios + 1;
+END;
+"""
+
+TRIGGERS_CARTERA = ("trg_kpis_prestamos_insert", "trg_kpis_prestamos_delete",
+                    "trg_kpis_prestamos_update", "trg_kpis_clientes_segmento")
+
+# Columnas que definen el contenido de un periodo (sin ids ni created_at)
+SQL_FIRMA_BALANCE = """
+SELECT fecha_balance, total_activos, total_pasivos, total_patrimonio, cartera_creditos
+FROM balance_general
+"""
+SQL_FIRMA_RESULTADOS = """
+SELECT periodo, ingresos_financieros, gastos_financieros, margen_financiero, utilidad_neta
+FROM estado_resultados
+"""
+
+# Cambios de cartera pendientes por fecha de desembolso ('' es anterior a cualquier periodo)
+SQL_CAMBIOS_CARTERA = "SELECT fecha_desembolso, cambios FROM kpis_cambios_cartera"
+
+# Indicadores del banco: un INSERT para todos los periodos pendientes
+SQL_KPIS_BANCO = """
+INSERT INTO kpis (periodo, dimension, valor_dimension, kpi, valor, numerador, denominador)
+SELECT periodo, 'banco', 'total', kpi, 1.0 * numerador / NULLIF(denominador, 0), numerador, denominador
+FROM (
+    SELECT b.fecha_balance AS periodo, 'ROA' AS kpi, r.utilidad_neta AS numerador, b.total_activos AS denominador
+    FROM balance_general b JOIN estado_resultados r ON r.periodo = b.fecha_balance
+    UNION ALL
+    SELECT b.fecha_balance, 'ROE', r.utilidad_neta, b.total_patrimonio
+    FROM balance_general b JOIN estado_resultados r ON r.periodo = b.fecha_balance
+    UNION ALL
+    SELECT b.fecha_balance, 'NIM', r.ingresos_financieros - r.gastos_financieros, b.total_activos
+    FROM balance_general b JOIN estado_resultados r ON r.periodo = b.fecha_balance
+)
+WHERE periodo IN (SELECT periodo FROM temp.kpis_pendientes)
+"""
+
+# Morosidad por banco, segmento y sucursal en una sola pasada por préstamos
+SQL_KPIS_MOROSIDAD = """
+INSERT INTO kpis (periodo, dimension, valor_dimension, kpi, valor, numerador, denominador)
+WITH cartera AS (
+    SELECT
+        pe.periodo,
+        COALESCE(c.segmento_cliente, 'Sin segmento') AS segmento,
+        COALESCE((SELECT CAST(cu.sucursal_id AS TEXT) FROM cuentas cu
+                  WHERE cu.cliente_id = p.cliente_id ORDER BY cu.cuenta_id LIMIT 1), 'Sin sucursal') AS sucursal,
+        p.saldo_capital AS saldo,
+        CASE WHEN p.dias_mora > :dias_vencida THEN p.saldo_capital ELSE 0 END AS vencido
+    FROM temp.kpis_pendientes pe
+    JOIN prestamos p ON p.fecha_desembolso <= pe.periodo AND COALESCE(p.estado, '') <> 'CANCELADO'
+    LEFT JOIN clientes c ON c.cliente_id = p.cliente_id
+),
+grupos AS (
+    SELECT periodo, 'banco' AS dimension, 'total' AS valor_dimension, SUM(vencido) AS vencida, SUM(saldo) AS total
+    FROM cartera GROUP BY periodo
+    UNION ALL
+    SELECT periodo, 'segmento', segmento, SUM(vencido), SUM(saldo) FROM cartera GROUP BY periodo, segmento
+    UNION ALL
+    SELECT periodo, 'sucursal', sucursal, SUM(vencido), SUM(saldo) FROM cartera GROUP BY periodo, sucursal
+)
+SELECT periodo, dimension, valor_dimension, 'MOROSIDAD', 1.0 * vencida / NULLIF(total, 0), vencida, total
+FROM grupos
+"""
+
+
+def crear_tablas(conn):
+    """Crea kpis, kpis_control, la cola de cambios y sus triggers.
+
+    Devuelve True si los triggers ya existían (si faltaba alguno, los
+    cambios anteriores a esta corrida no quedaron anotados).
+    """
+    existentes = {nombre for (nombre,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    conn.executescript(SQL_TABLAS)
+    return existentes.issuperset(TRIGGERS_CARTERA)
+
+
+def _control(conn):
+    return dict(conn.execute("SELECT clave, valor FROM kpis_control").fetchall())
+
+
+def firmas_periodos(conn):
+    """{periodo: firma} con el contenido de balance y resultados de cada periodo"""
+    balance = {fila[0]: fila[1:] for fila in conn.execute(SQL_FIRMA_BALANCE)}
+    resultados = {fila[0]: fila[1:] for fila in conn.execute(SQL_FIRMA_RESULTADOS)}
+    return {periodo: repr((balance.get(periodo), resultados.get(periodo)))
+            for periodo in set(balance) | set(resultados)}
+
+
+def periodos_pendientes(conn, forzar=False, cola_completa=True):
+    """Periodos a recalcular por grupo de KPIs y el nuevo estado de control.
+
+    Devuelve (periodos de ROA/ROE/NIM, periodos de morosidad, periodos
+    eliminados, estado de kpis_control, filas leídas de la cola de cambios).
+    """
+    control = _control(conn)
+    firmas = firmas_periodos(conn)
+    calculados = {clave[len("firma:"):] for clave in control if clave.startswith("firma:")}
+    ultimo = max(firmas) if firmas else None
+    cambios = conn.execute(SQL_CAMBIOS_CARTERA).fetchall()
+    toca_cartera = ultimo is not None and any(fecha <= ultimo for fecha, _ in cambios)
+
+    if forzar:
+        banco = morosidad = set(firmas)
+    else:
+        banco = {p for p, firma in firmas.items() if control.get(f"firma:{p}") != firma}
+        morosidad = set(firmas) - calculados
+        # Sin triggers previos no se sabe qué cambió: se toma la cartera actual como cambiada
+        if ultimo and (toca_cartera or not cola_completa):
+            morosidad.add(ultimo)
+
+    estado = {f"firma:{p}": firmas[p] for p in banco}
+    return sorted(banco), sorted(morosidad), sorted(calculados - set(firmas)), estado, cambios
+
+
+def _cargar_pendientes(conn, periodos):
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS kpis_pendientes (periodo DATE PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.kpis_pendientes")
+    conn.executemany("INSERT INTO temp.kpis_pendientes VALUES (?)", [(p,) for p in periodos])
+
+
+def recalcular_kpis(conn, forzar=False):
+    """Recalcula los KPIs de los periodos afectados; devuelve los periodos"""
+    cola_completa = crear_tablas(conn)
+    inicio = time.perf_counter()
+    with conn:
+        banco, morosidad, eliminados, estado, cambios = periodos_pendientes(conn, forzar, cola_completa)
+        if banco:
+            _cargar_pendientes(conn, banco)
+            conn.execute("DELETE FROM kpis WHERE kpi <> 'MOROSIDAD' "
+                         "AND periodo IN (SELECT periodo FROM temp.kpis_pendientes)")
+            conn.execute(SQL_KPIS_BANCO)
+        if morosidad:
+            _cargar_pendientes(conn, morosidad)
+            conn.execute("DELETE FROM kpis WHERE kpi = 'MOROSIDAD' "
+                         "AND periodo IN (SELECT periodo FROM temp.kpis_pendientes)")
+            conn.execute(SQL_KPIS_MOROSIDAD, {"dias_vencida": DIAS_VENCIDA})
+        if eliminados:
+            conn.executemany("DELETE FROM kpis WHERE periodo = ?", [(p,) for p in eliminados])
+            conn.executemany("DELETE FROM kpis_control WHERE clave = ?", [(f"firma:{p}",) for p in eliminados])
+        # Una fila cuyo contador subió después de leerla queda para la próxima corrida
+        conn.executemany("DELETE FROM kpis_cambios_cartera WHERE fecha_desembolso = ? AND cambios = ?", cambios)
+        conn.executemany("INSERT OR REPLACE INTO kpis_control (clave, valor) VALUES (?, ?)", estado.items())
+    segundos = time.perf_counter() - inicio
+    pendientes = sorted(set(banco) | set(morosidad))
+    if pendientes:
+        print(f"🏆 KPIs recalculados para {len(pendientes)} periodos "
+              f"({pendientes[0]} … {pendientes[-1]}; ROA/ROE/NIM en {len(banco)}, "
+              f"morosidad en {len(morosidad)}) en {segundos:.2f} s")
+    if eliminados:
+        print(f"🗑️ KPIs borrados de {len(eliminados)} periodos que ya no existen: {', '.join(eliminados)}")
+    if not pendientes and not eliminados:
+        print("✅ KPIs al día: no hay periodos afectados")
+    return pendientes
+
+
+def tablero(conn, periodo=None):
+    """KPIs del banco por periodo (columnas = KPI), leídos de la tabla precalculada"""
+    consulta = "SELECT periodo, kpi, valor FROM kpis WHERE dimension = 'banco'"
+    params = ()
+    if periodo:
+        consulta += " AND periodo = ?"
+        params = (periodo,)
+    kpis = pd.read_sql_query(consulta, conn, params=params)
+    return kpis.pivot(index="periodo", columns="kpi", values="valor").sort_index()
+
+
+def kpis_por_dimension(conn, periodo, dimension="segmento", kpi="MOROSIDAD"):
+    """Un KPI de un periodo desglosado por segmento o sucursal"""
+    return pd.read_sql_query("""
+        SELECT valor_dimension AS {0}, valor, numerador, denominador
+        FROM kpis
+        WHERE periodo = ? AND dimension = ? AND kpi = ?
+        ORDER BY valor DESC
+    """.format(dimension), conn, params=(periodo, dimension, kpi))
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Calcula y consulta los KPIs bancarios precalculados")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--forzar", action="store_true", help="Recalcula todos los periodos")
+    parser.add_argument("--tablero", nargs="?", const="", metavar="PERIODO",
+                        help="Muestra el tablero (opcionalmente de un periodo) sin recalcular")
+    args = parser.parse_args(argv)
+
+    if args.tablero is not None:
+        conn = conectar_bd(args.db, solo_lectura=True)
+        print("📋 TABLERO DE KPIs")
+        print("-" * 50)
+        print(tablero(conn, args.tablero or None))
+        ultimo = conn.execute("SELECT MAX(periodo) FROM kpis").fetchone()[0]
+        if ultimo:
+            print(f"\n⚠️ Morosidad por segmento ({args.tablero or ultimo}):")
+            print(kpis_por_dimension(conn, args.tablero or ultimo))
+    else:
+        conn = conectar_bd(args.db, perfil="escritura")
+        recalcular_kpis(conn, forzar=args.forzar)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,14 +8,14 @@ Este archivo te permite practicar SQL de forma sencilla.
 Solo ejecuta: python practica_sql_simple.py
 """
 
-import sqlite3
+import sys
+from pathlib import Path
+
 import pandas as pd
 
-def conectar_bd():
-    """Conecta a la base de datos bancaria"""
-    conn = sqlite3.connect('data/banking_core.db')
-    print("✅ Conectado a la base de datos bancaria")
-    return conn
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # raíz del proyecto
+from conexion_bd import conectar_bd
+from ejecutor_consultas import ejecutar_consulta
 
 def mostrar_tablas(conn):
     """Muestra las tablas disponibles"""
@@ -29,20 +29,6 @@ def mostrar_tablas(conn):
         print(f"   📋 {tabla}")
     print()
 
-def ejecutar_consulta(conn, consulta, titulo="Resultado"):
-    """Ejecuta una consulta SQL y muestra el resultado"""
-    try:
-        resultado = pd.read_sql_query(consulta, conn)
-        print(f"✅ {titulo}:")
-        print("-" * 50)
-        print(resultado)
-        print()
-        return resultado
-    except Exception as e:
-        print(f"❌ Error en la consulta: {e}")
-        print()
-        return None
-
 def main():
     """Función principal - aquí practicas SQL"""
     print("🎯 PRÁCTICA SQL BANCARIA")
@@ -50,6 +36,7 @@ def main():
     
     # Conectar a la base de datos
     conn = conectar_bd()
+    print("✅ Conectado a la base de datos bancaria")
     
     # Mostrar tablas disponibles
     mostrar_tablas(conn)
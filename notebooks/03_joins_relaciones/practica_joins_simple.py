@@ -7,7 +7,12 @@
 Práctica paso a paso de JOINs con verificaciones
 """
 
-import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # raíz del proyecto
+from catalogo_esquema import columnas, tablas
+from conexion_bd import conectar_bd
 
 def main():
     print("🚀 PRÁCTICA SQL BANCARIA - JOINS")
@@ -15,19 +20,13 @@ def main():
     
     try:
         # Conectar a la base de datos
-        conn = sqlite3.connect('data/banking_core.db')
+        conn = conectar_bd()
         print("✅ Conectado a la base de datos bancaria")
         
-        # Verificar tablas
+        # Verificar tablas y estructura de cuentas (una sola lectura del catálogo)
+        print(f"📋 Tablas encontradas: {tablas(conn)}")
+        print(f"🔍 Columnas de 'cuentas': {columnas(conn, 'cuentas')}")
         cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = cursor.fetchall()
-        print(f"📋 Tablas encontradas: {[table[0] for table in tables]}")
-        
-        # Verificar estructura de cuentas
-        cursor.execute("PRAGMA table_info(cuentas)")
-        columns = cursor.fetchall()
-        print(f"🔍 Columnas de 'cuentas': {[col[1] for col in columns]}")
         
         # EJERCICIO 1: INNER JOIN básico
         print("\n🎯 EJERCICIO 1: INNER JOIN - Clientes VIP con cuentas")
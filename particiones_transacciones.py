@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗓️ PARTICIONES MENSUALES DE TRANSACCIONES
+=========================================
+
+Esquema opcional en el que `transacciones` se reparte en una tabla por
+mes (`transacciones_2024_01`, ...), cada una con sus propios índices
+pequeños. Al activarlo:
+
+- la tabla original se renombra a `transacciones_pendientes`: recibe las
+  inserciones nuevas hasta la próxima consolidación;
+- `transacciones` pasa a ser una vista UNION ALL de pendientes + meses, y
+  un trigger INSTEAD OF INSERT desvía los INSERT a pendientes, así los
+  scripts existentes (lecturas y cargas) siguen funcionando;
+- `consolidar` mueve lo pendiente a la tabla de su mes.
+
+consultar_rango() poda: solo lee las particiones que toca el rango de
+fechas. Los meses fríos se archivan a un archivo propio
+(data/archivo/transacciones_YYYY_MM.db): primero se confirma y verifica
+la copia, después el DROP TABLE en la base principal. Se pueden consultar
+adjuntándolos o restaurar.
+
+Las particiones no comparten la restricción UNIQUE de numero_transaccion
+y los UPDATE/DELETE deben ir a la tabla del mes.
+
+Uso:
+    python particiones_transacciones.py activar
+    python particiones_transacciones.py consolidar
+    python particiones_transacciones.py listar
+    python particiones_transacciones.py consultar --desde 2024-03-01 --hasta 2024-04-15
+    python particiones_transacciones.py archivar 2024-01
+    python particiones_transacciones.py restaurar 2024-01
+    python particiones_transacciones.py desactivar
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from conexion_bd import DB_PATH, RAIZ_PROYECTO, conectar_bd
+
+PENDIENTES = "transacciones_pendientes"
+DIR_ARCHIVO = RAIZ_PROYECTO / "data" / "archivo"
+
+SQL_CATALOGO = """
+CREATE TABLE IF NOT EXISTS particiones_transacciones (
+    mes VARCHAR(7) PRIMARY KEY,          -- YYYY-MM
+    tabla VARCHAR(40) NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'ACTIVA',   -- ACTIVA, ARCHIVADA
+    archivo TEXT,
+    filas INTEGER
+)
+"""
+
+
+def nombre_particion(mes):
+    """'2024-01' → 'transacciones_2024_01'"""
+    if not re.fullmatch(r"\d{4}-\d{2}", mes):
+        raise ValueError(f"Mes inválido '{mes}' (usa YYYY-MM)")
+    return f"transacciones_{mes.replace('-', '_')}"
+
+
+def rango_mes(mes):
+    """Límites [inicio, fin) de un mes como texto comparable con fecha_transaccion"""
+    anio, numero = map(int, mes.split("-"))
+    siguiente = f"{anio + numero // 12:04d}-{numero % 12 + 1:02d}"
+    return f"{mes}-01", f"{siguiente}-01"
+
+
+def esta_activo(conn):
+    """True si transacciones ya es la vista particionada"""
+    fila = conn.execute("SELECT type FROM sqlite_master WHERE name = 'transacciones'").fetchone()
+    return fila is not None and fila[0] == "view"
+
+
+def _columnas(conn):
+    return [fila[1] for fila in conn.execute(f"PRAGMA table_info({PENDIENTES})")]
+
+
+def _crear_particion(conn, mes):
+    """Crea la tabla del mes con el mismo DDL que transacciones y sus índices"""
+    tabla = nombre_particion(mes)
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (PENDIENTES,)).fetchone()[0]
+    ddl = re.sub(r'^CREATE TABLE\s+"?\w+"?', f"CREATE TABLE IF NOT EXISTS {tabla}", ddl, count=1)
+    ddl = ddl.replace("AUTOINCREMENT", "")  # los ids los asigna pendientes
+    conn.execute(ddl)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabla}_cuenta ON {tabla}(cuenta_id)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabla}_fecha ON {tabla}(fecha_transaccion)")
+    conn.execute("INSERT OR IGNORE INTO particiones_transacciones (mes, tabla) VALUES (?, ?)", (mes, tabla))
+    return tabla
+
+
+def particiones(conn, estado="ACTIVA"):
+    """[(mes, tabla)] de las particiones en un estado, ordenadas por mes"""
+    return conn.execute("SELECT mes, tabla FROM particiones_transacciones WHERE estado = ? ORDER BY mes",
+                        (estado,)).fetchall()
+
+
+def reconstruir_vista(conn):
+    """Recrea la vista transacciones y el trigger que desvía los INSERT a pendientes"""
+    columnas = _columnas(conn)
+    lista = ", ".join(columnas)
+    selects = [f"SELECT {lista} FROM {PENDIENTES}"] + [f"SELECT {lista} FROM {tabla}" for _, tabla in particiones(conn)]
+    # Las vistas no tienen DEFAULT: se aplican los de la tabla en el trigger
+    valores = []
+    for _, nombre, _, _, defecto, _ in conn.execute(f"PRAGMA table_info({PENDIENTES})"):
+        valores.append(f"COALESCE(new.{nombre}, {defecto})" if defecto is not None else f"new.{nombre}")
+    conn.execute("DROP VIEW IF EXISTS transacciones")
+    conn.execute("CREATE VIEW transacciones AS\n" + "\nUNION ALL\n".join(selects))
+    conn.execute(f"""
+        CREATE TRIGGER trg_transacciones_insertar
+        INSTEAD OF INSERT ON transacciones
+        BEGIN
+            INSERT INTO {PENDIENTES} ({lista}) VALUES ({', '.join(valores)});
+        END
+    """)
+
+
+def consolidar(conn):
+    """Mueve las filas de pendientes a la tabla de su mes; devuelve las filas movidas"""
+    inicio = time.perf_counter()
+    movidas = 0
+    with conn:
+        meses = [mes for (mes,) in conn.execute(
+            f"SELECT DISTINCT strftime('%Y-%m', fecha_transaccion) FROM {PENDIENTES} ORDER BY 1")]
+        archivados = {mes for mes, _ in particiones(conn, "ARCHIVADA")}
+        if archivados & set(meses):
+            raise ValueError(f"Hay transacciones pendientes de meses archivados: {sorted(archivados & set(meses))}. "
+                             "Restaura esos meses antes de consolidar.")
+        nuevas = False
+        for mes in meses:
+            nuevas |= conn.execute("SELECT 1 FROM particiones_transacciones WHERE mes = ?", (mes,)).fetchone() is None
+            tabla = _crear_particion(conn, mes)
+            desde, hasta = rango_mes(mes)
+            filtro = "fecha_transaccion >= ? AND fecha_transaccion < ?"
+            movidas += conn.execute(f"INSERT INTO {tabla} SELECT * FROM {PENDIENTES} WHERE {filtro}",
+                                    (desde, hasta)).rowcount
+            conn.execute(f"DELETE FROM {PENDIENTES} WHERE {filtro}", (desde, hasta))
+            conn.execute("UPDATE particiones_transacciones SET filas = (SELECT COUNT(*) FROM " + tabla + ") "
+                         "WHERE mes = ?", (mes,))
+        if nuevas:
+            reconstruir_vista(conn)
+    print(f"📦 {movidas:,} transacciones consolidadas en {len(meses)} meses ({time.perf_counter() - inicio:.2f} s)")
+    return movidas
+
+
+def activar(conn):
+    """Convierte transacciones en el esquema particionado y consolida todo por mes"""
+    if esta_activo(conn):
+        print("ℹ️ Las particiones ya están activas")
+        return consolidar(conn)
+    with conn:
+        conn.execute(SQL_CATALOGO)
+        conn.execute(f"ALTER TABLE transacciones RENAME TO {PENDIENTES}")
+        reconstruir_vista(conn)
+    print("✅ transacciones ahora es una vista sobre particiones mensuales")
+    return consolidar(conn)
+
+
+def desactivar(conn):
+    """Vuelve a una sola tabla transacciones (restaura antes los meses archivados)"""
+    if not esta_activo(conn):
+        print("ℹ️ Las particiones no están activas")
+        return
+    if particiones(conn, "ARCHIVADA"):
+        raise ValueError("Hay meses archivados: restáuralos antes de desactivar")
+    with conn:
+        conn.execute("DROP VIEW transacciones")
+        conn.execute(f"ALTER TABLE {PENDIENTES} RENAME TO transacciones")
+        for _, tabla in particiones(conn):
+            conn.execute(f"INSERT INTO transacciones SELECT * FROM {tabla}")
+            conn.execute(f"DROP TABLE {tabla}")
+        conn.execute("DROP TABLE particiones_transacciones")
+    print("✅ transacciones vuelve a ser una sola tabla")
+
+
+def tablas_para_rango(conn, desde=None, hasta=None):
+    """Particiones activas y archivadas cuyo mes se cruza con [desde, hasta]"""
+    mes_desde = desde[:7] if desde else "0000-00"
+    mes_hasta = hasta[:7] if hasta else "9999-99"
+    return conn.execute("""
+        SELECT mes, tabla, estado, archivo FROM particiones_transacciones
+        WHERE mes BETWEEN ? AND ?
+        ORDER BY mes
+    """, (mes_desde, mes_hasta)).fetchall()
+
+
+def consultar_rango(conn, desde=None, hasta=None, columnas="*", condicion=None, params=(),
+                    incluir_archivados=False):
+    """Lee transacciones de un rango de fechas tocando solo sus particiones.
+
+    hasta es inclusivo (fecha YYYY-MM-DD). condicion y params agregan un
+    filtro extra sobre cada partición. Con incluir_archivados=True se
+    adjuntan (ATTACH) los archivos de los meses archivados del rango.
+    """
+    filtros, valores = [], []
+    if desde:
+        filtros.append("fecha_transaccion >= ?")
+        valores.append(desde)
+    if hasta:
+        filtros.append("fecha_transaccion < date(?, '+1 day')")
+        valores.append(hasta)
+    if condicion:
+        filtros.append(f"({condicion})")
+        valores.extend(params)
+    where = f" WHERE {' AND '.join(filtros)}" if filtros else ""
+
+    fuentes = [PENDIENTES]
+    adjuntos = []
+    for mes, tabla, estado, archivo in tablas_para_rango(conn, desde, hasta):
+        if estado == "ACTIVA":
+            fuentes.append(tabla)
+        elif incluir_archivados:
+            alias = f"archivo_{tabla}"
+            conn.execute("ATTACH DATABASE ? AS " + alias, (archivo,))
+            adjuntos.append(alias)
+            fuentes.append(f"{alias}.{tabla}")
+    consulta = "\nUNION ALL\n".join(f"SELECT {columnas} FROM {fuente}{where}" for fuente in fuentes)
+    try:
+        return pd.read_sql_query(consulta, conn, params=valores * len(fuentes))
+    finally:
+        for alias in adjuntos:
+            conn.execute(f"DETACH DATABASE {alias}")
+
+
+def archivar(conn, mes, directorio=DIR_ARCHIVO):
+    """Copia un mes a su propio archivo y lo elimina de la base principal"""
+    tabla = nombre_particion(mes)
+    fila = conn.execute("SELECT estado FROM particiones_transacciones WHERE mes = ?", (mes,)).fetchone()
+    if fila is None or fila[0] != "ACTIVA":
+        raise ValueError(f"El mes {mes} no es una partición activa")
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    archivo = directorio / f"{tabla}.db"
+    if archivo.exists():
+        raise FileExistsError(f"Ya existe {archivo}")
+
+    inicio = time.perf_counter()
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (tabla,)).fetchone()[0]
+    conn.execute("ATTACH DATABASE ? AS archivo", (str(archivo),))
+    archivado = False
+    try:
+        # 1) La copia se confirma sola en el archivo: un COMMIT que toca dos archivos
+        #    no es atómico en modo WAL. BEGIN explícito: el DDL no abre transacción solo
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(ddl.replace(f"CREATE TABLE IF NOT EXISTS {tabla}", f"CREATE TABLE archivo.{tabla}", 1)
+                            .replace(f"CREATE TABLE {tabla}", f"CREATE TABLE archivo.{tabla}", 1))
+            filas = conn.execute(f"INSERT INTO archivo.{tabla} SELECT * FROM main.{tabla}").rowcount
+            conn.execute(f"CREATE INDEX archivo.idx_{tabla}_cuenta ON {tabla}(cuenta_id)")
+            conn.execute(f"CREATE INDEX archivo.idx_{tabla}_fecha ON {tabla}(fecha_transaccion)")
+        copiadas = conn.execute(f"SELECT COUNT(*) FROM archivo.{tabla}").fetchone()[0]
+        originales = conn.execute(f"SELECT COUNT(*) FROM main.{tabla}").fetchone()[0]
+        if copiadas != originales:
+            raise RuntimeError(f"El archivo de {mes} tiene {copiadas:,} filas y la partición {originales:,}")
+        # 2) Solo con la copia verificada se elimina el mes de la base principal
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(f"DROP TABLE main.{tabla}")
+            conn.execute("UPDATE particiones_transacciones SET estado = 'ARCHIVADA', archivo = ?, filas = ? "
+                         "WHERE mes = ?", (str(archivo), filas, mes))
+            reconstruir_vista(conn)
+        archivado = True
+    finally:
+        conn.execute("DETACH DATABASE archivo")
+        if not archivado:
+            # El mes sigue en la base principal: sin el archivo a medias se puede reintentar
+            archivo.unlink(missing_ok=True)
+    print(f"🧊 {mes} archivado en {archivo}: {filas:,} filas ({time.perf_counter() - inicio:.2f} s). "
+          "El espacio se libera con VACUUM.")
+    return archivo
+
+
+def restaurar(conn, mes):
+    """Devuelve un mes archivado a la base principal"""
+    fila = conn.execute("SELECT tabla, estado, archivo FROM particiones_transacciones WHERE mes = ?",
+                        (mes,)).fetchone()
+    if fila is None or fila[1] != "ARCHIVADA":
+        raise ValueError(f"El mes {mes} no está archivado")
+    tabla, _, archivo = fila
+    conn.execute("ATTACH DATABASE ? AS archivo", (archivo,))
+    try:
+        with conn:
+            _crear_particion(conn, mes)
+            filas = conn.execute(f"INSERT INTO main.{tabla} SELECT * FROM archivo.{tabla}").rowcount
+            conn.execute("UPDATE particiones_transacciones SET estado = 'ACTIVA', archivo = NULL, filas = ? "
+                         "WHERE mes = ?", (filas, mes))
+            reconstruir_vista(conn)
+    finally:
+        conn.execute("DETACH DATABASE archivo")
+    print(f"♻️ {mes} restaurado desde {archivo}: {filas:,} filas (el archivo se conserva)")
+    return filas
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Particiones mensuales de transacciones")
+    parser.add_argument("accion", choices=["activar", "consolidar", "listar", "consultar",
+                                           "archivar", "restaurar", "desactivar"])
+    parser.add_argument("mes", nargs="?", help="Mes YYYY-MM para archivar/restaurar")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--desde", help="Fecha inicial para 'consultar' (YYYY-MM-DD)")
+    parser.add_argument("--hasta", help="Fecha final inclusiva para 'consultar' (YYYY-MM-DD)")
+    parser.add_argument("--directorio", default=str(DIR_ARCHIVO), help="Directorio de los meses archivados")
+    args = parser.parse_args(argv)
+    if args.accion in ("archivar", "restaurar") and not args.mes:
+        parser.error(f"'{args.accion}' requiere el mes (YYYY-MM)")
+
+    conn = conectar_bd(args.db, perfil="escritura")
+    if args.accion != "activar" and not esta_activo(conn):
+        conn.close()
+        raise SystemExit("❌ Las particiones no están activas: ejecuta primero 'activar'")
+
+    if args.accion == "activar":
+        activar(conn)
+    elif args.accion == "consolidar":
+        consolidar(conn)
+    elif args.accion == "listar":
+        print(pd.read_sql_query("SELECT * FROM particiones_transacciones ORDER BY mes", conn))
+    elif args.accion == "consultar":
+        tablas = tablas_para_rango(conn, args.desde, args.hasta)
+        inicio = time.perf_counter()
+        resultado = consultar_rango(conn, args.desde, args.hasta)
+        print(f"✂️ {len(tablas)} particiones leídas de {len(particiones(conn)) + len(particiones(conn, 'ARCHIVADA'))}: "
+              f"{len(resultado):,} filas en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        print(resultado.head())
+    elif args.accion == "archivar":
+        archivar(conn, args.mes, args.directorio)
+    elif args.accion == "restaurar":
+        restaurar(conn, args.mes)
+    elif args.accion == "desactivar":
+        desactivar(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
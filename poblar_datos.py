@@ -1,128 +1,476 @@
 #!/usr/bin/env python3
-import sqlite3
-import random
-from datetime import datetime, date, timedelta
-
-print("📊 Poblando base de datos con datos de muestra...")
-
-conn = sqlite3.connect("data/banking_core.db")
-cursor = conn.cursor()
-
-# 1. Insertar clientes de muestra
-print("👥 Insertando clientes...")
-clientes_data = [
-    ("CLI001", "Ana María", "González López", "CC", "12345678", "1985-03-15", "F", "Soltero", "555-0101", "ana.gonzalez@email.com", "Calle 123 #45-67", "Bogotá", "Cundinamarca", "110111", "Ingeniera", 4500000, "Premium", "2020-01-15"),
-    ("CLI002", "Carlos", "Rodríguez Pérez", "CC", "87654321", "1978-07-22", "M", "Casado", "555-0102", "carlos.rodriguez@email.com", "Carrera 45 #23-89", "Medellín", "Antioquia", "050001", "Médico", 8500000, "Premium", "2019-06-10"),
-    ("CLI003", "María Elena", "Castro Silva", "CC", "11223344", "1990-11-08", "F", "Soltero", "555-0103", "maria.castro@email.com", "Avenida 68 #12-34", "Cali", "Valle", "760001", "Contadora", 3200000, "Estándar", "2021-03-20"),
-    ("CLI004", "José Luis", "Martínez Torres", "CC", "44332211", "1982-05-14", "M", "Casado", "555-0104", "jose.martinez@email.com", "Calle 85 #15-42", "Barranquilla", "Atlántico", "080001", "Abogado", 5500000, "Premium", "2020-08-05"),
-    ("CLI005", "Diana Patricia", "López Ramírez", "CC", "55667788", "1995-09-30", "F", "Soltero", "555-0105", "diana.lopez@email.com", "Carrera 15 #67-89", "Bucaramanga", "Santander", "680001", "Administradora", 2800000, "Estándar", "2022-01-12")
-]
+# -*- coding: utf-8 -*-
+"""
+📊 GENERADOR DE DATOS BANCARIOS SINTÉTICOS
+==========================================
 
-for cliente in clientes_data:
-    cursor.execute("""
-        INSERT OR REPLACE INTO clientes 
-        (numero_cliente, nombres, apellidos, tipo_documento, numero_documento, fecha_nacimiento, 
-         genero, estado_civil, telefono, email, direccion, ciudad, departamento, 
-         codigo_postal, ocupacion, ingresos_mensuales, segmento_cliente, fecha_vinculacion, estado)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'ACTIVO')
-    """, cliente)
-
-print(f"✅ {len(clientes_data)} clientes insertados")
-
-# 2. Insertar cuentas
-print("🏦 Insertando cuentas...")
-cuentas_data = [
-    ("CTA001", 1, 1, 1, 1500000.00, 1500000.00, 0.02, "2020-01-20"),  # Ahorro
-    ("CTA002", 1, 2, 1, 850000.00, 850000.00, 0.01, "2020-02-15"),    # Corriente
-    ("CTA003", 2, 1, 2, 3200000.00, 3200000.00, 0.025, "2019-06-15"), # Ahorro
-    ("CTA004", 2, 3, 2, 12500000.00, 12500000.00, 0.08, "2019-08-10"), # Inversión
-    ("CTA005", 3, 1, 3, 980000.00, 980000.00, 0.02, "2021-03-25"),    # Ahorro
-    ("CTA006", 4, 2, 4, 2100000.00, 2100000.00, 0.01, "2020-08-10"),  # Corriente
-    ("CTA007", 4, 1, 4, 5800000.00, 5800000.00, 0.025, "2020-09-05"), # Ahorro
-    ("CTA008", 5, 1, 1, 650000.00, 650000.00, 0.02, "2022-01-18")     # Ahorro
-]
+Genera clientes, cuentas, préstamos y transacciones a cualquier escala.
+Los datos se producen por bloques con NumPy y se insertan con executemany
+dentro de transacciones grandes. Con la misma semilla y los mismos
+parámetros siempre se obtienen exactamente los mismos datos, sin importar
+cuántos procesos (--procesos) participen en la carga.
+
+Ejemplos:
+    python poblar_datos.py                                   # dataset de práctica
+    python poblar_datos.py --clientes 1_000_000 --tx-por-cuenta 500 --reiniciar
+    python poblar_datos.py --clientes 1_000_000 --procesos 8 --reiniciar   # carga en shards
+    python poblar_datos.py --clientes 1_000_000 --diferir-indices --reiniciar
+"""
+
+import argparse
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, redirect_stdout
+from pathlib import Path
+
+import numpy as np
 
-for cuenta in cuentas_data:
-    cursor.execute("""
-        INSERT OR REPLACE INTO cuentas 
-        (numero_cuenta, cliente_id, producto_id, sucursal_id, saldo_actual, 
-         saldo_disponible, tasa_interes, fecha_apertura, estado)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'ACTIVA')
-    """, cuenta)
-
-print(f"✅ {len(cuentas_data)} cuentas insertadas")
-
-# 3. Insertar préstamos
-print("💰 Insertando préstamos...")
-prestamos_data = [
-    ("PRES001", 2, 4, 85000000.00, 85000000.00, 84200000.00, 0.12, 240, 650000.00, "2019-06-01", "2019-07-01", "2039-07-01", "Vivienda Propia"),
-    ("PRES002", 4, 5, 35000000.00, 35000000.00, 28500000.00, 0.15, 60, 720000.00, "2020-12-15", "2021-01-15", "2026-01-15", "Vehículo Personal"),
-    ("PRES003", 1, 6, 8000000.00, 8000000.00, 6200000.00, 0.18, 36, 280000.00, "2022-02-28", "2022-03-10", "2025-03-10", "Gastos Personales"),
-    ("PRES004", 3, 4, 15000000.00, 15000000.00, 12800000.00, 0.10, 84, 220000.00, "2021-07-15", "2021-08-01", "2028-08-01", "Educación Superior")
+from amortizacion import sumar_meses
+from conexion_bd import DB_PATH, conectar_bd
+from particiones_transacciones import PENDIENTES, esta_activo, particiones
+from reconstruir_indices import indices_diferidos
+from setup_environment import create_database_structure, create_sample_data
+
+CIUDADES = [
+    ("Bogotá", "Cundinamarca", "110111"),
+    ("Medellín", "Antioquia", "050001"),
+    ("Cali", "Valle del Cauca", "760001"),
+    ("Barranquilla", "Atlántico", "080001"),
+    ("Bucaramanga", "Santander", "680001"),
+    ("Cartagena", "Bolívar", "130001"),
+    ("Pereira", "Risaralda", "660001"),
+    ("Manizales", "Caldas", "170001"),
 ]
+NOMBRES_F = ["Ana María", "María Elena", "Diana Patricia", "Laura", "Camila", "Valentina", "Paula Andrea", "Sofía"]
+NOMBRES_M = ["Carlos", "José Luis", "Andrés", "Juan Pablo", "Santiago", "Felipe", "Jorge", "Daniel"]
+APELLIDOS = ["González", "Rodríguez", "Castro", "Martínez", "López", "Pérez", "Torres", "Ramírez", "Silva", "Gómez"]
+ESTADOS_CIVILES = ["Soltero", "Casado", "Unión libre", "Divorciado"]
+OCUPACIONES = ["Ingeniera", "Médico", "Contadora", "Abogado", "Administradora", "Docente", "Comerciante", "Independiente"]
+
+TIPOS_TRANSACCION = ["Depósito", "Retiro", "Transferencia", "Pago servicios", "Consignación"]
+TIPOS_CREDITO = np.array([True, False, False, False, True])  # suman al saldo
+CANALES = ["Sucursal", "ATM", "Online", "App móvil"]
+
+# Productos y sucursales insertados por setup_environment.create_sample_data
+PRODUCTOS_CUENTA = np.array([1, 2, 3])      # corriente, ahorros, CDT
+TASAS_CUENTA = np.array([0.0, 0.0075, 0.05])
+PRODUCTOS_PRESTAMO = np.array([4, 5, 6])    # consumo, vivienda, tarjeta
+TASA_MIN_PRESTAMO = np.array([0.12, 0.08, 0.18])
+TASA_MAX_PRESTAMO = np.array([0.24, 0.12, 0.24])
+PROPOSITOS_PRESTAMO = ["Gastos Personales", "Vivienda Propia", "Compras con Tarjeta"]
+PLAZOS_MESES = np.array([12, 24, 36, 60, 84, 120, 240])
+NUM_SUCURSALES = 4
+
+COLUMNAS = {
+    "clientes": (
+        "cliente_id", "numero_cliente", "nombres", "apellidos", "tipo_documento", "numero_documento",
+        "fecha_nacimiento", "genero", "estado_civil", "telefono", "email", "direccion", "ciudad",
+        "departamento", "codigo_postal", "ocupacion", "ingresos_mensuales", "segmento_cliente",
+        "fecha_vinculacion", "estado",
+    ),
+    "cuentas": (
+        "cuenta_id", "numero_cuenta", "cliente_id", "producto_id", "sucursal_id", "saldo_actual",
+        "saldo_disponible", "tasa_interes", "fecha_apertura", "estado",
+    ),
+    "prestamos": (
+        "prestamo_id", "numero_prestamo", "cliente_id", "producto_id", "monto_aprobado",
+        "monto_desembolsado", "saldo_capital", "tasa_interes", "plazo_meses", "cuota_mensual",
+        "fecha_aprobacion", "fecha_desembolso", "fecha_vencimiento", "proposito_credito", "estado",
+        "dias_mora",
+    ),
+    "transacciones": (
+        "transaccion_id", "numero_transaccion", "cuenta_id", "tipo_transaccion", "monto", "descripcion",
+        "fecha_transaccion", "canal", "sucursal_id", "saldo_anterior", "saldo_posterior", "estado",
+        "comision", "impuesto",
+    ),
+}
+SQL_INSERT = {
+    tabla: f"INSERT INTO {tabla} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+    for tabla, cols in COLUMNAS.items()
+}
+
+
+def parse_args(argv=None):
+    """Lee los parámetros de escala desde la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Genera datos bancarios sintéticos reproducibles")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--clientes", "--clients", type=int, default=1_000, help="Número de clientes")
+    parser.add_argument("--cuentas-por-cliente", type=int, default=2, help="Cuentas por cliente")
+    parser.add_argument("--tx-por-cuenta", "--tx-per-account", type=int, default=50,
+                        help="Transacciones por cuenta")
+    parser.add_argument("--ratio-prestamos", type=float, default=0.35,
+                        help="Fracción de clientes con préstamo")
+    parser.add_argument("--dias-historia", type=int, default=365, help="Días de historia transaccional")
+    parser.add_argument("--fecha-corte", default="2024-12-31", help="Fecha de corte de los datos")
+    parser.add_argument("--semilla", "--seed", type=int, default=42, help="Semilla del generador")
+    parser.add_argument("--lote", type=int, default=250_000,
+                        help="Transacciones generadas por bloque (define también el tamaño del bloque)")
+    parser.add_argument("--filas-por-commit", type=int, default=2_000_000,
+                        help="Filas insertadas antes de cada COMMIT")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos que generan shards en paralelo (1 = carga directa)")
+    parser.add_argument("--diferir-indices", action="store_true",
+                        help="Elimina los índices secundarios y los crea al final de la carga")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Borra clientes, cuentas, préstamos y transacciones antes de cargar")
+    return parser.parse_args(argv)
+
+
+def clientes_por_bloque(args):
+    """Número de clientes de cada bloque para que un bloque tenga ~--lote transacciones"""
+    return max(1, args.lote // max(1, args.cuentas_por_cliente * args.tx_por_cuenta))
+
+
+def num_bloques(args):
+    """Número total de bloques a generar"""
+    tamano = clientes_por_bloque(args)
+    return (args.clientes + tamano - 1) // tamano
+
+
+def _fechas(dias):
+    """Convierte un arreglo datetime64[D] en textos 'YYYY-MM-DD'"""
+    return np.datetime_as_string(dias, unit="D").tolist()
+
+
+def _fechas_hora(segundos):
+    """Convierte segundos desde epoch en textos 'YYYY-MM-DD HH:MM:SS'"""
+    textos = np.datetime_as_string(segundos.astype("datetime64[s]"), unit="s")
+    return np.char.replace(textos, "T", " ").tolist()
+
+
+def segmentar(ingresos):
+    """Segmento por ingresos con los mismos cortes de actualizar_segmentos.py"""
+    segmentos = np.array(["Básico", "Estándar", "Premium", "VIP"])
+    return segmentos[np.searchsorted([2_500_000, 5_000_000, 8_000_000], ingresos, side="right")]
+
+
+def generar_clientes(rng, cliente_id, corte):
+    """Genera las filas de clientes para los ids dados"""
+    n = len(cliente_id)
+    genero = np.where(rng.random(n) < 0.5, "F", "M")
+    nombres = np.where(genero == "F",
+                       np.array(NOMBRES_F)[rng.integers(0, len(NOMBRES_F), n)],
+                       np.array(NOMBRES_M)[rng.integers(0, len(NOMBRES_M), n)])
+    apellidos = np.char.add(np.char.add(np.array(APELLIDOS)[rng.integers(0, len(APELLIDOS), n)], " "),
+                            np.array(APELLIDOS)[rng.integers(0, len(APELLIDOS), n)])
+    ciudad_idx = rng.integers(0, len(CIUDADES), n)
+    ciudades = np.array([c[0] for c in CIUDADES])[ciudad_idx]
+    departamentos = np.array([c[1] for c in CIUDADES])[ciudad_idx]
+    codigos = np.array([c[2] for c in CIUDADES])[ciudad_idx]
+    ingresos = np.round(rng.lognormal(np.log(3_500_000), 0.6, n), -3)
+    nacimiento = corte - rng.integers(18 * 365, 75 * 365, n).astype("timedelta64[D]")
+    vinculacion = corte - rng.integers(30, 10 * 365, n).astype("timedelta64[D]")
+    ids = cliente_id.tolist()
+
+    filas = zip(
+        ids,
+        [f"CLI{i:09d}" for i in ids],
+        nombres.tolist(),
+        apellidos.tolist(),
+        ["CC"] * n,
+        [str(10_000_000 + i) for i in ids],
+        _fechas(nacimiento),
+        genero.tolist(),
+        np.array(ESTADOS_CIVILES)[rng.integers(0, len(ESTADOS_CIVILES), n)].tolist(),
+        [f"555-{i % 10_000:04d}" for i in ids],
+        [f"cliente{i}@email.com" for i in ids],
+        [f"Calle {c} #{k}-{m}" for c, k, m in zip(rng.integers(1, 200, n).tolist(),
+                                                  rng.integers(1, 100, n).tolist(),
+                                                  rng.integers(1, 100, n).tolist())],
+        ciudades.tolist(),
+        departamentos.tolist(),
+        codigos.tolist(),
+        np.array(OCUPACIONES)[rng.integers(0, len(OCUPACIONES), n)].tolist(),
+        ingresos.tolist(),
+        segmentar(ingresos).tolist(),
+        _fechas(vinculacion),
+        ["ACTIVO"] * n,
+    )
+    return list(filas), vinculacion
+
+
+def generar_cuentas(rng, cliente_id, vinculacion, cuentas_por_cliente, corte):
+    """Genera los atributos de las cuentas de cada cliente; los ids se derivan del cliente"""
+    m = len(cliente_id) * cuentas_por_cliente
+    titular = np.repeat(cliente_id, cuentas_por_cliente)
+    producto_idx = rng.integers(0, len(PRODUCTOS_CUENTA), m)
+    antiguedad = (corte - np.repeat(vinculacion, cuentas_por_cliente)).astype(int)
+    return {
+        "cuenta_id": (titular - 1) * cuentas_por_cliente + np.tile(np.arange(1, cuentas_por_cliente + 1),
+                                                                   len(cliente_id)),
+        "titular": titular,
+        "producto_id": PRODUCTOS_CUENTA[producto_idx],
+        "tasa_interes": TASAS_CUENTA[producto_idx],
+        "sucursal_id": rng.integers(1, NUM_SUCURSALES + 1, m),
+        "apertura": corte - (rng.random(m) * antiguedad).astype(int).astype("timedelta64[D]"),
+        "saldo_inicial": np.round(rng.lognormal(np.log(2_000_000), 1.0, m), 2),
+    }
+
+
+def filas_cuentas(cuentas, saldo_actual):
+    """Arma las filas de cuentas con el saldo final de su cadena de movimientos"""
+    ids = cuentas["cuenta_id"].tolist()
+    saldo = np.round(saldo_actual, 2).tolist()
+    filas = zip(
+        ids,
+        [f"CTA{i:010d}" for i in ids],
+        cuentas["titular"].tolist(),
+        cuentas["producto_id"].tolist(),
+        cuentas["sucursal_id"].tolist(),
+        saldo,
+        saldo,
+        cuentas["tasa_interes"].tolist(),
+        _fechas(cuentas["apertura"]),
+        ["ACTIVA"] * len(ids),
+    )
+    return list(filas)
+
+
+def generar_prestamos(rng, cliente_id, ratio, corte):
+    """Genera préstamos para una fracción de clientes (prestamo_id = cliente_id)"""
+    con_prestamo = cliente_id[rng.random(len(cliente_id)) < ratio]
+    k = len(con_prestamo)
+    producto_idx = rng.integers(0, len(PRODUCTOS_PRESTAMO), k)
+    monto = np.round(rng.lognormal(np.log(20_000_000), 0.9, k), -3)
+    tasa = np.round(TASA_MIN_PRESTAMO[producto_idx]
+                    + rng.random(k) * (TASA_MAX_PRESTAMO[producto_idx] - TASA_MIN_PRESTAMO[producto_idx]), 4)
+    plazo = PLAZOS_MESES[rng.integers(0, len(PLAZOS_MESES), k)]
+    tasa_mes = tasa / 12
+    cuota = np.round(monto * tasa_mes / (1 - (1 + tasa_mes) ** -plazo), 2)
+    aprobacion = corte - rng.integers(30, 5 * 365, k).astype("timedelta64[D]")
+    desembolso = aprobacion + rng.integers(1, 30, k).astype("timedelta64[D]")
+    vencimiento = sumar_meses(desembolso, plazo)
+    ids = con_prestamo.tolist()
+
+    filas = zip(
+        ids,
+        [f"PRES{i:09d}" for i in ids],
+        ids,
+        PRODUCTOS_PRESTAMO[producto_idx].tolist(),
+        monto.tolist(),
+        monto.tolist(),
+        np.round(monto * rng.uniform(0.3, 1.0, k), 2).tolist(),
+        tasa.tolist(),
+        plazo.tolist(),
+        cuota.tolist(),
+        _fechas(aprobacion),
+        _fechas(desembolso),
+        _fechas(vencimiento),
+        np.array(PROPOSITOS_PRESTAMO)[producto_idx].tolist(),
+        ["VIGENTE"] * k,
+        [0] * k,
+    )
+    return list(filas)
+
+
+def encadenar_saldos(cuenta_idx, monto, saldo_inicial):
+    """Calcula saldo_anterior/saldo_posterior de cada movimiento sin bucles de Python.
+
+    cuenta_idx (posición de la cuenta de cada movimiento en saldo_inicial) y monto
+    deben venir ordenados por cuenta y fecha. El saldo posterior es el saldo
+    inicial de la cuenta más la suma acumulada de sus movimientos hasta la fila.
+    """
+    acumulado = np.cumsum(monto)
+    inicio_grupo = np.flatnonzero(np.r_[True, cuenta_idx[1:] != cuenta_idx[:-1]])
+    largo_grupo = np.diff(np.r_[inicio_grupo, len(monto)])
+    base = np.repeat(acumulado[inicio_grupo] - monto[inicio_grupo], largo_grupo)
+    saldo_posterior = saldo_inicial[cuenta_idx] + (acumulado - base)
+    return np.round(saldo_posterior - monto, 2), np.round(saldo_posterior, 2)
+
+
+def generar_transacciones(rng, cuentas, tx_por_cuenta, dias_historia, corte):
+    """Genera tx_por_cuenta movimientos por cuenta con saldos encadenados.
+
+    Devuelve las filas y el saldo final de cada cuenta (saldo inicial + movimientos).
+    """
+    cuenta_id = cuentas["cuenta_id"]
+    t = len(cuenta_id) * tx_por_cuenta
+    cuenta_idx = np.repeat(np.arange(len(cuenta_id)), tx_por_cuenta)
+    cuenta = cuenta_id[cuenta_idx]
+    transaccion_id = (cuenta - 1) * tx_por_cuenta + np.tile(np.arange(1, tx_por_cuenta + 1), len(cuenta_id))
+    tipo_idx = rng.integers(0, len(TIPOS_TRANSACCION), t)
+    monto = np.where(TIPOS_CREDITO[tipo_idx],
+                     rng.integers(100_000, 2_000_000, t),
+                     -rng.integers(50_000, 1_500_000, t)).astype(float)
+
+    fin = (corte + np.timedelta64(1, "D")).astype("datetime64[s]").astype(np.int64)
+    inicio = np.maximum(cuentas["apertura"].astype("datetime64[s]").astype(np.int64), fin - dias_historia * 86_400)
+    fecha = inicio[cuenta_idx] + (rng.random(t) * (fin - inicio[cuenta_idx])).astype(np.int64)
+
+    # Orden cronológico dentro de cada cuenta; los ids siguen siendo posicionales,
+    # así transaccion_id también crece con la fecha dentro de la cuenta.
+    orden = np.lexsort((fecha, cuenta_idx))
+    fecha, tipo_idx, monto = fecha[orden], tipo_idx[orden], monto[orden]
+    saldo_anterior, saldo_posterior = encadenar_saldos(cuenta_idx, monto, cuentas["saldo_inicial"])
+    saldo_final = cuentas["saldo_inicial"] + np.bincount(cuenta_idx, weights=monto, minlength=len(cuenta_id))
+
+    tipos = np.array(TIPOS_TRANSACCION)[tipo_idx].tolist()
+    ids = transaccion_id.tolist()
+
+    filas = zip(
+        ids,
+        [f"TXN{i:012d}" for i in ids],
+        cuenta.tolist(),
+        tipos,
+        monto.tolist(),
+        [f"Transacción {tipo} #{i}" for tipo, i in zip(tipos, ids)],
+        _fechas_hora(fecha),
+        np.array(CANALES)[rng.integers(0, len(CANALES), t)].tolist(),
+        rng.integers(1, NUM_SUCURSALES + 1, t).tolist(),
+        saldo_anterior.tolist(),
+        saldo_posterior.tolist(),
+        ["COMPLETADA"] * t,
+        [0] * t,
+        [0] * t,
+    )
+    return list(filas), saldo_final
+
+
+def generar_bloque(bloque, args):
+    """Genera todas las filas de un bloque de clientes.
+
+    Cada bloque tiene su propio generador derivado de (semilla, bloque), así el
+    resultado no depende del orden ni del proceso en que se generen los bloques.
+    """
+    rng = np.random.default_rng([args.semilla, bloque])
+    corte = np.datetime64(args.fecha_corte, "D")
+    tamano = clientes_por_bloque(args)
+    primero = bloque * tamano + 1
+    cliente_id = np.arange(primero, min(primero + tamano, args.clientes + 1))
+
+    clientes, vinculacion = generar_clientes(rng, cliente_id, corte)
+    cuentas = generar_cuentas(rng, cliente_id, vinculacion, args.cuentas_por_cliente, corte)
+    prestamos = generar_prestamos(rng, cliente_id, args.ratio_prestamos, corte)
+    transacciones, saldo_final = generar_transacciones(rng, cuentas, args.tx_por_cuenta, args.dias_historia, corte)
+    return {
+        "clientes": clientes,
+        "cuentas": filas_cuentas(cuentas, saldo_final),
+        "prestamos": prestamos,
+        "transacciones": transacciones,
+    }
+
+
+def preparar_bd(conn, db_path, reiniciar):
+    """Crea el esquema y el catálogo base; valida que las tablas estén vacías"""
+    create_database_structure(db_path)
+    if conn.execute("SELECT COUNT(*) FROM productos_financieros").fetchone()[0] == 0:
+        create_sample_data(db_path)
+
+    if reiniciar:
+        print("🧹 Borrando datos anteriores...")
+        tablas_transacciones = ["transacciones"]
+        if esta_activo(conn):
+            # transacciones es la vista de particiones_transacciones.py: se vacía cada tabla
+            if particiones(conn, "ARCHIVADA"):
+                raise SystemExit("❌ Hay meses de transacciones archivados: restáuralos antes de --reiniciar")
+            tablas_transacciones = [PENDIENTES] + [tabla for _, tabla in particiones(conn)]
+            conn.execute("UPDATE particiones_transacciones SET filas = 0")
+        for tabla in tablas_transacciones + ["prestamos", "cuentas", "clientes"]:
+            conn.execute(f"DELETE FROM {tabla}")
+        conn.commit()
+    elif conn.execute("SELECT EXISTS (SELECT 1 FROM clientes)").fetchone()[0]:
+        raise SystemExit("❌ La tabla clientes ya tiene datos. Usa --reiniciar para regenerarlos.")
+
+
+def insertar_bloque(conn, datos):
+    """Inserta las filas de un bloque con executemany; devuelve filas insertadas"""
+    total = 0
+    for tabla, filas in datos.items():
+        conn.executemany(SQL_INSERT[tabla], filas)
+        total += len(filas)
+    return total
+
+
+def cargar_bloques(conn, args, bloques, etiqueta=""):
+    """Genera e inserta una secuencia de bloques con COMMIT cada --filas-por-commit filas"""
+    inicio = time.perf_counter()
+    filas_total = 0
+    filas_pendientes = 0
+    for n, bloque in enumerate(bloques, 1):
+        filas = insertar_bloque(conn, generar_bloque(bloque, args))
+        filas_total += filas
+        filas_pendientes += filas
+        if filas_pendientes >= args.filas_por_commit or n == len(bloques):
+            conn.commit()
+            filas_pendientes = 0
+            segundos = time.perf_counter() - inicio
+            print(f"   💾 {etiqueta}Bloque {n}/{len(bloques)}: {filas_total:,} filas "
+                  f"({filas_total / segundos:,.0f} filas/s)")
+    return filas_total
+
+
+def ruta_shard(db_path, shard):
+    """Archivo temporal donde un proceso escribe su rango de claves"""
+    return Path(f"{db_path}.shard{shard:02d}")
+
+
+def cargar_shard(args, shard, bloques):
+    """Trabajo de un proceso: genera sus bloques en un archivo shard propio.
+
+    Los ids se derivan del número de bloque, así que cada shard contiene un
+    rango disjunto de cliente_id, cuenta_id y transaccion_id.
+    """
+    ruta = ruta_shard(args.db, shard)
+    ruta.unlink(missing_ok=True)
+    with redirect_stdout(io.StringIO()):
+        create_database_structure(ruta, with_indexes=False)
+    conn = conectar_bd(ruta, perfil="escritura")
+    # El shard es desechable: no necesita durabilidad
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = OFF")
+    filas = cargar_bloques(conn, args, bloques, etiqueta=f"[shard {shard}] ")
+    conn.close()
+    return str(ruta), filas
+
+
+def fusionar_shards(conn, rutas):
+    """Copia cada shard a la base principal con ATTACH + INSERT ... SELECT"""
+    for ruta in rutas:
+        print(f"   🔗 Fusionando {ruta}...")
+        conn.execute("ATTACH DATABASE ? AS shard", (ruta,))
+        with conn:
+            for tabla in COLUMNAS:
+                columnas = ", ".join(COLUMNAS[tabla])
+                conn.execute(f"INSERT INTO main.{tabla} ({columnas}) SELECT {columnas} FROM shard.{tabla}")
+        conn.execute("DETACH DATABASE shard")
+        Path(ruta).unlink()
+
+
+def carga_paralela(conn, args):
+    """Reparte los bloques entre --procesos workers y fusiona sus shards"""
+    bloques = list(range(num_bloques(args)))
+    procesos = min(args.procesos, len(bloques))
+    # Rangos contiguos de bloques: cada shard queda ordenado por clave primaria
+    tramos = [bloques[i * len(bloques) // procesos:(i + 1) * len(bloques) // procesos]
+              for i in range(procesos)]
+    print(f"   ⚙️  Carga paralela con {procesos} procesos")
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        resultados = list(pool.map(cargar_shard, [args] * procesos, range(procesos), tramos))
+    fusionar_shards(conn, [ruta for ruta, _ in resultados])
+    return sum(filas for _, filas in resultados)
+
+
+def main(argv=None):
+    """Genera y carga el dataset completo"""
+    args = parse_args(argv)
+    print("📊 Poblando base de datos con datos sintéticos...")
+    print(f"   👥 {args.clientes:,} clientes × {args.cuentas_por_cliente} cuentas × "
+          f"{args.tx_por_cuenta} transacciones (semilla {args.semilla})")
+
+    conn = conectar_bd(args.db, perfil="escritura")
+    preparar_bd(conn, args.db, args.reiniciar)
+
+    inicio = time.perf_counter()
+    with indices_diferidos(conn) if args.diferir_indices else nullcontext():
+        if args.procesos > 1:
+            filas_total = carga_paralela(conn, args)
+        else:
+            filas_total = cargar_bloques(conn, args, list(range(num_bloques(args))))
+
+    conn.close()
+    segundos = time.perf_counter() - inicio
+    print(f"\n🎉 ¡Base de datos poblada! {filas_total:,} filas en {segundos:.1f} s")
 
-for prestamo in prestamos_data:
-    cursor.execute("""
-        INSERT OR REPLACE INTO prestamos 
-        (numero_prestamo, cliente_id, producto_id, monto_aprobado, monto_desembolsado, 
-         saldo_capital, tasa_interes, plazo_meses, cuota_mensual, fecha_aprobacion, 
-         fecha_desembolso, fecha_vencimiento, proposito_credito, estado, dias_mora)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'VIGENTE', 0)
-    """, prestamo)
-
-print(f"✅ {len(prestamos_data)} préstamos insertados")
-
-# 4. Insertar transacciones (últimos 30 días)
-print("💳 Insertando transacciones...")
-base_date = datetime.now() - timedelta(days=30)
-transacciones = []
-
-tipos_transaccion = ["Depósito", "Retiro", "Transferencia", "Pago servicios", "Consignación"]
-canales = ["Sucursal", "ATM", "Online", "App móvil"]
-
-for i in range(50):  # 50 transacciones de muestra
-    fecha = base_date + timedelta(days=random.randint(0, 30))
-    cuenta_id = random.randint(1, 8)
-    tipo = random.choice(tipos_transaccion)
-    
-    if tipo in ["Depósito", "Consignación"]:
-        monto = random.randint(100000, 2000000)
-    else:
-        monto = -random.randint(50000, 1500000)
-    
-    canal = random.choice(canales)
-    sucursal_id = random.randint(1, 4)
-    
-    # Simular saldos
-    saldo_anterior = random.randint(500000, 5000000)
-    saldo_posterior = saldo_anterior + monto
-    
-    transacciones.append((
-        f"TXN{i+1:03d}",
-        cuenta_id,
-        tipo,
-        monto,
-        f"Transacción {tipo} #{i+1}",
-        fecha.strftime("%Y-%m-%d %H:%M:%S"),
-        canal,
-        sucursal_id,
-        saldo_anterior,
-        saldo_posterior
-    ))
-
-for txn in transacciones:
-    cursor.execute("""
-        INSERT OR REPLACE INTO transacciones 
-        (numero_transaccion, cuenta_id, tipo_transaccion, monto, descripcion, 
-         fecha_transaccion, canal, sucursal_id, saldo_anterior, saldo_posterior, 
-         estado, comision, impuesto)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'COMPLETADA', 0, 0)
-    """, txn)
-
-print(f"✅ {len(transacciones)} transacciones insertadas")
-
-# Commit y cerrar
-conn.commit()
-conn.close()
-
-print("\n🎉 ¡Base de datos poblada exitosamente!")
+if __name__ == "__main__":
+    main()
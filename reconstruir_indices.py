@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗂️ ELIMINAR Y RECONSTRUIR ÍNDICES
+=================================
+
+Durante una carga masiva cada INSERT paga el mantenimiento de todos los
+índices B-tree. Es mucho más rápido eliminarlos, cargar y crearlos al
+final en una sola pasada por tabla (seguido de ANALYZE).
+
+Los índices eliminados se guardan en la tabla `indices_diferidos`, así
+`crear` recupera exactamente los que había (incluidos los que no vienen
+de setup_environment). Los índices automáticos de UNIQUE/PRIMARY KEY son
+parte de la tabla y no se pueden diferir.
+
+Uso:
+    python reconstruir_indices.py eliminar      # antes del proceso batch
+    python reconstruir_indices.py crear         # después: crea índices + ANALYZE
+    python reconstruir_indices.py reconstruir   # eliminar + crear (índices compactos)
+"""
+
+import argparse
+import time
+from contextlib import contextmanager
+
+from conexion_bd import DB_PATH, conectar_bd
+from setup_environment import index_statements
+
+SQL_TABLA_DIFERIDOS = """
+CREATE TABLE IF NOT EXISTS indices_diferidos (
+    nombre TEXT PRIMARY KEY,
+    sql TEXT NOT NULL
+)
+"""
+
+
+def listar_indices(conn):
+    """Índices creados explícitamente (sin los automáticos de UNIQUE/PK)"""
+    return conn.execute("""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL
+        ORDER BY tbl_name, name
+    """).fetchall()
+
+
+def eliminar_indices(conn):
+    """Elimina los índices secundarios y guarda su DDL para recrearlos"""
+    indices = listar_indices(conn)
+    with conn:
+        conn.execute(SQL_TABLA_DIFERIDOS)
+        conn.executemany("INSERT OR REPLACE INTO indices_diferidos (nombre, sql) VALUES (?, ?)", indices)
+        for nombre, _ in indices:
+            conn.execute(f"DROP INDEX IF EXISTS {nombre}")
+    print(f"🗑️  {len(indices)} índices eliminados")
+    return [nombre for nombre, _ in indices]
+
+
+def crear_indices(conn, analizar=True):
+    """Crea los índices estándar y los diferidos; luego ejecuta ANALYZE"""
+    inicio = time.perf_counter()
+    conn.execute(SQL_TABLA_DIFERIDOS)
+    with conn:
+        for (sql,) in conn.execute("SELECT sql FROM indices_diferidos").fetchall():
+            conn.execute(sql)
+        conn.execute("DROP TABLE indices_diferidos")
+    # Los estándar que no estuvieran diferidos (por ejemplo en una base nueva)
+    with conn:
+        for sql in index_statements(conn):
+            conn.execute(sql)
+    if analizar:
+        conn.execute("ANALYZE")
+        conn.commit()
+    segundos = time.perf_counter() - inicio
+    print(f"🏗️  {len(listar_indices(conn))} índices creados en {segundos:.1f} s"
+          f"{' (con ANALYZE)' if analizar else ''}")
+    return segundos
+
+
+@contextmanager
+def indices_diferidos(conn):
+    """Elimina los índices al entrar y los reconstruye al salir de una carga"""
+    eliminar_indices(conn)
+    try:
+        yield
+    finally:
+        conn.commit()
+        crear_indices(conn)
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Elimina o reconstruye los índices de banking_core.db")
+    parser.add_argument("accion", choices=["eliminar", "crear", "reconstruir"])
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--sin-analyze", action="store_true", help="No ejecutar ANALYZE al crear")
+    args = parser.parse_args(argv)
+
+    conn = conectar_bd(args.db, perfil="escritura")
+    if args.accion in ("eliminar", "reconstruir"):
+        eliminar_indices(conn)
+    if args.accion in ("crear", "reconstruir"):
+        crear_indices(conn, analizar=not args.sin_analyze)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
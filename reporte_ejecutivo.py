@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 COMPILADOR DE REPORTES EJECUTIVOS SIN FAN-OUT
+================================================
+
+Unir clientes con cuentas, transacciones y préstamos en un solo SELECT
+(como el EJERCICIO 20 original) multiplica las filas de cada cliente:
+cuentas × transacciones × préstamos. COUNT(DISTINCT ...) esconde el
+problema en los conteos, pero SUM y AVG quedan inflados y el costo crece
+con el producto.
+
+Aquí cada tabla fuente se agrega primero al grano de cliente (a lo sumo
+una fila por cliente) y luego se unen esos resultados pequeños 1 a 1 con
+clientes y se re-agregan al grano pedido. Cada métrica se expresa como en
+ejecutor_consultas.agregar_por_bloques:
+
+    metricas = {
+        "cuentas":       {"total_cuentas": ("cuenta_id", "count"),
+                          "saldo_promedio_cuenta": ("saldo_actual", "mean")},
+        "transacciones": {"total_transacciones": ("t.transaccion_id", "count")},
+        "prestamos":     {"exposicion_crediticia": ("monto_aprobado", "sum")},
+    }
+    reporte(conn, metricas, por=["segmento_cliente"])
+
+Los promedios se combinan como suma / conteo, así son exactos en
+cualquier grano.
+
+Uso:
+    python reporte_ejecutivo.py [--por segmento_cliente ciudad] [--sql]
+"""
+
+import argparse
+
+from conexion_bd import DB_PATH, conectar_bd
+from ejecutor_consultas import ejecutar_consulta
+
+# Tabla fuente → (FROM, expresión de la llave de cliente)
+FUENTES = {
+    "clientes": ("clientes", "cliente_id"),
+    "cuentas": ("cuentas", "cliente_id"),
+    "transacciones": ("transacciones t JOIN cuentas cu ON cu.cuenta_id = t.cuenta_id", "cu.cliente_id"),
+    "prestamos": ("prestamos", "cliente_id"),
+}
+
+# Parciales por cliente y cómo se combinan al grano del reporte
+_PARCIALES = {"sum": ("SUM",), "count": ("COUNT",), "min": ("MIN",), "max": ("MAX",), "mean": ("SUM", "COUNT")}
+_COMBINAR = {"SUM": "SUM", "COUNT": "SUM", "MIN": "MIN", "MAX": "MAX"}
+
+METRICAS_EJECUTIVAS = {
+    "clientes": {
+        "total_clientes": ("cliente_id", "count"),
+    },
+    "cuentas": {
+        "total_cuentas": ("cuenta_id", "count"),
+        "saldo_promedio_cuenta": ("saldo_actual", "mean"),
+        "patrimonio_total_segmento": ("saldo_actual", "sum"),
+    },
+    "transacciones": {
+        "total_transacciones": ("t.transaccion_id", "count"),
+        "monto_promedio_transaccion": ("t.monto", "mean"),
+    },
+    "prestamos": {
+        "total_prestamos": ("prestamo_id", "count"),
+        "exposicion_crediticia": ("monto_aprobado", "sum"),
+        "tasa_promedio_prestamos": ("tasa_interes", "mean"),
+    },
+}
+
+
+def _validar(metricas):
+    for fuente, definiciones in metricas.items():
+        if fuente not in FUENTES:
+            raise ValueError(f"Fuente desconocida: {fuente} (usa {', '.join(FUENTES)})")
+        for salida, (_, funcion) in definiciones.items():
+            if funcion not in _PARCIALES:
+                raise ValueError(f"Agregación no soportada en '{salida}': {funcion} (usa {', '.join(_PARCIALES)})")
+
+
+def compilar_reporte(metricas, por=("segmento_cliente",), orden=None):
+    """Genera el SQL del reporte: un CTE por fuente al grano de cliente y un join 1 a 1.
+
+    por: columnas de clientes que definen el grano (por ejemplo
+    segmento_cliente, ciudad o cliente_id). orden: columna de salida por la
+    que ordenar de mayor a menor.
+    """
+    _validar(metricas)
+    por = list(por)
+    ctes, joins, columnas = [], [], []
+
+    for fuente, definiciones in metricas.items():
+        if fuente == "clientes":
+            # clientes es la base del reporte: ya está a grano de cliente
+            for salida, (columna, funcion) in definiciones.items():
+                if funcion == "mean":
+                    expresion = f"ROUND(AVG(c.{columna}), 2)"
+                elif funcion == "count":
+                    expresion = f"COUNT(c.{columna})"
+                else:
+                    expresion = f"ROUND({funcion.upper()}(c.{columna}), 2)"
+                columnas.append(f"{expresion} AS {salida}")
+            continue
+
+        origen, llave = FUENTES[fuente]
+        alias = f"{fuente}_por_cliente"
+        parciales = {}
+        for salida, (columna, funcion) in definiciones.items():
+            for agregado in _PARCIALES[funcion]:
+                parciales[f"{salida}__{agregado.lower()}"] = f"{agregado}({columna})"
+        seleccion_llave = llave if llave == "cliente_id" else f"{llave} AS cliente_id"
+        ctes.append(
+            f"{alias} AS (\n"
+            f"    SELECT {seleccion_llave},\n"
+            + ",\n".join(f"        {expresion} AS {nombre}" for nombre, expresion in parciales.items())
+            + f"\n    FROM {origen}\n    GROUP BY {llave}\n)"
+        )
+        joins.append(f"LEFT JOIN {alias} ON {alias}.cliente_id = c.cliente_id")
+
+        for salida, (_, funcion) in definiciones.items():
+            if funcion == "mean":
+                expresion = (f"ROUND(1.0 * SUM({alias}.{salida}__sum) / NULLIF(SUM({alias}.{salida}__count), 0), 2)")
+            elif funcion == "count":
+                expresion = f"COALESCE(SUM({alias}.{salida}__count), 0)"
+            else:
+                agregado = _PARCIALES[funcion][0]
+                expresion = f"ROUND({_COMBINAR[agregado]}({alias}.{salida}__{agregado.lower()}), 2)"
+            columnas.append(f"{expresion} AS {salida}")
+
+    seleccion = [f"c.{columna}" for columna in por] + columnas
+    consulta = ("WITH " + ",\n".join(ctes) + "\n" if ctes else "") + (
+        "SELECT\n    " + ",\n    ".join(seleccion) + "\nFROM clientes c\n"
+        + "".join(f"{join}\n" for join in joins)
+        + (f"GROUP BY {', '.join(f'c.{columna}' for columna in por)}\n" if por else "")
+        + (f"ORDER BY {orden} DESC\n" if orden else "")
+    )
+    return consulta
+
+
+def reporte(conn, metricas=METRICAS_EJECUTIVAS, por=("segmento_cliente",), orden=None,
+            titulo="📊 Reporte ejecutivo", mostrar=True):
+    """Compila y ejecuta el reporte con ejecutar_consulta; devuelve el DataFrame"""
+    return ejecutar_consulta(conn, compilar_reporte(metricas, por, orden), titulo, mostrar=mostrar)
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Reporte ejecutivo multi-tabla sin fan-out")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--por", nargs="+", default=["segmento_cliente"], help="Columnas de clientes para agrupar")
+    parser.add_argument("--sql", action="store_true", help="Muestra el SQL generado")
+    args = parser.parse_args(argv)
+
+    consulta = compilar_reporte(METRICAS_EJECUTIVAS, args.por, orden="patrimonio_total_segmento")
+    if args.sql:
+        print(consulta)
+    conn = conectar_bd(args.db, solo_lectura=True)
+    ejecutar_consulta(conn, consulta, f"📊 Reporte ejecutivo por {', '.join(args.por)}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📅 SALDOS DIARIOS POR CUENTA
+============================
+
+Tabla materializada `saldos_diarios` con el saldo de cierre y el número
+de movimientos de cada cuenta en cada día que tuvo movimientos. Se
+construye desde `transacciones` en una sola pasada agrupada y ordenada, y
+se mantiene al día de forma incremental: solo se procesan los días desde
+el último snapshot (ese día se recalcula por si quedó a medias).
+
+Como solo hay fila en los días con movimientos, el saldo de una cuenta en
+una fecha D es la última fila con fecha <= D: una búsqueda en la llave
+primaria (cuenta_id, fecha) en lugar de recorrer transacciones.
+
+Uso:
+    python saldos_diarios.py                 # actualiza (incremental)
+    python saldos_diarios.py reconstruir     # borra y recalcula todo
+    python saldos_diarios.py saldo --fecha 2024-06-30 [--cuenta 15]
+
+Los movimientos que lleguen con fecha anterior al último snapshot no se
+recogen en la actualización incremental: en ese caso usa `reconstruir`.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from conexion_bd import DB_PATH, conectar_bd
+
+SQL_TABLA = """
+CREATE TABLE IF NOT EXISTS saldos_diarios (
+    cuenta_id INTEGER NOT NULL,
+    fecha DATE NOT NULL,
+    saldo DECIMAL(15,2) NOT NULL,
+    movimientos INTEGER NOT NULL,
+    PRIMARY KEY (cuenta_id, fecha)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_saldos_diarios_fecha ON saldos_diarios(fecha);
+"""
+
+# Una fila por (cuenta, día). El saldo de cierre es el saldo_posterior del
+# último movimiento del día (columna "desnuda" junto a MAX, que SQLite toma
+# de la fila del máximo). Si el movimiento no trae saldo_posterior se
+# encadena desde el último snapshot anterior sumando los montos del día.
+SQL_ACTUALIZAR = """
+INSERT OR REPLACE INTO saldos_diarios (cuenta_id, fecha, saldo, movimientos)
+SELECT
+    cuenta_id,
+    fecha,
+    ROUND(COALESCE(
+        saldo_cierre,
+        COALESCE((SELECT s.saldo FROM saldos_diarios s
+                  WHERE s.cuenta_id = dias.cuenta_id AND s.fecha < :desde
+                  ORDER BY s.fecha DESC LIMIT 1), 0)
+        + SUM(neto) OVER (PARTITION BY cuenta_id ORDER BY fecha)
+    ), 2),
+    movimientos
+FROM (
+    SELECT
+        cuenta_id,
+        date(fecha_transaccion) AS fecha,
+        saldo_posterior AS saldo_cierre,
+        MAX(fecha_transaccion || printf('%012d', transaccion_id)) AS ultimo_movimiento,
+        SUM(monto) AS neto,
+        COUNT(*) AS movimientos
+    FROM transacciones
+    WHERE fecha_transaccion >= :desde AND cuenta_id IS NOT NULL
+    GROUP BY cuenta_id, date(fecha_transaccion)
+) AS dias
+"""
+
+SQL_SALDO_CUENTA = """
+SELECT fecha, saldo FROM saldos_diarios
+WHERE cuenta_id = ? AND fecha <= ?
+ORDER BY fecha DESC
+LIMIT 1
+"""
+
+SQL_SALDOS_FECHA = """
+SELECT cuenta_id, saldo, MAX(fecha) AS fecha_snapshot
+FROM saldos_diarios
+WHERE fecha <= :fecha
+GROUP BY cuenta_id
+"""
+
+# Saldo promedio diario ponderado por los días que estuvo vigente cada fila
+SQL_PROMEDIO_DIARIO = """
+WITH tramos AS (
+    SELECT
+        cuenta_id,
+        fecha,
+        saldo,
+        COALESCE(LEAD(fecha) OVER (PARTITION BY cuenta_id ORDER BY fecha), date(:hasta, '+1 day')) AS hasta_tramo
+    FROM saldos_diarios
+    WHERE fecha <= :hasta
+)
+SELECT
+    cuenta_id,
+    ROUND(SUM(saldo * (julianday(MIN(hasta_tramo, date(:hasta, '+1 day'))) - julianday(MAX(fecha, :desde))))
+          / (julianday(:hasta) - julianday(:desde) + 1), 2) AS saldo_promedio_diario
+FROM tramos
+WHERE hasta_tramo > :desde
+GROUP BY cuenta_id
+"""
+
+SQL_MEZCLA_DEPOSITOS = f"""
+SELECT
+    pf.nombre_producto,
+    COUNT(*) AS cuentas,
+    ROUND(SUM(s.saldo), 2) AS saldo_total,
+    ROUND(100.0 * SUM(s.saldo) / SUM(SUM(s.saldo)) OVER (), 2) AS participacion
+FROM ({SQL_SALDOS_FECHA}) AS s
+JOIN cuentas cu ON cu.cuenta_id = s.cuenta_id
+JOIN productos_financieros pf ON pf.producto_id = cu.producto_id
+GROUP BY pf.nombre_producto
+ORDER BY saldo_total DESC
+"""
+
+
+def crear_tabla(conn):
+    """Crea saldos_diarios y su índice por fecha si no existen"""
+    conn.executescript(SQL_TABLA)
+
+
+def ultimo_snapshot(conn):
+    """Fecha del último día materializado (None si la tabla está vacía)"""
+    return conn.execute("SELECT MAX(fecha) FROM saldos_diarios").fetchone()[0]
+
+
+def actualizar_saldos(conn, reconstruir=False):
+    """Materializa los días pendientes; devuelve (filas escritas, segundos)"""
+    crear_tabla(conn)
+    inicio = time.perf_counter()
+    with conn:
+        if reconstruir:
+            conn.execute("DELETE FROM saldos_diarios")
+        desde = ultimo_snapshot(conn) or "0000-00-00"
+        filas = conn.execute(SQL_ACTUALIZAR, {"desde": desde}).rowcount
+    segundos = time.perf_counter() - inicio
+    origen = "desde cero" if desde == "0000-00-00" else f"desde {desde}"
+    print(f"📅 saldos_diarios: {filas:,} filas ({origen}) en {segundos:.2f} s")
+    return filas, segundos
+
+
+def saldo_en_fecha(conn, cuenta_id, fecha):
+    """Saldo de una cuenta al cierre de una fecha (None si aún no tenía movimientos)"""
+    fila = conn.execute(SQL_SALDO_CUENTA, (cuenta_id, fecha)).fetchone()
+    return fila[1] if fila else None
+
+
+def saldos_en_fecha(conn, fecha):
+    """Saldo de cierre de todas las cuentas en una fecha (fin de periodo)"""
+    return pd.read_sql_query(SQL_SALDOS_FECHA, conn, params={"fecha": fecha})
+
+
+def saldo_promedio_diario(conn, desde, hasta):
+    """Saldo promedio diario por cuenta entre dos fechas (inclusive).
+
+    Los días anteriores al primer movimiento de la cuenta cuentan como 0.
+    """
+    return pd.read_sql_query(SQL_PROMEDIO_DIARIO, conn, params={"desde": desde, "hasta": hasta})
+
+
+def mezcla_depositos(conn, fecha):
+    """Saldos por producto y su participación al cierre de una fecha"""
+    return pd.read_sql_query(SQL_MEZCLA_DEPOSITOS, conn, params={"fecha": fecha})
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Mantiene la tabla saldos_diarios de banking_core.db")
+    parser.add_argument("accion", nargs="?", default="actualizar", choices=["actualizar", "reconstruir", "saldo"])
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--fecha", help="Fecha de corte para 'saldo' (YYYY-MM-DD)")
+    parser.add_argument("--cuenta", type=int, help="cuenta_id para 'saldo' (por defecto, mezcla por producto)")
+    args = parser.parse_args(argv)
+
+    if args.accion == "saldo":
+        if not args.fecha:
+            parser.error("'saldo' requiere --fecha")
+        conn = conectar_bd(args.db, solo_lectura=True)
+        if args.cuenta is not None:
+            saldo = saldo_en_fecha(conn, args.cuenta, args.fecha)
+            print(f"💳 Cuenta {args.cuenta} al {args.fecha}: {saldo if saldo is not None else 'sin movimientos'}")
+        else:
+            print(f"🏦 Mezcla de depósitos al {args.fecha}:")
+            print(mezcla_depositos(conn, args.fecha))
+    else:
+        conn = conectar_bd(args.db, perfil="escritura")
+        actualizar_saldos(conn, reconstruir=args.accion == "reconstruir")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
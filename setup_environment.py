@@ -5,11 +5,14 @@ Configura automáticamente el entorno de desarrollo para el proyecto de BI banca
 """
 
 import os
+import re
 import sys
-import sqlite3
 import subprocess
+from contextlib import closing
 from pathlib import Path
 
+from conexion_bd import DB_PATH, conectar_bd
+
 def print_banner():
     """Imprime el banner del proyecto."""
     banner = """
@@ -68,12 +71,36 @@ def install_requirements():
         print("⚠️  No se pudo encontrar pip en el entorno virtual")
         print("💡 Activa el entorno virtual manualmente e instala dependencias")
 
-def create_database_structure():
+# Índices secundarios. Las cargas masivas pueden crearlos al final en una sola
+# pasada (ver reconstruir_indices.py) en lugar de mantenerlos fila a fila.
+INDEXES_SQL = """
+    -- Índices para optimización
+    CREATE INDEX IF NOT EXISTS idx_clientes_documento ON clientes(numero_documento);
+    CREATE INDEX IF NOT EXISTS idx_cuentas_cliente ON cuentas(cliente_id);
+    CREATE INDEX IF NOT EXISTS idx_prestamos_cliente ON prestamos(cliente_id);
+    CREATE INDEX IF NOT EXISTS idx_transacciones_cuenta ON transacciones(cuenta_id);
+    CREATE INDEX IF NOT EXISTS idx_transacciones_fecha ON transacciones(fecha_transaccion);
+    CREATE INDEX IF NOT EXISTS idx_prestamos_estado ON prestamos(estado);
+"""
+
+def index_statements(conn):
+    """Sentencias de INDEXES_SQL cuyo destino es una tabla de la base.
+
+    Con las particiones activas (particiones_transacciones.py) `transacciones`
+    es una vista, que no admite índices: cada partición tiene los suyos.
+    """
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    statements = []
+    for sql in INDEXES_SQL.split(";"):
+        target = re.search(r"\bON\s+(\w+)\s*\(", sql)
+        if target and target.group(1) in tables:
+            statements.append(sql.strip())
+    return statements
+
+def create_database_structure(db_path=DB_PATH, with_indexes=True):
     """Crea la estructura básica de la base de datos bancaria."""
     print("🗄️  Creando estructura de base de datos...")
     
-    db_path = Path("data/banking_core.db")
-    
     # SQL para crear las tablas principales
     create_tables_sql = """
     -- Tabla de Clientes
@@ -243,29 +270,22 @@ def create_database_structure():
         utilidad_neta DECIMAL(15,2) DEFAULT 0,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
-
-    -- Índices para optimización
-    CREATE INDEX IF NOT EXISTS idx_clientes_documento ON clientes(numero_documento);
-    CREATE INDEX IF NOT EXISTS idx_cuentas_cliente ON cuentas(cliente_id);
-    CREATE INDEX IF NOT EXISTS idx_prestamos_cliente ON prestamos(cliente_id);
-    CREATE INDEX IF NOT EXISTS idx_transacciones_cuenta ON transacciones(cuenta_id);
-    CREATE INDEX IF NOT EXISTS idx_transacciones_fecha ON transacciones(fecha_transaccion);
-    CREATE INDEX IF NOT EXISTS idx_prestamos_estado ON prestamos(estado);
     """
-    
     try:
-        with sqlite3.connect(db_path) as conn:
+        with closing(conectar_bd(db_path, perfil="escritura")) as conn:
             conn.executescript(create_tables_sql)
+            if with_indexes:
+                with conn:
+                    for sql in index_statements(conn):
+                        conn.execute(sql)
         print("✅ Estructura de base de datos creada exitosamente")
     except Exception as e:
         print(f"❌ Error al crear la base de datos: {e}")
 
-def create_sample_data():
+def create_sample_data(db_path=DB_PATH):
     """Crea datos de muestra para las tablas."""
     print("📊 Insertando datos de muestra...")
     
-    db_path = Path("data/banking_core.db")
-    
     sample_data_sql = """
     -- Productos Financieros de muestra
     INSERT OR IGNORE INTO productos_financieros (codigo_producto, nombre_producto, categoria, tasa_interes_min, tasa_interes_max, comision_manejo) VALUES
@@ -293,14 +313,14 @@ def create_sample_data():
     """
     
     try:
-        with sqlite3.connect(db_path) as conn:
+        with closing(conectar_bd(db_path, perfil="escritura")) as conn:
             conn.executescript(sample_data_sql)
         print("✅ Datos de muestra insertados exitosamente")
     except Exception as e:
         print(f"❌ Error al insertar datos de muestra: {e}")
 
 def create_readme_files():
-    """Crea archivos README en cada carpeta."""
+    """Crea los archivos README que falten en cada carpeta."""
     print("📝 Creando archivos de documentación...")
     
     readme_files = {
@@ -338,6 +358,9 @@ Scripts SQL organizados por propósito:
     }
     
     for file_path, content in readme_files.items():
+        # Las plantillas solo completan carpetas nuevas: los README del repositorio ya están al día
+        if os.path.exists(file_path):
+            continue
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 SIMULADOR DE SEGMENTACIÓN (WHAT-IF)
+======================================
+
+Prueba muchos juegos de umbrales de segmentación sin tocar la base. Los
+ingresos y la ciudad de los clientes se cargan una vez en arrays de NumPy
+(conexión de solo lectura) y cada juego de umbrales se evalúa con
+searchsorted sobre los ingresos ordenados: contar los clientes con
+ingreso >= umbral es una búsqueda binaria, así cientos de juegos se
+evalúan en milisegundos aunque haya millones de clientes.
+
+Un juego de umbrales es (mínimo VIP, mínimo Premium, mínimo Estándar), en
+el orden de actualizar_segmentos.UMBRALES_SEGMENTO; debajo del último
+queda SEGMENTO_BASE. Los clientes sin ingresos quedan en SEGMENTO_BASE,
+igual que con el CASE de SQL.
+
+Uso:
+    python simulador_segmentos.py
+    python simulador_segmentos.py --vip 6e6 10e6 5e5 --premium 4e6 6e6 5e5 --estandar 2e6 3.5e6 5e5
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from actualizar_segmentos import SEGMENTO_BASE, UMBRALES_SEGMENTO
+from conexion_bd import DB_PATH, conectar_bd
+
+SEGMENTOS = [segmento for _, segmento in UMBRALES_SEGMENTO] + [SEGMENTO_BASE]
+UMBRALES_ACTUALES = tuple(minimo for minimo, _ in UMBRALES_SEGMENTO)
+# Variante con Estándar desde 3M usada en practica_sql_avanzada.ejercicios_ejemplo
+UMBRALES_EJEMPLO_3M = (8_000_000, 5_000_000, 3_000_000)
+
+
+def grilla_umbrales(vip, premium, estandar):
+    """Combinaciones de umbrales candidatos, solo las estrictamente decrecientes"""
+    return np.array([combinacion for combinacion in itertools.product(vip, premium, estandar)
+                     if combinacion[0] > combinacion[1] > combinacion[2]], dtype=float).reshape(-1, 3)
+
+
+class SimuladorSegmentos:
+    """Ingresos y ciudades de los clientes en memoria para evaluar umbrales"""
+
+    def __init__(self, conn):
+        clientes = pd.read_sql_query(
+            "SELECT ingresos_mensuales, ciudad, segmento_cliente FROM clientes", conn)
+        ingresos = pd.to_numeric(clientes["ingresos_mensuales"], errors="coerce").to_numpy(dtype=float)
+        self.ingresos = np.where(np.isnan(ingresos), -np.inf, ingresos)  # sin ingresos → segmento base
+        self.ciudades, self.ciudad_idx = np.unique(clientes["ciudad"].fillna("Sin dato").to_numpy(dtype=str),
+                                                   return_inverse=True)
+        self.segmento_actual = clientes["segmento_cliente"].fillna("").to_numpy(dtype=str)
+        self.total = len(self.ingresos)
+        self.clientes_por_ciudad = np.bincount(self.ciudad_idx, minlength=len(self.ciudades))
+
+        # Ingresos ordenados, globales y por ciudad, para contar con searchsorted
+        self._ordenados = np.sort(self.ingresos)
+        orden = np.lexsort((self.ingresos, self.ciudad_idx))
+        self._por_ciudad = self.ingresos[orden]
+        self._inicio_ciudad = np.r_[0, np.cumsum(self.clientes_por_ciudad)]
+
+    def _al_menos(self, umbrales):
+        """Clientes con ingreso >= cada umbral (misma forma que umbrales)"""
+        return self.total - np.searchsorted(self._ordenados, umbrales, side="left")
+
+    def evaluar(self, conjuntos):
+        """Evalúa juegos de umbrales; devuelve (resumen, % VIP por ciudad).
+
+        conjuntos: array (K, 3) con (VIP, Premium, Estándar) por fila.
+        resumen tiene una fila por juego con clientes y % por segmento;
+        vip_por_ciudad tiene una fila por juego y una columna por ciudad.
+        """
+        conjuntos = np.atleast_2d(np.asarray(conjuntos, dtype=float))
+        if conjuntos.shape[1] != len(UMBRALES_SEGMENTO):
+            raise ValueError(f"Cada juego necesita {len(UMBRALES_SEGMENTO)} umbrales: {SEGMENTOS[:-1]}")
+
+        acumulados = np.column_stack([self._al_menos(conjuntos), np.full(len(conjuntos), self.total)])
+        conteos = np.diff(np.column_stack([np.zeros(len(conjuntos), dtype=int), acumulados]), axis=1)
+
+        resumen = pd.DataFrame(conjuntos, columns=[f"umbral_{s}" for s in SEGMENTOS[:-1]])
+        for i, segmento in enumerate(SEGMENTOS):
+            resumen[f"clientes_{segmento}"] = conteos[:, i]
+        for i, segmento in enumerate(SEGMENTOS):
+            resumen[f"pct_{segmento}"] = np.round(100.0 * conteos[:, i] / max(self.total, 1), 2)
+
+        # VIP por ciudad: búsqueda binaria dentro del tramo ordenado de cada ciudad
+        vip = np.empty((len(conjuntos), len(self.ciudades)))
+        for j in range(len(self.ciudades)):
+            tramo = self._por_ciudad[self._inicio_ciudad[j]:self._inicio_ciudad[j + 1]]
+            vip[:, j] = len(tramo) - np.searchsorted(tramo, conjuntos[:, 0], side="left")
+        vip_por_ciudad = pd.DataFrame(np.round(100.0 * vip / np.maximum(self.clientes_por_ciudad, 1), 2),
+                                      columns=self.ciudades)
+        return resumen, vip_por_ciudad
+
+    def cambios(self, umbrales):
+        """Clientes que cambiarían de segmento con un juego de umbrales"""
+        cortes = np.asarray(umbrales, dtype=float)[::-1]  # ascendente para digitize
+        etiquetas = np.array(SEGMENTOS[::-1])
+        nuevo = etiquetas[np.digitize(self.ingresos, cortes)]
+        return int((nuevo != self.segmento_actual).sum())
+
+
+def main(argv=None):
+    """Evalúa una grilla de umbrales y muestra los resultados principales"""
+    parser = argparse.ArgumentParser(description="Simula segmentaciones sin modificar la base")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--vip", nargs=3, type=float, default=[6e6, 10e6, 5e5], metavar=("DESDE", "HASTA", "PASO"))
+    parser.add_argument("--premium", nargs=3, type=float, default=[4e6, 6.5e6, 5e5], metavar=("DESDE", "HASTA", "PASO"))
+    parser.add_argument("--estandar", nargs=3, type=float, default=[2e6, 4e6, 2.5e5], metavar=("DESDE", "HASTA", "PASO"))
+    args = parser.parse_args(argv)
+
+    conn = conectar_bd(args.db, solo_lectura=True)
+    inicio = time.perf_counter()
+    simulador = SimuladorSegmentos(conn)
+    conn.close()
+    carga = time.perf_counter() - inicio
+    print(f"📥 {simulador.total:,} clientes cargados en {carga:.2f} s")
+
+    rangos = [np.arange(desde, hasta + paso / 2, paso) for desde, hasta, paso in (args.vip, args.premium, args.estandar)]
+    grilla = grilla_umbrales(*rangos)
+    if not len(grilla):
+        print("⚠️ Los rangos no dan ninguna combinación con VIP > Premium > Estándar: "
+              "solo se evalúan la segmentación actual y la variante 3M")
+    conjuntos = np.vstack([UMBRALES_ACTUALES, UMBRALES_EJEMPLO_3M, grilla])
+
+    inicio = time.perf_counter()
+    resumen, vip_por_ciudad = simulador.evaluar(conjuntos)
+    segundos = time.perf_counter() - inicio
+    print(f"🧪 {len(conjuntos):,} juegos de umbrales evaluados en {segundos * 1000:.1f} ms")
+    print()
+
+    pd.set_option("display.width", 200)
+    print("✅ Segmentación actual vs variante 3M:")
+    print("-" * 60)
+    print(resumen.iloc[:2].T)
+    print(f"🔀 Clientes que cambiarían con la variante 3M: {simulador.cambios(UMBRALES_EJEMPLO_3M):,}")
+    print()
+    print("🏆 Juegos con más clientes VIP:")
+    print("-" * 60)
+    print(resumen.iloc[2:].sort_values("pct_VIP", ascending=False).head(10))
+    print()
+    print("🏙️ % VIP por ciudad (actual y variante 3M):")
+    print(vip_por_ciudad.iloc[:2].T.rename(columns={0: "actual", 1: "variante_3M"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+-- Morosidad por segmento: cartera con más de 30 días de mora / cartera total
+SELECT
+    c.segmento_cliente,
+    COUNT(*) AS prestamos,
+    ROUND(SUM(p.saldo_capital), 2) AS cartera_total,
+    ROUND(SUM(CASE WHEN p.dias_mora > 30 THEN p.saldo_capital ELSE 0 END), 2) AS cartera_vencida,
+    ROUND(100.0 * SUM(CASE WHEN p.dias_mora > 30 THEN p.saldo_capital ELSE 0 END)
+          / NULLIF(SUM(p.saldo_capital), 0), 2) AS morosidad_pct
+FROM prestamos p
+JOIN clientes c ON c.cliente_id = p.cliente_id
+WHERE COALESCE(p.estado, '') <> 'CANCELADO'
+GROUP BY c.segmento_cliente
+ORDER BY morosidad_pct DESC;
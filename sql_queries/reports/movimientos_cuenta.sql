@@ -0,0 +1,12 @@
+-- Extracto de una cuenta en un rango de fechas
+SELECT
+    t.fecha_transaccion,
+    t.tipo_transaccion,
+    t.canal,
+    t.monto,
+    t.saldo_posterior
+FROM transacciones t
+WHERE t.cuenta_id = :cuenta_id
+  AND t.fecha_transaccion >= :desde
+  AND t.fecha_transaccion < date(:hasta, '+1 day')
+ORDER BY t.fecha_transaccion;
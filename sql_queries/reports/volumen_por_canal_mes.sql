@@ -0,0 +1,11 @@
+-- Volumen transaccional por canal y mes en un rango de fechas
+SELECT
+    strftime('%Y-%m', t.fecha_transaccion) AS mes,
+    t.canal,
+    COUNT(*) AS transacciones,
+    ROUND(SUM(t.monto), 2) AS monto_total
+FROM transacciones t
+WHERE t.fecha_transaccion >= :desde
+  AND t.fecha_transaccion < date(:hasta, '+1 day')
+GROUP BY mes, t.canal
+ORDER BY mes, monto_total DESC;
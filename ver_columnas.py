@@ -1,33 +1,12 @@
-import sqlite3
-import pandas as pd
+from catalogo_esquema import mostrar_esquema
+from conexion_bd import conectar_bd
 
-conn = sqlite3.connect('data/banking_core.db')
+conn = conectar_bd()
 
 print('🏦 TABLAS Y SUS COLUMNAS:')
 print('=' * 50)
 
-# Tabla CLIENTES
-print('\n📋 CLIENTES:')
-info = pd.read_sql_query('PRAGMA table_info(clientes)', conn)
-for _, col in info.iterrows():
-    print(f'   • {col["name"]} ({col["type"]})')
-
-# Tabla CUENTAS  
-print('\n📋 CUENTAS:')
-info = pd.read_sql_query('PRAGMA table_info(cuentas)', conn)
-for _, col in info.iterrows():
-    print(f'   • {col["name"]} ({col["type"]})')
-
-# Tabla TRANSACCIONES
-print('\n📋 TRANSACCIONES:')
-info = pd.read_sql_query('PRAGMA table_info(transacciones)', conn)
-for _, col in info.iterrows():
-    print(f'   • {col["name"]} ({col["type"]})')
-
-# Tabla PRESTAMOS
-print('\n📋 PRESTAMOS:')
-info = pd.read_sql_query('PRAGMA table_info(prestamos)', conn)
-for _, col in info.iterrows():
-    print(f'   • {col["name"]} ({col["type"]})')
+# Una sola consulta al catálogo para las cuatro tablas principales
+mostrar_esquema(conn, ['clientes', 'cuentas', 'transacciones', 'prestamos'])
 
 conn.close()
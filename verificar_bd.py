@@ -1,28 +1,226 @@
 #!/usr/bin/env python3
-import sqlite3
+# -*- coding: utf-8 -*-
+"""
+🔍 VERIFICACIÓN Y ESTADÍSTICAS DE LA BASE DE DATOS
+==================================================
+
+Chequeo de salud que no recorre las tablas: las filas salen de
+sqlite_stat1 (las deja ANALYZE) y el estado del archivo de los PRAGMA
+page_count / freelist_count, así que termina en milisegundos aunque la
+base pese varios GB.
+
+- Filas aproximadas: la estadística de ANALYZE de cada tabla. Las tablas
+  sin estadística se marcan; --analizar corre ANALYZE completo para
+  refrescarlas. Con --limite-analisis N cada índice se muestrea con
+  PRAGMA analysis_limit: es más rápido en bases grandes, pero las filas
+  quedan estimadas y esas mismas estadísticas guían al planificador de
+  consultas (y a la detección de tablas grandes de verificar_planes.py).
+- Páginas libres: freelist_count / page_count, el espacio que VACUUM
+  devolvería al sistema.
+- --tamanos: tamaño en disco de cada tabla e índice según dbstat, con su
+  relleno (bytes usados de sus páginas) y fragmentación (hojas que no
+  siguen a la anterior en el archivo). dbstat lee todas las páginas, así
+  que cuesta lo que tarde en leerse el archivo.
+- --exactos: COUNT(*) exacto de cada tabla, en paralelo, cada una con su
+  propia conexión de solo lectura.
+
+Uso:
+    python verificar_bd.py                          # milisegundos
+    python verificar_bd.py --analizar               # refresca sqlite_stat1
+    python verificar_bd.py --analizar --limite-analisis 1000   # muestreo, estadística aproximada
+    python verificar_bd.py --tamanos --exactos --db data/benchmark/banking_10x.db
+"""
+
+import argparse
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from conexion_bd import DB_PATH, conectar_bd
+
+FRAGMENTACION_ALTA = 0.30    # proporción de hojas fuera de orden que sugiere VACUUM
+
+SQL_TABLAS = """
+SELECT name FROM sqlite_master
+WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+ORDER BY name
+"""
+
+# Por objeto: páginas, bytes, bytes sin usar y hojas que no siguen a la hoja anterior
+SQL_TAMANOS = """
+SELECT
+    d.name,
+    COALESCE(m.type, 'interno') AS tipo,
+    COALESCE(m.tbl_name, d.name) AS tabla,
+    COUNT(*) AS paginas,
+    SUM(d.pgsize) AS bytes,
+    SUM(d.unused) AS sin_usar,
+    SUM(d.pagetype = 'leaf') AS hojas,
+    SUM(d.pagetype = 'leaf' AND d.pageno <> d.anterior + 1) AS hojas_fuera_de_orden
+FROM (
+    SELECT name, pageno, pagetype, pgsize, unused,
+           LAG(pageno) OVER (PARTITION BY name, pagetype = 'leaf' ORDER BY path) AS anterior
+    FROM dbstat
+) AS d
+LEFT JOIN sqlite_master AS m ON m.name = d.name
+GROUP BY d.name
+ORDER BY bytes DESC
+"""
+
+
+def estado_archivo(conn):
+    """Tamaño de página, páginas totales y libres del archivo"""
+    tamano_pagina = conn.execute("PRAGMA page_size").fetchone()[0]
+    paginas = conn.execute("PRAGMA page_count").fetchone()[0]
+    libres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return {
+        "tamano_pagina": tamano_pagina,
+        "paginas": paginas,
+        "paginas_libres": libres,
+        "bytes": paginas * tamano_pagina,
+        "bytes_libres": libres * tamano_pagina,
+        "proporcion_libre": libres / paginas if paginas else 0.0,
+    }
+
+
+def filas_aproximadas(conn):
+    """{tabla: filas} según sqlite_stat1; vacío si nunca se corrió ANALYZE"""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+        return {}
+    filas = {}
+    for tabla, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+        # el primer número es el total de filas de la tabla (o del índice, que es el mismo
+        # salvo en índices parciales: por eso se toma el máximo)
+        filas[tabla] = max(filas.get(tabla, 0), int(str(stat).split()[0]))
+    return filas
+
+
+def analizar(db_path, limite=None):
+    """ANALYZE completo; con limite, cada índice se muestrea (estadística aproximada)"""
+    conn = conectar_bd(db_path, perfil="escritura")
+    if limite:
+        conn.execute(f"PRAGMA analysis_limit = {int(limite)}")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
 
-print("🔍 Verificando base de datos...")
+def tamanos_objetos(conn):
+    """[dict] por tabla e índice según dbstat, del más grande al más chico"""
+    columnas = ["nombre", "tipo", "tabla", "paginas", "bytes", "sin_usar", "hojas", "hojas_fuera_de_orden"]
+    objetos = []
+    for fila in conn.execute(SQL_TAMANOS):
+        objeto = dict(zip(columnas, fila))
+        objeto["relleno"] = 1 - objeto["sin_usar"] / objeto["bytes"] if objeto["bytes"] else 0.0
+        objeto["fragmentacion"] = (objeto["hojas_fuera_de_orden"] / (objeto["hojas"] - 1)
+                                   if objeto["hojas"] > 1 else 0.0)
+        objetos.append(objeto)
+    return objetos
 
-db_path = "data/banking_core.db"
 
-if os.path.exists(db_path):
+def _contar(db_path, tabla):
+    conn = conectar_bd(db_path, solo_lectura=True)
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM "{tabla}"').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def filas_exactas(db_path, tablas, max_workers=None):
+    """{tabla: COUNT(*)} en paralelo, una conexión de solo lectura por hilo"""
+    max_workers = max_workers or min(len(tablas), os.cpu_count() or 1) or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        conteos = pool.map(lambda tabla: _contar(db_path, tabla), tablas)
+        return dict(zip(tablas, conteos))
+
+
+def _mb(bytes_):
+    return bytes_ / (1024 * 1024)
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos; devuelve el código de salida"""
+    parser = argparse.ArgumentParser(description="Estado y estadísticas de la base de datos sin recorrer tablas")
+    parser.add_argument("--db", default=str(DB_PATH), help="Ruta de la base de datos SQLite")
+    parser.add_argument("--analizar", action="store_true", help="Refresca sqlite_stat1 con ANALYZE")
+    parser.add_argument("--limite-analisis", type=int,
+                        help="Filas por índice que muestrea --analizar (más rápido, pero filas aproximadas)")
+    parser.add_argument("--tamanos", action="store_true", help="Tamaño y fragmentación por objeto (dbstat)")
+    parser.add_argument("--exactos", action="store_true", help="COUNT(*) exacto de cada tabla, en paralelo")
+    parser.add_argument("--hilos", type=int, help="Hilos para --exactos (por omisión, uno por tabla hasta el número de CPUs)")
+    args = parser.parse_args(argv)
+
+    print("🔍 Verificando base de datos...")
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"❌ No se encontró la base de datos: {db_path}")
+        return 1
     print(f"✅ Base de datos encontrada: {db_path}")
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Verificar tablas
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-    tablas = cursor.fetchall()
-    
-    print(f"\n📊 TABLAS ENCONTRADAS ({len(tablas)}):")
+
+    if args.analizar:
+        inicio = time.perf_counter()
+        analizar(db_path, args.limite_analisis)
+        print(f"📐 ANALYZE en {time.perf_counter() - inicio:.2f} s")
+        if args.limite_analisis:
+            print(f"   ⚠️ Muestreo de {args.limite_analisis:,} filas por índice: las filas y la estadística "
+                  "que usa el planificador quedan aproximadas; corre --analizar sin límite para exactas")
+
+    inicio = time.perf_counter()
+    conn = conectar_bd(db_path, solo_lectura=True)
+    archivo = estado_archivo(conn)
+    tablas = [nombre for (nombre,) in conn.execute(SQL_TABLAS)]
+    aproximadas = filas_aproximadas(conn)
+    ms_rapido = (time.perf_counter() - inicio) * 1000
+
+    print(f"\n💾 ARCHIVO: {_mb(archivo['bytes']):,.1f} MB · {archivo['paginas']:,} páginas de "
+          f"{archivo['tamano_pagina']:,} bytes")
+    print(f"   🗑️ Páginas libres: {archivo['paginas_libres']:,} ({archivo['proporcion_libre']:.1%}, "
+          f"{_mb(archivo['bytes_libres']):,.1f} MB que VACUUM devolvería)")
+
+    print(f"\n📊 TABLAS ENCONTRADAS ({len(tablas)}), filas según sqlite_stat1:")
     for tabla in tablas:
-        cursor.execute(f"SELECT COUNT(*) FROM {tabla[0]}")
-        count = cursor.fetchone()[0]
-        print(f"  ✅ {tabla[0]}: {count:,} registros")
-    
+        filas = aproximadas.get(tabla)
+        print(f"  ✅ {tabla}: ~{filas:,} registros" if filas is not None else f"  ⚪ {tabla}: sin estadística")
+    sin_estadistica = [tabla for tabla in tablas if tabla not in aproximadas]
+    if sin_estadistica:
+        print(f"   💡 {len(sin_estadistica)} tablas sin estadística: corre con --analizar")
+    print(f"⚡ Chequeo rápido en {ms_rapido:.1f} ms")
+
+    if args.tamanos:
+        inicio = time.perf_counter()
+        objetos = tamanos_objetos(conn)
+        print(f"\n📦 TAMAÑO EN DISCO (dbstat, {(time.perf_counter() - inicio) * 1000:,.0f} ms):")
+        print(f"   {'objeto':<42} {'tipo':<8} {'MB':>9} {'% base':>7} {'relleno':>8} {'fragm.':>7}")
+        for objeto in objetos:
+            alerta = " ⚠️" if objeto["fragmentacion"] >= FRAGMENTACION_ALTA and objeto["hojas"] > 100 else ""
+            print(f"   {objeto['nombre']:<42} {objeto['tipo']:<8} {_mb(objeto['bytes']):>9,.2f} "
+                  f"{objeto['bytes'] / archivo['bytes']:>7.1%} {objeto['relleno']:>8.1%} "
+                  f"{objeto['fragmentacion']:>7.1%}{alerta}")
+        por_tabla = {}
+        for objeto in objetos:
+            datos = por_tabla.setdefault(objeto["tabla"], [0, 0])
+            datos[1 if objeto["tipo"] == "index" else 0] += objeto["bytes"]
+        print("\n   Por tabla (datos + índices):")
+        for tabla, (datos, indices) in sorted(por_tabla.items(), key=lambda t: -sum(t[1])):
+            print(f"   • {tabla:<30} {_mb(datos):>9,.2f} MB + {_mb(indices):>9,.2f} MB en índices")
+        if any(o["fragmentacion"] >= FRAGMENTACION_ALTA and o["hojas"] > 100 for o in objetos):
+            print(f"   💡 ⚠️ = más de {FRAGMENTACION_ALTA:.0%} de hojas fuera de orden: VACUUM las reordena")
     conn.close()
+
+    if args.exactos:
+        inicio = time.perf_counter()
+        exactas = filas_exactas(db_path, tablas, args.hilos)
+        print(f"\n🔢 CONTEOS EXACTOS ({(time.perf_counter() - inicio) * 1000:,.0f} ms en paralelo):")
+        for tabla, filas in exactas.items():
+            aproximada = aproximadas.get(tabla)
+            desvio = f" (estadística {aproximada:,}, desvío {(aproximada - filas) / filas:+.1%})" \
+                if aproximada is not None and filas and aproximada != filas else ""
+            print(f"  ✅ {tabla}: {filas:,} registros{desvio}")
+
     print("\n🎉 ¡Base de datos verificada exitosamente!")
-else:
-    print(f"❌ No se encontró la base de datos: {db_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
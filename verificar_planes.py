@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧭 VERIFICADOR DE PLANES DE CONSULTA
+====================================
+
+Corre EXPLAIN QUERY PLAN sobre todas las consultas catalogadas y compara
+la forma del plan con la guardada en sql_queries/planes.json. Falla (código
+de salida 1) si una consulta pasa a tener alguna de estas alertas que antes
+no tenía:
+
+- SCAN sobre una tabla grande (TABLAS_GRANDES o con más de
+  FILAS_TABLA_GRANDE filas): recorrido completo en vez de búsqueda
+- USE TEMP B-TREE FOR ... ORDER BY: ordenamiento que ningún índice cubre
+- AUTOMATIC ... INDEX: SQLite arma un índice temporal en cada ejecución
+
+Catálogo: cada archivo .sql de sql_queries/ (una consulta por archivo; los
+parámetros :nombre o ? se enlazan como NULL, el plan no depende de sus
+valores), las consultas de práctica (ver benchmark_consultas.py), el
+reporte ejecutivo y las lecturas de CONSULTAS_MODULOS.
+
+También falla si una consulta no compila (error de sintaxis, columna
+inexistente...) o si una consulta de la foto ya no se pudo capturar. Solo
+se omiten las consultas sobre tablas que no existen en la base usada y
+que tampoco estaban en la foto.
+
+La foto se toma sobre data/benchmark/banking_10x.db, que
+`benchmark_consultas.py --escalas 10x --solo-preparar` genera con
+saldos_diarios, cuotas_prestamo y ANALYZE al día.
+
+Uso:
+    python verificar_planes.py                       # verifica contra la foto
+    python verificar_planes.py --actualizar          # guarda la foto actual
+    python verificar_planes.py --db data/benchmark/banking_10x.db --detalle
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+from pathlib import Path
+
+import amortizacion
+import saldos_diarios
+from benchmark_consultas import catalogo_consultas
+from conexion_bd import DB_PATH, RAIZ_PROYECTO, conectar_bd
+from reporte_ejecutivo import METRICAS_EJECUTIVAS, compilar_reporte
+from verificar_bd import filas_aproximadas
+
+DIR_SQL = RAIZ_PROYECTO / "sql_queries"
+FOTO_PLANES = DIR_SQL / "planes.json"
+
+TABLAS_GRANDES = {"transacciones", "saldos_diarios", "cuotas_prestamo"}
+FILAS_TABLA_GRANDE = 100_000
+
+# Lecturas de las herramientas que también se vigilan
+CONSULTAS_MODULOS = {
+    "amortizacion.SQL_FLUJO": amortizacion.SQL_FLUJO,
+    "saldos_diarios.SQL_SALDO_CUENTA": saldos_diarios.SQL_SALDO_CUENTA,
+    "saldos_diarios.SQL_SALDOS_FECHA": saldos_diarios.SQL_SALDOS_FECHA,
+    "saldos_diarios.SQL_MEZCLA_DEPOSITOS": saldos_diarios.SQL_MEZCLA_DEPOSITOS,
+    "reporte_ejecutivo.segmento": compilar_reporte(METRICAS_EJECUTIVAS),
+}
+
+_PALABRAS_SQL = {"ON", "WHERE", "LEFT", "RIGHT", "INNER", "CROSS", "JOIN", "NATURAL", "FULL", "OUTER",
+                 "GROUP", "ORDER", "LIMIT", "USING", "UNION", "HAVING", "WINDOW", "AS", "EXCEPT", "INTERSECT"}
+
+
+def catalogo(directorio=DIR_SQL):
+    """[(clave, sql)] de todas las consultas vigiladas"""
+    consultas = [(str(ruta.relative_to(directorio)), ruta.read_text(encoding="utf-8"))
+                 for ruta in sorted(Path(directorio).rglob("*.sql"))]
+    consultas += [(clave, sql) for clave, _, sql in catalogo_consultas()]
+    consultas += list(CONSULTAS_MODULOS.items())
+    return consultas
+
+
+def _parametros(consulta):
+    """Parámetros NULL para EXPLAIN: dict si usa :nombre, tupla si usa ?"""
+    sin_textos = re.sub(r"'[^']*'", "''", re.sub(r"--[^\n]*", "", consulta))
+    nombres = set(re.findall(r":([A-Za-z_]\w*)", sin_textos))
+    return dict.fromkeys(nombres) if nombres else (None,) * sin_textos.count("?")
+
+
+def alias_tablas(consulta):
+    """{alias o nombre: tabla} de los FROM / JOIN de una consulta"""
+    sin_comentarios = re.sub(r"--[^\n]*", "", consulta)
+    alias = {}
+    for tabla, nombre in re.findall(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?",
+                                    sin_comentarios, flags=re.IGNORECASE):
+        alias[tabla] = tabla
+        if nombre and nombre.upper() not in _PALABRAS_SQL:
+            alias[nombre] = tabla
+    return alias
+
+
+def tablas_grandes(conn, umbral=FILAS_TABLA_GRANDE):
+    """TABLAS_GRANDES más las tablas con al menos umbral filas (según sqlite_stat1 o COUNT)"""
+    grandes = set(TABLAS_GRANDES)
+    tablas = [nombre for (nombre,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    estadisticas = filas_aproximadas(conn)
+    for tabla in tablas:
+        filas = estadisticas.get(tabla)
+        if filas is None:
+            filas = conn.execute(f'SELECT COUNT(*) FROM "{tabla}"').fetchone()[0]
+        if filas >= umbral:
+            grandes.add(tabla)
+    return grandes
+
+
+def forma_plan(conn, consulta):
+    """Líneas de EXPLAIN QUERY PLAN indentadas por nivel (la forma del plan)"""
+    filas = conn.execute(f"EXPLAIN QUERY PLAN {consulta}", _parametros(consulta)).fetchall()
+    nivel = {0: -1}
+    lineas = []
+    for identificador, padre, _, detalle in filas:
+        nivel[identificador] = nivel.get(padre, -1) + 1
+        lineas.append("  " * nivel[identificador] + detalle)
+    return lineas
+
+
+def alertas_plan(plan, alias, grandes):
+    """Alertas de una forma de plan, como textos estables para comparar"""
+    alertas = set()
+    for linea in plan:
+        detalle = linea.strip()
+        escaneo = re.match(r"SCAN (\w+)", detalle)
+        if escaneo and alias.get(escaneo.group(1), escaneo.group(1)) in grandes:
+            alertas.add(f"SCAN {alias.get(escaneo.group(1), escaneo.group(1))}")
+        if re.search(r"TEMP B-TREE FOR .*ORDER BY", detalle):
+            alertas.add("TEMP B-TREE ORDER BY")
+        if "AUTOMATIC" in detalle:
+            alertas.add(re.sub(r"^SEARCH (\w+)", lambda m: f"SEARCH {alias.get(m.group(1), m.group(1))}",
+                               detalle.split(" (")[0]))
+    return sorted(alertas)
+
+
+def capturar(conn, consultas, umbral=FILAS_TABLA_GRANDE):
+    """Devuelve ({clave: {plan, alertas}}, omitidas por tabla inexistente, errores {clave: mensaje})"""
+    grandes = tablas_grandes(conn, umbral)
+    foto, omitidas, errores = {}, {}, {}
+    for clave, consulta in consultas:
+        try:
+            plan = forma_plan(conn, consulta)
+        except sqlite3.Error as error:
+            (omitidas if str(error).startswith("no such table") else errores)[clave] = str(error)
+            continue
+        foto[clave] = {"plan": plan, "alertas": alertas_plan(plan, alias_tablas(consulta), grandes)}
+    return foto, omitidas, errores
+
+
+def comparar_fotos(actual, anterior):
+    """Devuelve (regresiones {clave: alertas nuevas}, planes cambiados, consultas nuevas,
+    consultas de la foto que faltan en la captura actual)"""
+    regresiones, cambiados, nuevas = {}, [], []
+    for clave, datos in actual.items():
+        previo = anterior.get(clave)
+        if previo is None:
+            nuevas.append(clave)
+            alertas_nuevas = datos["alertas"]
+        else:
+            alertas_nuevas = sorted(set(datos["alertas"]) - set(previo["alertas"]))
+            if datos["plan"] != previo["plan"]:
+                cambiados.append(clave)
+        if alertas_nuevas:
+            regresiones[clave] = alertas_nuevas
+    faltantes = sorted(set(anterior) - set(actual))
+    return regresiones, cambiados, nuevas, faltantes
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos; devuelve el código de salida"""
+    parser = argparse.ArgumentParser(description="Detecta regresiones en los planes de las consultas catalogadas")
+    parser.add_argument("--db", default=str(DB_PATH), help="Base de datos representativa")
+    parser.add_argument("--foto", default=str(FOTO_PLANES), help="JSON con la foto de los planes")
+    parser.add_argument("--actualizar", action="store_true", help="Guarda los planes actuales como foto")
+    parser.add_argument("--umbral-filas", type=int, default=FILAS_TABLA_GRANDE,
+                        help="Filas a partir de las cuales una tabla es grande")
+    parser.add_argument("--detalle", action="store_true", help="Muestra el plan de las consultas con cambios")
+    args = parser.parse_args(argv)
+
+    conn = conectar_bd(args.db, solo_lectura=True)
+    actual, omitidas, errores = capturar(conn, catalogo(), args.umbral_filas)
+    conn.close()
+    for clave, error in omitidas.items():
+        print(f"⏭️ {clave}: omitida ({error})")
+    for clave, error in errores.items():
+        print(f"❌ {clave}: no compila ({error})")
+
+    ruta_foto = Path(args.foto)
+    if args.actualizar:
+        if errores:
+            print("\n❌ Corrige las consultas que no compilan antes de actualizar la foto")
+            return 1
+        ruta_foto.write_text(json.dumps(actual, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        con_alertas = sum(1 for datos in actual.values() if datos["alertas"])
+        print(f"📸 Foto de {len(actual)} planes guardada en {ruta_foto} ({con_alertas} con alertas aceptadas)")
+        return 0
+
+    anterior = json.loads(ruta_foto.read_text(encoding="utf-8")) if ruta_foto.exists() else {}
+    regresiones, cambiados, nuevas, faltantes = comparar_fotos(actual, anterior)
+    print(f"🧭 {len(actual)} planes verificados: {len(cambiados)} cambiaron, {len(nuevas)} sin foto previa")
+    for clave in cambiados if args.detalle else []:
+        print(f"\n🔀 {clave}")
+        print("   antes:  " + "\n           ".join(anterior[clave]["plan"]))
+        print("   ahora:  " + "\n           ".join(actual[clave]["plan"]))
+    if regresiones:
+        print("\n❌ ALERTAS NUEVAS:")
+        for clave, alertas in regresiones.items():
+            print(f"   • {clave}: {', '.join(alertas)}")
+    if faltantes:
+        print("\n❌ CONSULTAS DE LA FOTO QUE NO SE PUDIERON VERIFICAR:")
+        for clave in faltantes:
+            print(f"   • {clave}: {omitidas.get(clave) or errores.get(clave) or 'ya no está en el catálogo'}")
+    if regresiones or faltantes or errores:
+        print("\n💡 Si el cambio es intencional, acepta la foto con --actualizar")
+        return 1
+    print("✅ Ningún plan empeoró")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())